@@ -3,9 +3,42 @@
 from django.contrib import admin
 from .models import Curso, Horario, Mesa, Alumno, Asistencia
 
-# Registramos los modelos para que aparezcan en el panel de admin
+# Registramos los modelos para que aparezcan en el panel de admin.
+# El __str__ de Horario, Mesa y Asistencia lee relaciones (curso,
+# facilitador, horario, alumno): 'list_select_related' y las consultas
+# de los <select> las traen en la misma consulta en lugar de una por fila.
 admin.site.register(Curso)
-admin.site.register(Horario)
-admin.site.register(Mesa)
-admin.site.register(Alumno)
-admin.site.register(Asistencia)
\ No newline at end of file
+
+
+@admin.register(Horario)
+class HorarioAdmin(admin.ModelAdmin):
+    list_select_related = ('curso',)
+
+
+@admin.register(Mesa)
+class MesaAdmin(admin.ModelAdmin):
+    list_select_related = ('facilitador', 'horario')
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'horario':
+            kwargs['queryset'] = Horario.objects.select_related('curso')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+@admin.register(Alumno)
+class AlumnoAdmin(admin.ModelAdmin):
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'mesa':
+            kwargs['queryset'] = Mesa.objects.select_related('facilitador', 'horario')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+@admin.register(Asistencia)
+class AsistenciaAdmin(admin.ModelAdmin):
+    list_select_related = ('alumno',)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'horario_adelanto':
+            kwargs['queryset'] = Horario.objects.select_related('curso')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
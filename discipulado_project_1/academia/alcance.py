@@ -0,0 +1,91 @@
+# En academia/alcance.py (archivo nuevo)
+
+"""
+"Alcance" de un facilitador: qué mesas y qué alumnos le pertenecen.
+
+Se calcula una vez con dos consultas y se guarda en el cache (compartido
+entre peticiones), con conjuntos/diccionarios para que comprobar si un
+alumno o una mesa es suyo sea O(1) y sin ir a la base de datos.
+
+Se invalida (ver academia/signals.py) cuando cambian las asignaciones:
+una mesa cambia de facilitador, horario o estado, o un alumno cambia de
+mesa. Las cascadas con .update() usan 'invalidar_todos()'.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Alumno, Mesa
+
+PREFIJO = 'academia:alcance'
+CLAVE_GENERACION = f'{PREFIJO}:generacion'
+
+
+def generacion():
+    valor = cache.get(CLAVE_GENERACION)
+    if valor is None:
+        cache.add(CLAVE_GENERACION, 1, timeout=None)
+        valor = cache.get(CLAVE_GENERACION, 1)
+    return valor
+
+
+def clave(facilitador_id):
+    return f'{PREFIJO}:g{generacion()}:{facilitador_id}'
+
+
+def calcular(facilitador_id):
+    """
+    Devuelve un diccionario con:
+      - 'mesas':          {mesa_id: {'horario_id', 'curso_id', 'activo'}}
+      - 'mesas_activas':  set de ids de mesas activas
+      - 'alumnos':        {alumno_id: mesa_id}
+    """
+    mesas = {
+        m['id']: {
+            'horario_id': m['horario_id'],
+            'curso_id': m['horario__curso_id'],
+            'activo': m['activo'],
+        }
+        for m in Mesa.objects.filter(facilitador_id=facilitador_id).values(
+            'id', 'horario_id', 'horario__curso_id', 'activo'
+        )
+    }
+    alumnos = dict(
+        Alumno.objects.filter(facilitador_id=facilitador_id).values_list('id', 'mesa_id')
+    )
+    return {
+        'mesas': mesas,
+        'mesas_activas': {mesa_id for mesa_id, m in mesas.items() if m['activo']},
+        'alumnos': alumnos,
+    }
+
+
+def de(user):
+    """
+    Alcance del facilitador 'user' (desde el cache si ya se calculó).
+    """
+    clave_usuario = clave(user.pk)
+    alcance = cache.get(clave_usuario)
+    if alcance is None:
+        alcance = calcular(user.pk)
+        cache.set(clave_usuario, alcance, getattr(settings, 'ALCANCE_TIMEOUT', 600))
+    return alcance
+
+
+def invalidar(*facilitadores_ids):
+    """
+    Borra el alcance cacheado de los facilitadores indicados.
+    """
+    ids = {f for f in facilitadores_ids if f}
+    if ids:
+        cache.delete_many([clave(f) for f in ids])
+
+
+def invalidar_todos():
+    """
+    Invalida el alcance de TODOS los facilitadores (cambiando de generación).
+    """
+    try:
+        cache.incr(CLAVE_GENERACION)
+    except ValueError:
+        cache.add(CLAVE_GENERACION, 2, timeout=None)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AcademiaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'academia'
+
+    def ready(self):
+        # Registra las señales (ver academia/signals.py)
+        from . import signals  # noqa: F401
@@ -0,0 +1,124 @@
+# En academia/arbol.py (archivo nuevo)
+
+"""
+Árbol de un curso para las páginas de detalle de Curso y Horario
+(GET /cursos/{id}/arbol/): horarios → mesas (con su facilitador) →
+conteos de alumnos activos/inactivos y asistencia de la última clase.
+
+Se arma con 4 consultas sin importar cuántos horarios o mesas haya:
+el curso, los horarios y las mesas (prefetch_related, con los conteos
+de alumnos como anotaciones Count) y las filas de ResumenAsistencia
+del curso.
+
+'ultima_clase' es la última clase del curso con algún registro; la
+tasa de cada nivel es (registros que no son falta) / registros en esa
+clase, o null si el nivel no tiene registros en ella.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db.models import Count, Prefetch, Q
+
+from .models import Asistencia, Mesa, ResumenAsistencia
+
+
+def horarios_de(curso, user):
+    mesas = Mesa.objects.select_related('facilitador').annotate(
+        alumnos_activos=Count('alumnos', filter=Q(alumnos__activo=True)),
+        alumnos_inactivos=Count('alumnos', filter=Q(alumnos__activo=False)),
+    ).order_by('nombre_mesa')
+    if user.role == 'FACILITADOR':
+        mesas = mesas.filter(facilitador=user)
+
+    horarios = curso.horarios.order_by('-activo', 'dia', 'hora').prefetch_related(
+        Prefetch('mesas', queryset=mesas)
+    )
+    if user.role == 'FACILITADOR':
+        horarios = horarios.filter(mesas__facilitador=user).distinct()
+    return list(horarios)
+
+
+def conteos_de(curso, mesas_ids):
+    """
+    (ultima_clase, {mesa_id: Counter(estado -> total)}) de la última
+    clase con registros del curso.
+    """
+    filas = ResumenAsistencia.objects.filter(
+        curso=curso, mesa_id__in=mesas_ids, total__gt=0
+    ).values_list('mesa_id', 'numero_clase', 'estado', 'total')
+
+    por_clase = defaultdict(lambda: defaultdict(Counter))
+    for mesa_id, numero_clase, estado, total in filas:
+        por_clase[numero_clase][mesa_id][estado] += total
+    if not por_clase:
+        return None, {}
+    ultima_clase = max(por_clase)
+    return ultima_clase, por_clase[ultima_clase]
+
+
+def totales(conteos):
+    registros = sum(conteos.values())
+    presentes = registros - conteos[Asistencia.Estado.FALTO]
+    return {
+        'registros': registros,
+        'presentes': presentes,
+        'tasa_asistencia': round(presentes / registros, 4) if registros else None,
+    }
+
+
+def armar(curso, user):
+    horarios = horarios_de(curso, user)
+    mesas_ids = [mesa.id for horario in horarios for mesa in horario.mesas.all()]
+    ultima_clase, por_mesa = conteos_de(curso, mesas_ids)
+
+    conteos_curso = Counter()
+    alumnos_curso = Counter()
+    datos_horarios = []
+    for horario in horarios:
+        conteos_horario = Counter()
+        alumnos_horario = Counter()
+        datos_mesas = []
+        for mesa in horario.mesas.all():
+            conteos = por_mesa.get(mesa.id, Counter())
+            conteos_horario.update(conteos)
+            alumnos_horario.update(activos=mesa.alumnos_activos, inactivos=mesa.alumnos_inactivos)
+            datos_mesas.append({
+                'id': mesa.id,
+                'nombre_mesa': mesa.nombre_mesa,
+                'activo': mesa.activo,
+                'facilitador': {
+                    'id': mesa.facilitador_id,
+                    'username': mesa.facilitador.username,
+                    'first_name': mesa.facilitador.first_name,
+                    'last_name': mesa.facilitador.last_name,
+                },
+                'alumnos_activos': mesa.alumnos_activos,
+                'alumnos_inactivos': mesa.alumnos_inactivos,
+                'ultima_clase': totales(conteos),
+            })
+        conteos_curso.update(conteos_horario)
+        alumnos_curso.update(alumnos_horario)
+        datos_horarios.append({
+            'id': horario.id,
+            'dia': horario.dia,
+            'dia_display': horario.get_dia_display(),
+            'hora': horario.hora.strftime('%H:%M'),
+            'activo': horario.activo,
+            'alumnos_activos': alumnos_horario['activos'],
+            'alumnos_inactivos': alumnos_horario['inactivos'],
+            'ultima_clase': totales(conteos_horario),
+            'mesas': datos_mesas,
+        })
+
+    return {
+        'id': curso.id,
+        'nombre': curso.nombre,
+        'fecha_inicio': curso.fecha_inicio,
+        'fecha_fin': curso.fecha_fin,
+        'activo': curso.activo,
+        'numero_ultima_clase': ultima_clase,
+        'alumnos_activos': alumnos_curso['activos'],
+        'alumnos_inactivos': alumnos_curso['inactivos'],
+        'ultima_clase': totales(conteos_curso),
+        'horarios': datos_horarios,
+    }
@@ -0,0 +1,250 @@
+# En academia/benchmark.py (archivo nuevo)
+
+"""
+Benchmark de la API sobre los datos sintéticos (academia/sinteticos.py):
+cada caso es una petición a una ruta de academia/urls.py o
+usuarios/urls.py, hecha en el mismo proceso con APIClient, que se
+repite para medir:
+
+  - rendimiento (peticiones por segundo, una a la vez),
+  - latencia p50 / p95 / máxima en milisegundos,
+  - consultas SQL por petición (mínimo y máximo).
+
+Las escrituras se hacen dentro de una transacción que se deshace, así
+los datos son los mismos en cada repetición y en cada ejecución. La
+autenticación se salta (force_authenticate): se mide la vista, no el
+JWT. Las respuestas en streaming se leen completas dentro del tiempo.
+
+'rutas_sin_caso()' lista las rutas con nombre que no tienen caso, para
+que no se olviden al agregar endpoints nuevos.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver
+from rest_framework.test import APIClient
+
+from usuarios.models import CustomUser
+from . import sinteticos
+from .models import Alumno, Asistencia, Curso, Mesa
+
+
+@dataclass
+class Caso:
+    nombre: str  # Identifica el caso en los resultados (para comparar ejecuciones)
+    ruta: str  # Nombre de la ruta en urls.py
+    metodo: str
+    url: str
+    usuario: str = 'admin'  # 'admin' o 'facilitador'
+    params: dict = field(default_factory=dict)
+    datos: object = None
+
+
+class Deshacer(Exception):
+    pass
+
+
+def contexto():
+    """
+    Ids de los datos sintéticos que usan los casos: el curso activo, un
+    facilitador con mesa en él, y una mesa, alumno y asistencia suyos.
+    """
+    curso = Curso.objects.filter(nombre__startswith=sinteticos.PREFIJO_CURSO).order_by('-activo', '-id').first()
+    mesa = Mesa.objects.filter(horario__curso=curso).annotate(total=Count('alumnos')).filter(
+        total__gt=0
+    ).order_by('id').first()
+    if curso is None or mesa is None:
+        return None
+    alumnos = list(Alumno.objects.filter(mesa=mesa).order_by('id').values_list('id', flat=True))
+    return {
+        'admin': CustomUser.objects.get(username=sinteticos.USUARIO_ADMIN),
+        'facilitador': mesa.facilitador,
+        'curso': curso.id,
+        'horario': mesa.horario_id,
+        'mesa': mesa.id,
+        'alumnos': alumnos,
+        'alumno': alumnos[0],
+        'asistencia': Asistencia.objects.filter(alumno_id=alumnos[0]).order_by('id').values_list('id', flat=True).first(),
+    }
+
+
+def casos(ctx):
+    curso, horario, mesa, alumno, asistencia = (
+        ctx['curso'], ctx['horario'], ctx['mesa'], ctx['alumno'], ctx['asistencia']
+    )
+    registros = [
+        {'alumno': alumno_id, 'numero_clase': 1, 'estado': 'A'} for alumno_id in ctx['alumnos']
+    ]
+    importacion = [
+        {'nombres': f'Bench {n}', 'apellidos': 'Prueba', 'fecha_nacimiento': '1990-01-01', 'mesa': mesa}
+        for n in range(10)
+    ]
+    usuario_fac = ctx['facilitador'].id
+    return [
+        Caso('raiz-academia', 'api-root', 'get', '/api/v1/'),
+        Caso('cursos', 'curso-list', 'get', '/api/v1/cursos/'),
+        Caso('curso', 'curso-detail', 'get', f'/api/v1/cursos/{curso}/'),
+        Caso('curso-arbol', 'curso-arbol', 'get', f'/api/v1/cursos/{curso}/arbol/'),
+        Caso('horarios', 'horario-list', 'get', '/api/v1/horarios/', 'facilitador', {'curso': curso}),
+        Caso('horario', 'horario-detail', 'get', f'/api/v1/horarios/{horario}/', 'facilitador'),
+        Caso('mesas', 'mesa-list', 'get', '/api/v1/mesas/', 'facilitador'),
+        Caso('mesas-admin', 'mesa-list', 'get', '/api/v1/mesas/'),
+        Caso('mesa', 'mesa-detail', 'get', f'/api/v1/mesas/{mesa}/', 'facilitador'),
+        Caso('alumnos', 'alumno-list', 'get', '/api/v1/alumnos/', 'facilitador'),
+        Caso('alumnos-admin', 'alumno-list', 'get', '/api/v1/alumnos/'),
+        Caso('alumnos-paginados', 'alumno-list', 'get', '/api/v1/alumnos/', params={'page_size': 50}),
+        Caso('alumnos-resumen', 'alumno-list', 'get', '/api/v1/alumnos/', params={'resumen': 1, 'page_size': 50}),
+        Caso('alumnos-busqueda', 'alumno-list', 'get', '/api/v1/alumnos/', params={'search': 'maria gar'}),
+        Caso('alumnos-campos', 'alumno-list', 'get', '/api/v1/alumnos/', params={'fields': 'id,nombres,apellidos'}),
+        Caso('alumno', 'alumno-detail', 'get', f'/api/v1/alumnos/{alumno}/', 'facilitador'),
+        Caso('alumno-editar', 'alumno-detail', 'patch', f'/api/v1/alumnos/{alumno}/', 'facilitador',
+             datos={'colonia': 'Centro'}),
+        Caso('alumnos-importar', 'alumno-importar-lote', 'post', '/api/v1/alumnos/importar/', datos=importacion),
+        Caso('asistencias', 'asistencia-list', 'get', '/api/v1/asistencias/', 'facilitador', {'numero_clase': 1}),
+        Caso('asistencia', 'asistencia-detail', 'get', f'/api/v1/asistencias/{asistencia}/', 'facilitador'),
+        Caso('asistencia-editar', 'asistencia-detail', 'patch', f'/api/v1/asistencias/{asistencia}/', 'facilitador',
+             datos={'estado': 'F'}),
+        Caso('bulk-upsert', 'asistencia-bulk-upsert', 'post', '/api/v1/asistencias/bulk_upsert/', 'facilitador',
+             datos=registros),
+        Caso('dashboard', 'dashboard-stats', 'get', '/api/v1/dashboard-stats/', params={'numero_clase': 5}),
+        Caso('matriz', 'asistencia-matriz', 'get', '/api/v1/asistencia-matriz/', params={'curso': curso, 'alumnos': 1}),
+        Caso('hoja-mesa', 'asistencia-hoja', 'get', '/api/v1/asistencia-hoja/', 'facilitador',
+             {'mesa': mesa, 'numero_clase': 5}),
+        Caso('hoja-horario', 'asistencia-hoja', 'get', '/api/v1/asistencia-hoja/', params={'horario': horario, 'numero_clase': 5}),
+        Caso('riesgo', 'alumnos-riesgo', 'get', '/api/v1/alumnos-riesgo/', params={'curso': curso}),
+        Caso('exportar-alumnos', 'exportar-alumnos', 'get', '/api/v1/exportar/alumnos/', params={'curso': curso}),
+        Caso('exportar-asistencia', 'exportar-asistencia', 'get', '/api/v1/exportar/asistencia/', params={'curso': curso}),
+        Caso('sync', 'sync', 'get', '/api/v1/sync/', 'facilitador'),
+        Caso('cumpleanos', 'cumpleanos', 'get', '/api/v1/cumpleanos/'),
+        Caso('cache-stats', 'cache-stats', 'get', '/api/v1/cache-stats/'),
+        Caso('metricas', 'metricas', 'get', '/api/v1/metricas/'),
+        Caso('raiz-usuarios', 'api-root', 'get', '/api/v1/auth/'),
+        Caso('usuarios', 'customuser-list', 'get', '/api/v1/auth/usuarios/'),
+        Caso('usuario', 'customuser-detail', 'get', f'/api/v1/auth/usuarios/{usuario_fac}/'),
+    ]
+
+
+def nombres_de_rutas(patrones):
+    for patron in patrones:
+        if isinstance(patron, URLResolver):
+            yield from nombres_de_rutas(patron.url_patterns)
+        elif isinstance(patron, URLPattern) and patron.name:
+            yield patron.name
+
+
+def rutas_sin_caso(lista_casos):
+    from academia import urls as urls_academia
+    from usuarios import urls as urls_usuarios
+
+    rutas = set(nombres_de_rutas(urls_academia.urlpatterns)) | set(nombres_de_rutas(urls_usuarios.urlpatterns))
+    return sorted(rutas - {caso.ruta for caso in lista_casos})
+
+
+def percentil(valores, p):
+    """
+    Percentil por rango más cercano de una lista ya ordenada.
+    """
+    indice = max(0, math.ceil(p / 100 * len(valores)) - 1)
+    return valores[indice]
+
+
+def hacer_peticion(cliente, caso):
+    if caso.metodo == 'get':
+        response = cliente.get(caso.url, caso.params)
+    else:
+        response = getattr(cliente, caso.metodo)(caso.url, caso.datos, format='json')
+    if response.streaming:
+        # Leer todo: el trabajo de una exportación ocurre al recorrerla
+        b''.join(response.streaming_content)
+    return response.status_code
+
+
+def medir(caso, ctx, repeticiones=20, calentamiento=2, sin_cache=False):
+    cliente = APIClient()
+    cliente.force_authenticate(ctx[caso.usuario])
+
+    tiempos = []
+    consultas = []
+    estados = set()
+    for vuelta in range(calentamiento + repeticiones):
+        if sin_cache:
+            cache.clear()
+        try:
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as capturadas:
+                    inicio = time.perf_counter()
+                    estado = hacer_peticion(cliente, caso)
+                    duracion = time.perf_counter() - inicio
+                if caso.metodo != 'get':
+                    raise Deshacer
+        except Deshacer:
+            pass
+        if vuelta >= calentamiento:
+            tiempos.append(duracion)
+            consultas.append(len(capturadas))
+            estados.add(estado)
+
+    tiempos.sort()
+    return {
+        'nombre': caso.nombre,
+        'ruta': caso.ruta,
+        'metodo': caso.metodo.upper(),
+        'url': caso.url,
+        'params': caso.params,
+        'usuario': caso.usuario,
+        'estados': sorted(estados),
+        'repeticiones': repeticiones,
+        'peticiones_por_segundo': round(repeticiones / sum(tiempos), 2) if sum(tiempos) else None,
+        'p50_ms': round(percentil(tiempos, 50) * 1000, 2),
+        'p95_ms': round(percentil(tiempos, 95) * 1000, 2),
+        'max_ms': round(tiempos[-1] * 1000, 2),
+        'consultas_min': min(consultas),
+        'consultas_max': max(consultas),
+    }
+
+
+def ejecutar(repeticiones=20, calentamiento=2, sin_cache=False, filtro=None, al_medir=None):
+    """
+    Mide todos los casos (o los que contienen 'filtro' en su nombre o
+    ruta). Devuelve (resultados, rutas_sin_caso), o None si no hay
+    datos sintéticos.
+    """
+    ctx = contexto()
+    if ctx is None:
+        return None
+    lista = casos(ctx)
+    resultados = []
+    for caso in lista:
+        if filtro and filtro not in caso.nombre and filtro not in caso.ruta:
+            continue
+        resultado = medir(caso, ctx, repeticiones, calentamiento, sin_cache)
+        resultados.append(resultado)
+        if al_medir:
+            al_medir(resultado)
+    return resultados, rutas_sin_caso(lista)
+
+
+def comparar(anteriores, actuales):
+    """
+    [(nombre, p95 anterior, p95 actual, cambio %, consultas anterior, actual)]
+    de los casos que están en ambas ejecuciones.
+    """
+    previos = {r['nombre']: r for r in anteriores}
+    filas = []
+    for actual in actuales:
+        previo = previos.get(actual['nombre'])
+        if previo is None:
+            continue
+        cambio = (actual['p95_ms'] - previo['p95_ms']) / previo['p95_ms'] * 100 if previo['p95_ms'] else None
+        filas.append((
+            actual['nombre'], previo['p95_ms'], actual['p95_ms'], cambio,
+            previo['consultas_max'], actual['consultas_max'],
+        ))
+    return filas
+
@@ -0,0 +1,101 @@
+# En academia/busqueda.py (archivo nuevo)
+
+"""
+Búsqueda de alumnos en el servidor (?search= en AlumnoViewSet), para no
+tener que descargar a todos los alumnos y filtrarlos en el navegador.
+
+Cada palabra del texto buscado tiene que aparecer (o parecerse) en
+'nombres', 'apellidos', 'telefono' o 'colonia'.
+
+- PostgreSQL: sin acentos ni mayúsculas y tolerante a errores de
+  escritura, con pg_trgm. Cada palabra coincide si es parte del campo
+  (LIKE) o si su "word similarity" supera el umbral de pg_trgm (%>).
+  Ambas condiciones usan el índice GIN de trigramas de la migración
+  0012 sobre academia_unaccent(lower(campo)); la expresión de aquí tiene
+  que ser idéntica a la del índice.
+- Otras bases (SQLite en las pruebas): coincidencia parcial simple con
+  icontains, sin tolerancia a errores.
+
+Los resultados se ordenan por 'relevancia' (mayor primero).
+"""
+
+from django.db import connections
+from django.db.models import Case, F, Func, IntegerField, Q, TextField, Value, When
+from django.db.models.functions import Greatest, Lower
+
+from .importar import normalizar
+
+CAMPOS = ('nombres', 'apellidos', 'telefono', 'colonia')
+
+# Resultados por defecto y máximo permitido con ?limite=
+LIMITE = 20
+LIMITE_MAXIMO = 100
+
+# Palabras que se toman en cuenta del texto buscado
+MAXIMO_PALABRAS = 5
+
+FUNCION_UNACCENT = 'academia_unaccent'
+
+
+def sin_acentos(campo):
+    """
+    academia_unaccent(lower(campo)): la misma expresión del índice.
+    """
+    return Func(Lower(F(campo)), function=FUNCION_UNACCENT, output_field=TextField())
+
+
+def buscar(queryset, texto):
+    """
+    Filtra 'queryset' por 'texto' y lo anota con 'relevancia'.
+    """
+    postgresql = connections[queryset.db].vendor == 'postgresql'
+    # Sin unaccent() en la base, quitar los acentos del texto haría que
+    # "José" ya no coincida con "José"
+    palabras = (normalizar(texto) if postgresql else texto).split()[:MAXIMO_PALABRAS]
+    if not palabras:
+        return queryset.none()
+    if postgresql:
+        return buscar_postgresql(queryset, palabras)
+    return buscar_simple(queryset, palabras)
+
+
+def buscar_postgresql(queryset, palabras):
+    from django.contrib.postgres.lookups import TrigramWordSimilar
+    from django.contrib.postgres.search import TrigramWordSimilarity
+    from django.db.models.lookups import Contains
+
+    columnas = {campo: sin_acentos(campo) for campo in CAMPOS}
+    filtro = Q()
+    relevancia = []
+    for palabra in palabras:
+        coincide = Q()
+        for columna in columnas.values():
+            coincide |= Q(Contains(columna, palabra)) | Q(TrigramWordSimilar(columna, Value(palabra)))
+        filtro &= coincide
+        relevancia.append(Greatest(*[
+            TrigramWordSimilarity(Value(palabra), columna) for columna in columnas.values()
+        ]))
+
+    total = relevancia[0]
+    for parcial in relevancia[1:]:
+        total = total + parcial
+    return queryset.filter(filtro).annotate(relevancia=total)
+
+
+def buscar_simple(queryset, palabras):
+    filtro = Q()
+    for palabra in palabras:
+        coincide = Q()
+        for campo in CAMPOS:
+            coincide |= Q(**{f'{campo}__icontains': palabra})
+        filtro &= coincide
+
+    # Más relevante si el nombre o el apellido empiezan con la primera palabra
+    primera = palabras[0]
+    relevancia = Case(
+        When(Q(nombres__istartswith=primera) | Q(apellidos__istartswith=primera), then=Value(2)),
+        When(Q(nombres__icontains=primera) | Q(apellidos__icontains=primera), then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    return queryset.filter(filtro).annotate(relevancia=relevancia)
@@ -0,0 +1,124 @@
+# En academia/cache_respuestas.py (archivo nuevo)
+
+"""
+Cache de respuestas para vistas de solo lectura que se consultan
+mucho más de lo que cambian (dashboard, cumpleaños...).
+
+Todas las claves llevan un número de "versión". Cuando se guarda algo
+en Asistencia, Alumno, Mesa, Horario o Curso, se incrementa la versión
+(ver academia/signals.py y las cascadas de los ViewSets) y las claves
+viejas simplemente dejan de usarse hasta que expiran.
+
+Funciona con cualquier backend de Django (CACHES en settings). Con
+LocMemCache cada proceso tiene su propia versión, así que en producción
+con varios workers conviene un backend compartido (Redis, Memcached).
+"""
+
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+PREFIJO = 'academia'
+CLAVE_VERSION = f'{PREFIJO}:version'
+
+
+def version_actual():
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        cache.add(CLAVE_VERSION, 1, timeout=None)
+        version = cache.get(CLAVE_VERSION, 1)
+    return version
+
+
+def invalidar():
+    """
+    Invalida TODAS las respuestas cacheadas subiendo la versión.
+    """
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        # La clave no existía (cache recién iniciado o expulsada)
+        cache.add(CLAVE_VERSION, 2, timeout=None)
+
+
+def contar(nombre, evento):
+    clave = f'{PREFIJO}:stats:{nombre}:{evento}'
+    cache.add(clave, 0, timeout=None)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        pass
+
+
+def estadisticas(nombres):
+    """
+    Devuelve {nombre: {'hits': n, 'misses': n}} para cada endpoint.
+    """
+    claves = {
+        (nombre, evento): f'{PREFIJO}:stats:{nombre}:{evento}'
+        for nombre in nombres
+        for evento in ('hits', 'misses')
+    }
+    valores = cache.get_many(list(claves.values()))
+    return {
+        nombre: {
+            evento: valores.get(claves[(nombre, evento)], 0)
+            for evento in ('hits', 'misses')
+        }
+        for nombre in nombres
+    }
+
+
+def construir_clave(nombre, request, extra=''):
+    """
+    Clave = endpoint + versión + rol + facilitador + parámetros de la URL.
+    Los admins comparten la misma entrada; cada facilitador tiene la suya.
+    """
+    user = request.user
+    usuario = user.pk if user.role != 'ADMIN' else '-'
+    params = '&'.join(
+        f'{k}={",".join(sorted(request.query_params.getlist(k)))}'
+        for k in sorted(request.query_params)
+    )
+    resumen = hashlib.md5(f'{params}|{extra}'.encode()).hexdigest()
+    return f'{PREFIJO}:resp:{nombre}:v{version_actual()}:{user.role}:{usuario}:{resumen}'
+
+
+# Endpoints registrados con @cachear_respuesta (para las estadísticas)
+ENDPOINTS = []
+
+
+def cachear_respuesta(nombre, variar_por=None):
+    """
+    Decorador para el método 'get' de una APIView.
+
+    'variar_por' es una función opcional (request -> str) para añadir
+    a la clave algo que no viene en la URL (ej. el mes actual).
+    """
+    ENDPOINTS.append(nombre)
+
+    def decorador(get):
+        @functools.wraps(get)
+        def envoltura(self, request, *args, **kwargs):
+            extra = variar_por(request) if variar_por else ''
+            clave = construir_clave(nombre, request, extra)
+
+            data = cache.get(clave)
+            if data is not None:
+                contar(nombre, 'hits')
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            contar(nombre, 'misses')
+            response = get(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                timeout = getattr(settings, 'CACHE_RESPUESTAS_TIMEOUT', 300)
+                cache.set(clave, response.data, timeout)
+            response['X-Cache'] = 'MISS'
+            return response
+        return envoltura
+    return decorador
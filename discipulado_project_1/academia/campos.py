@@ -0,0 +1,117 @@
+# En academia/campos.py (archivo nuevo)
+
+"""
+"Sparse fieldsets": el cliente elige qué campos quiere en la respuesta.
+
+  - ?fields=id,nombres,apellidos   solo esos campos ('id' siempre va)
+  - ?omit=testimonio,meta_personal todos menos esos
+
+Un campo que el serializer no tiene es un error 400.
+
+CamposDinamicosMixin (serializers) quita los campos no pedidos, y
+CamposDinamicosViewSetMixin (ViewSets) lleva la misma selección al SQL
+con only(): las columnas que no se van a mostrar ni se leen.
+Solo aplica a peticiones GET.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+
+
+def nombres_de(request, param):
+    valor = request.query_params.get(param, '')
+    return {nombre.strip() for nombre in valor.split(',') if nombre.strip()}
+
+
+def pide_campos(request):
+    return request is not None and request.method == 'GET' and (
+        'fields' in request.query_params or 'omit' in request.query_params
+    )
+
+
+class CamposDinamicosMixin:
+    """
+    Para serializers: aplica ?fields= / ?omit= de la petición del contexto.
+    Los serializers anidados (sin contexto al crearse) no se filtran.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if not pide_campos(request):
+            return
+
+        pedidos = nombres_de(request, 'fields')
+        omitidos = nombres_de(request, 'omit')
+        errores = {}
+        for param, nombres in (('fields', pedidos), ('omit', omitidos)):
+            desconocidos = nombres - set(self.fields)
+            if desconocidos:
+                errores[param] = f"Campos desconocidos: {', '.join(sorted(desconocidos))}."
+        if errores:
+            raise ValidationError(errores)
+
+        for nombre in list(self.fields):
+            if pedidos and nombre not in pedidos and nombre != 'id':
+                self.fields.pop(nombre)
+            elif nombre in omitidos and nombre != 'id':
+                self.fields.pop(nombre)
+
+
+def columnas_de(serializer, modelo):
+    """
+    Campos del modelo que necesita 'serializer' para mostrar sus campos,
+    o None si no se puede saber (ej. un campo con source='*').
+    """
+    columnas = set()
+    for campo in serializer.fields.values():
+        if campo.write_only:
+            continue
+        if campo.source == '*':
+            return None
+        base = campo.source.split('.')[0]
+        try:
+            campo_modelo = modelo._meta.get_field(base)
+        except FieldDoesNotExist:
+            # Propiedad, método o anotación: no es una columna
+            continue
+        if campo_modelo.concrete and not campo_modelo.many_to_many:
+            columnas.add(campo_modelo.name)
+    return columnas
+
+
+class CamposDinamicosViewSetMixin:
+    """
+    Para ViewSets: con ?fields= / ?omit=, list y retrieve leen de la base
+    solo las columnas que el serializer va a mostrar, más las de
+    'campos_siempre' (las que usan los permisos o los métodos del
+    serializer) y las del ORDER BY (las usa la paginación).
+    """
+    campos_siempre = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in ('list', 'retrieve') or not pide_campos(self.request):
+            return queryset
+
+        modelo = queryset.model
+        mostradas = columnas_de(self.get_serializer(), modelo)
+        if mostradas is None:
+            return queryset
+        columnas = mostradas | set(self.campos_siempre)
+        for orden in queryset.query.order_by:
+            if isinstance(orden, str):
+                base = orden.lstrip('-').split('__')[0]
+                if base != 'pk' and base in {f.name for f in modelo._meta.concrete_fields}:
+                    columnas.add(base)
+
+        # select_related de una relación que ya no se muestra: se quita
+        # (only() no permite diferir una relación que se va a recorrer)
+        relaciones = queryset.query.select_related
+        if isinstance(relaciones, dict) and not set(relaciones) <= mostradas:
+            quedan = [r for r in relaciones if r in mostradas]
+            queryset = queryset.select_related(None)
+            # (select_related() sin argumentos seguiría TODAS las relaciones)
+            if quedan:
+                queryset = queryset.select_related(*quedan)
+        return queryset.only(*columnas)
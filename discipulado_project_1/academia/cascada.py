@@ -0,0 +1,81 @@
+# En academia/cascada.py (archivo nuevo)
+
+"""
+Desactivación (y reactivación) en cascada de Curso / Horario / Mesa.
+
+- Desactivar un curso o un horario desactiva sus mesas y los alumnos
+  de esas mesas. Desactivar una mesa desactiva sus alumnos.
+- Todo ocurre en UNA transacción, con UPDATEs basados en subconsultas
+  (la lista de mesas nunca se carga en Python).
+- Las filas que se desactivan por la cascada quedan marcadas con
+  'desactivado_por_cascada', así 'reactivar()' solo vuelve a activar
+  esas (y no, por ejemplo, a un alumno que ya se había dado de baja).
+- Al reactivar, cada nivel solo vuelve si su propio padre está activo:
+  una mesa cuyo horario sigue dado de baja (o un alumno cuya mesa sigue
+  dada de baja) se queda como está, con su marca, hasta que se
+  reactive ese padre.
+
+El objeto raíz (el curso, horario o mesa en sí) lo guarda quien llama;
+aquí solo se tocan sus descendientes. Ambas funciones devuelven cuántas
+filas se modificaron: {'mesas': n, 'alumnos': n}.
+"""
+
+from django.db import transaction
+
+from . import alcance, cache_respuestas, versiones
+from .sincronizacion import ahora
+from .models import Alumno, Curso, Horario, Mesa
+
+
+def mesas_de(objeto):
+    """
+    Queryset (sin evaluar) de las mesas que cuelgan de 'objeto'.
+    """
+    if isinstance(objeto, Curso):
+        return Mesa.objects.filter(horario__curso_id=objeto.pk)
+    if isinstance(objeto, Horario):
+        return Mesa.objects.filter(horario_id=objeto.pk)
+    if isinstance(objeto, Mesa):
+        return Mesa.objects.filter(pk=objeto.pk)
+    raise TypeError(f"No se puede aplicar una cascada a {type(objeto).__name__}")
+
+
+def desactivar(objeto):
+    mesas = mesas_de(objeto)
+    with transaction.atomic():
+        alumnos = Alumno.objects.filter(
+            mesa_id__in=mesas.values('pk'), activo=True
+        ).update(activo=False, desactivado_por_cascada=True, actualizado=ahora())
+
+        total_mesas = 0
+        if not isinstance(objeto, Mesa):
+            total_mesas = mesas.filter(activo=True).update(
+                activo=False, desactivado_por_cascada=True, actualizado=ahora()
+            )
+
+        transaction.on_commit(invalidar_caches)
+    return {'mesas': total_mesas, 'alumnos': alumnos}
+
+
+def reactivar(objeto):
+    mesas = mesas_de(objeto)
+    with transaction.atomic():
+        total_mesas = 0
+        if not isinstance(objeto, Mesa):
+            total_mesas = mesas.filter(horario__activo=True, desactivado_por_cascada=True).update(
+                activo=True, desactivado_por_cascada=False, actualizado=ahora()
+            )
+
+        alumnos = Alumno.objects.filter(
+            mesa_id__in=mesas.values('pk'), mesa__activo=True, desactivado_por_cascada=True
+        ).update(activo=True, desactivado_por_cascada=False, actualizado=ahora())
+
+        transaction.on_commit(invalidar_caches)
+    return {'mesas': total_mesas, 'alumnos': alumnos}
+
+
+def invalidar_caches():
+    # .update() no dispara señales: invalidamos a mano
+    cache_respuestas.invalidar()
+    alcance.invalidar_todos()
+    versiones.tocar(Mesa, Alumno)
@@ -0,0 +1,98 @@
+# En academia/denormalizacion.py (archivo nuevo)
+
+"""
+Mantenimiento de las copias 'facilitador' y 'curso' que guardan
+Alumno y Asistencia (copiadas de alumno.mesa.facilitador y
+alumno.mesa.horario.curso).
+
+Gracias a ellas, "los alumnos/asistencias de este facilitador" es una
+búsqueda en una sola tabla en lugar de un join de 2-3 tablas.
+
+- Al guardar un Alumno o una Asistencia, las señales rellenan las copias.
+- Si cambia la mesa de un alumno, el facilitador de una mesa o el curso
+  de un horario, se propagan con UPDATEs basados en subconsultas.
+- 'inconsistencias()' y 'sincronizar_todo()' los usa el comando
+  'verificar_denormalizados'.
+"""
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from . import versiones
+from .sincronizacion import ahora
+from .models import Alumno, Asistencia, Mesa
+
+
+def claves_de_mesa(mesa_id):
+    """
+    Devuelve (facilitador_id, curso_id) de una mesa (o (None, None)).
+    """
+    if not mesa_id:
+        return None, None
+    fila = Mesa.objects.filter(pk=mesa_id).values_list('facilitador_id', 'horario__curso_id').first()
+    return fila or (None, None)
+
+
+def sincronizar_alumnos(alumnos):
+    """
+    Recalcula facilitador/curso de los alumnos del queryset (y de sus
+    asistencias) con UPDATE ... SET = (subconsulta).
+    Devuelve (alumnos actualizados, asistencias actualizadas).
+    """
+    mesa = Mesa.objects.filter(pk=OuterRef('mesa_id'))
+    with transaction.atomic():
+        total_alumnos = alumnos.update(
+            facilitador_id=Subquery(mesa.values('facilitador_id')[:1]),
+            curso_id=Subquery(mesa.values('horario__curso_id')[:1]),
+            actualizado=ahora(),
+        )
+        total_asistencias = sincronizar_asistencias(
+            Asistencia.objects.filter(alumno__in=alumnos.values('pk'))
+        )
+    # Cambian las listas filtradas por facilitador/curso (ETags); la
+    # versión se sube tras el COMMIT, igual que en signals.al_confirmar
+    transaction.on_commit(lambda: versiones.tocar(Alumno))
+    return total_alumnos, total_asistencias
+
+
+def sincronizar_asistencias(asistencias):
+    """
+    Copia facilitador/curso del alumno a cada asistencia del queryset.
+    """
+    alumno = Alumno.objects.filter(pk=OuterRef('alumno_id'))
+    transaction.on_commit(lambda: versiones.tocar(Asistencia))
+    return asistencias.update(
+        facilitador_id=Subquery(alumno.values('facilitador_id')[:1]),
+        curso_id=Subquery(alumno.values('curso_id')[:1]),
+        actualizado=ahora(),
+    )
+
+
+def inconsistencias():
+    """
+    Devuelve los querysets de alumnos y asistencias cuyas copias no
+    coinciden con las relaciones reales.
+    """
+    alumnos = Alumno.objects.annotate(
+        fac_real=Coalesce('mesa__facilitador_id', Value(0)),
+        curso_real=Coalesce('mesa__horario__curso_id', Value(0)),
+        fac_copia=Coalesce('facilitador_id', Value(0)),
+        curso_copia=Coalesce('curso_id', Value(0)),
+    ).exclude(fac_real=F('fac_copia'), curso_real=F('curso_copia'))
+
+    asistencias = Asistencia.objects.annotate(
+        fac_real=Coalesce('alumno__mesa__facilitador_id', Value(0)),
+        curso_real=Coalesce('alumno__mesa__horario__curso_id', Value(0)),
+        fac_copia=Coalesce('facilitador_id', Value(0)),
+        curso_copia=Coalesce('curso_id', Value(0)),
+    ).exclude(fac_real=F('fac_copia'), curso_real=F('curso_copia'))
+
+    return alumnos, asistencias
+
+
+def sincronizar_todo():
+    """
+    Recalcula las copias de TODAS las filas. Devuelve (alumnos, asistencias).
+    """
+    return sincronizar_alumnos(Alumno.objects.all())
@@ -0,0 +1,236 @@
+# En academia/exportar.py (archivo nuevo)
+
+"""
+Exportación a CSV / XLSX de la lista de alumnos y de la cuadrícula de
+asistencia (un renglón por alumno, una columna por clase).
+
+Las filas se leen con '.iterator(chunk_size=...)' (en PostgreSQL, un
+cursor del lado del servidor), así que la memoria no crece con el tamaño
+del curso:
+
+  - CSV: se envía con StreamingHttpResponse. El encabezado sale antes de
+    ejecutar la consulta y luego va un bloque de texto cada BLOQUE filas.
+  - XLSX: un .xlsx es un ZIP y no se puede enviar a medias; openpyxl en
+    modo 'write_only' escribe las filas a un archivo temporal (memoria
+    constante) y después se envía ese archivo por partes.
+
+Ninguno de los dos deja pasar fórmulas:
+
+  - CSV: el texto que Excel tomaría como fórmula (empieza con =, +, -,
+    @, tabulador o retorno) se escribe con un apóstrofo delante (ver
+    'celda_segura').
+  - XLSX: openpyxl solo crea una fórmula si el texto empieza con '=';
+    esas celdas se marcan como texto (ver 'celda_xlsx') y el resto se
+    escribe tal cual, sin apóstrofo (ej. teléfonos '+52...').
+"""
+
+import csv
+import io
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+
+from .models import Alumno, Asistencia, TOTAL_CLASES
+
+try:
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+except ImportError:  # pragma: no cover
+    openpyxl = None
+
+# Filas por cada lectura a la base de datos y por cada bloque enviado
+BLOQUE = 500
+
+FORMATOS = ('csv', 'xlsx')
+
+COLUMNAS_ALUMNOS = [
+    ('id', 'ID'),
+    ('nombres', 'Nombres'),
+    ('apellidos', 'Apellidos'),
+    ('fecha_nacimiento', 'Fecha de nacimiento'),
+    ('telefono', 'Teléfono'),
+    ('colonia', 'Colonia'),
+    ('calle', 'Calle'),
+    ('numero_casa', 'Número'),
+    ('bautizado', 'Bautizado'),
+    ('activo', 'Activo'),
+    ('mesa__nombre_mesa', 'Mesa'),
+    ('mesa__horario__dia', 'Día'),
+    ('mesa__horario__hora', 'Hora'),
+    ('facilitador__first_name', 'Facilitador'),
+]
+
+COLUMNAS_CUADRICULA = [
+    ('id', 'ID'),
+    ('nombres', 'Nombres'),
+    ('apellidos', 'Apellidos'),
+    ('mesa__nombre_mesa', 'Mesa'),
+    ('activo', 'Activo'),
+]
+
+
+def alumnos_de(alcance):
+    """
+    Alumnos que corresponden al alcance pedido, un diccionario con
+    'curso', 'horario', 'mesa' (ids o None) y 'facilitador' (usuario o None).
+    """
+    alumnos = Alumno.objects.all()
+    if alcance.get('facilitador') is not None:
+        alumnos = alumnos.filter(facilitador=alcance['facilitador'])
+    if alcance.get('curso'):
+        alumnos = alumnos.filter(curso_id=alcance['curso'])
+    if alcance.get('horario'):
+        alumnos = alumnos.filter(mesa__horario_id=alcance['horario'])
+    if alcance.get('mesa'):
+        alumnos = alumnos.filter(mesa_id=alcance['mesa'])
+    return alumnos
+
+
+def asistencias_de(alcance):
+    """
+    Las asistencias del mismo alcance (con las copias facilitador/curso
+    de Asistencia, sin joins salvo para horario y mesa).
+    """
+    asistencias = Asistencia.objects.all()
+    if alcance.get('facilitador') is not None:
+        asistencias = asistencias.filter(facilitador=alcance['facilitador'])
+    if alcance.get('curso'):
+        asistencias = asistencias.filter(curso_id=alcance['curso'])
+    if alcance.get('horario'):
+        asistencias = asistencias.filter(alumno__mesa__horario_id=alcance['horario'])
+    if alcance.get('mesa'):
+        asistencias = asistencias.filter(alumno__mesa_id=alcance['mesa'])
+    return asistencias
+
+
+def filas_alumnos(alcance):
+    """
+    Genera el encabezado y luego una tupla por alumno.
+    """
+    yield [titulo for _, titulo in COLUMNAS_ALUMNOS]
+    campos = [campo for campo, _ in COLUMNAS_ALUMNOS]
+    yield from (
+        alumnos_de(alcance)
+        .order_by('mesa__horario__dia', 'mesa__horario__hora', 'mesa_id', 'apellidos', 'id')
+        .values_list(*campos)
+        .iterator(chunk_size=BLOQUE)
+    )
+
+
+def filas_cuadricula(alcance):
+    """
+    Genera el encabezado y luego una fila por alumno con el estado de
+    cada una de las TOTAL_CLASES clases ('' si no hay registro).
+
+    Alumnos y asistencias se leen a la vez, ambos ordenados por alumno,
+    y se combinan como en un "merge join": en memoria solo está el
+    alumno actual.
+    """
+    yield [titulo for _, titulo in COLUMNAS_CUADRICULA] + [
+        f'Clase {n}' for n in range(1, TOTAL_CLASES + 1)
+    ]
+
+    campos = [campo for campo, _ in COLUMNAS_CUADRICULA]
+    alumnos = alumnos_de(alcance).order_by('id').values_list(*campos).iterator(chunk_size=BLOQUE)
+    asistencias = (
+        asistencias_de(alcance)
+        .order_by('alumno_id', 'numero_clase')
+        .values_list('alumno_id', 'numero_clase', 'estado')
+        .iterator(chunk_size=BLOQUE)
+    )
+
+    siguiente = next(asistencias, None)
+    for alumno in alumnos:
+        alumno_id = alumno[0]
+        clases = [''] * TOTAL_CLASES
+        # Saltamos asistencias de alumnos que no están en la lista
+        while siguiente is not None and siguiente[0] < alumno_id:
+            siguiente = next(asistencias, None)
+        while siguiente is not None and siguiente[0] == alumno_id:
+            _, numero_clase, estado = siguiente
+            if 1 <= numero_clase <= TOTAL_CLASES:
+                clases[numero_clase - 1] = estado
+            siguiente = next(asistencias, None)
+        yield list(alumno) + clases
+
+
+# Al abrir un CSV, Excel (y LibreOffice) interpretan como fórmula una
+# celda que empieza así
+INICIOS_DE_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def celda_segura(valor):
+    """
+    Evita la "inyección de fórmulas" en CSV: un alumno llamado
+    '=HYPERLINK(...)' se exporta como texto ("'=HYPERLINK(...)") y no se
+    ejecuta al abrir el archivo.
+    """
+    if isinstance(valor, str) and valor.startswith(INICIOS_DE_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def bloques_csv(filas):
+    """
+    Convierte las filas en bloques de texto CSV de BLOQUE filas.
+    El BOM inicial hace que Excel abra bien los acentos.
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    buffer.write('\ufeff')
+    for i, fila in enumerate(filas, 1):
+        escritor.writerow([celda_segura(valor) for valor in fila])
+        # El encabezado se envía solo, antes de esperar a la consulta
+        if i == 1 or i % BLOQUE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    resto = buffer.getvalue()
+    if resto:
+        yield resto
+
+
+def respuesta_csv(filas, nombre):
+    response = StreamingHttpResponse(bloques_csv(filas), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{nombre}.csv"'
+    return response
+
+
+def celda_xlsx(hoja, valor):
+    """
+    En XLSX el texto se guarda tal cual; solo el que empieza con '='
+    (que openpyxl escribiría como fórmula) va en una celda de tipo texto.
+    """
+    if isinstance(valor, str) and valor.startswith('='):
+        celda = WriteOnlyCell(hoja, value=valor)
+        celda.data_type = 's'
+        return celda
+    return valor
+
+
+def respuesta_xlsx(filas, nombre):
+    """
+    A diferencia del CSV, esta respuesta no sale mientras se leen las
+    filas: el ZIP se escribe completo en un archivo temporal y luego
+    FileResponse lo envía por partes. La memoria sigue siendo constante,
+    pero el primer byte llega cuando terminó la consulta.
+    """
+    libro = openpyxl.Workbook(write_only=True)
+    hoja = libro.create_sheet(title=nombre[:31])
+    for fila in filas:
+        hoja.append([celda_xlsx(hoja, valor) for valor in fila])
+    archivo = tempfile.TemporaryFile()
+    libro.save(archivo)
+    archivo.seek(0)
+    return FileResponse(
+        archivo,
+        as_attachment=True,
+        filename=f'{nombre}.xlsx',
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
+def respuesta(filas, nombre, formato):
+    if formato == 'xlsx':
+        return respuesta_xlsx(filas, nombre)
+    return respuesta_csv(filas, nombre)
@@ -0,0 +1,108 @@
+# En academia/hoja.py (archivo nuevo)
+
+"""
+"Hoja de asistencia" de una clase: todo lo que necesita la página de
+Asistencia para mostrar y enviar la lista en una sola petición
+(GET /asistencia-hoja/?mesa=ID&numero_clase=N, o ?horario=ID).
+
+  - las mesas (una, o las del horario) con sus alumnos activos,
+  - el registro actual de cada alumno en esa clase (o null),
+  - las clases anteriores que el alumno faltó (F) y no ha recuperado,
+  - los otros horarios activos del curso (para 'horario_adelanto').
+
+Siempre son 4 consultas, sin importar cuántos alumnos haya.
+"""
+
+from django.http import Http404
+
+from .models import Alumno, Asistencia, Horario, Mesa
+
+
+def datos_horario(horario):
+    return {
+        'id': horario.id,
+        'curso': horario.curso_id,
+        'dia': horario.dia,
+        'dia_display': horario.get_dia_display(),
+        'hora': horario.hora.strftime('%H:%M'),
+    }
+
+
+def armar(user, numero_clase, mesa_id=None, horario_id=None):
+    """
+    Arma la hoja de la clase 'numero_clase' para la mesa 'mesa_id' o
+    para las mesas activas del horario 'horario_id' (las de 'user' si
+    es facilitador). Lanza Http404 si la mesa u horario no existe o no
+    es suyo.
+    """
+    mesas = Mesa.objects.select_related('facilitador').order_by('nombre_mesa')
+    if user.role == 'FACILITADOR':
+        mesas = mesas.filter(facilitador=user)
+
+    # --- Consultas 1 y 2: mesas, horario y horarios del mismo curso ---
+    if mesa_id is not None:
+        mesas = list(mesas.select_related('horario').filter(pk=mesa_id))
+        if not mesas:
+            raise Http404("La mesa no existe o no es tuya.")
+        horario = mesas[0].horario
+        horarios_curso = list(Horario.objects.filter(curso_id=horario.curso_id, activo=True))
+    else:
+        horarios_curso = list(Horario.objects.filter(curso__horarios=horario_id))
+        horario = next((h for h in horarios_curso if h.id == horario_id), None)
+        if horario is None:
+            raise Http404("El horario no existe.")
+        horarios_curso = [h for h in horarios_curso if h.activo]
+        mesas = list(mesas.filter(horario_id=horario_id, activo=True))
+
+    # --- Consulta 3: alumnos activos ---
+    alumnos = list(
+        Alumno.objects.filter(mesa__in=[m.id for m in mesas], activo=True)
+        .order_by('apellidos', 'nombres')
+        .values('id', 'nombres', 'apellidos', 'mesa_id')
+    )
+
+    # --- Consulta 4: registros de esta clase y de las anteriores ---
+    filas = {a['id']: {**a, 'asistencia': None, 'faltas_pendientes': []} for a in alumnos}
+    registros = Asistencia.objects.filter(
+        alumno_id__in=list(filas), numero_clase__lte=numero_clase
+    ).order_by('numero_clase').values_list(
+        'id', 'alumno_id', 'numero_clase', 'estado', 'motivo_falta_recupero', 'horario_adelanto_id'
+    )
+    for asistencia_id, alumno_id, clase, estado, motivo, adelanto in registros:
+        if clase == numero_clase:
+            filas[alumno_id]['asistencia'] = {
+                'id': asistencia_id,
+                'estado': estado,
+                'motivo_falta_recupero': motivo,
+                'horario_adelanto': adelanto,
+            }
+        elif estado == Asistencia.Estado.FALTO:
+            filas[alumno_id]['faltas_pendientes'].append(clase)
+
+    por_mesa = {mesa.id: [] for mesa in mesas}
+    for fila in filas.values():
+        por_mesa[fila.pop('mesa_id')].append(fila)
+
+    return {
+        'numero_clase': numero_clase,
+        'horario': datos_horario(horario),
+        'mesas': [
+            {
+                'id': mesa.id,
+                'nombre_mesa': mesa.nombre_mesa,
+                'activo': mesa.activo,
+                'facilitador': {
+                    'id': mesa.facilitador_id,
+                    'first_name': mesa.facilitador.first_name,
+                    'last_name': mesa.facilitador.last_name,
+                },
+                'alumnos': por_mesa[mesa.id],
+            }
+            for mesa in mesas
+        ],
+        'horarios_alternativos': [
+            datos_horario(h) for h in sorted(horarios_curso, key=lambda h: (h.dia, h.hora))
+            if h.id != horario.id
+        ],
+        'estados': [{'valor': valor, 'nombre': nombre} for valor, nombre in Asistencia.Estado.choices],
+    }
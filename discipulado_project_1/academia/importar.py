@@ -0,0 +1,252 @@
+# En academia/importar.py (archivo nuevo)
+
+"""
+Importación de alumnos en lote (CSV o JSON), para la semana de
+inscripciones: en lugar de un POST /alumnos/ por alumno, todo el lote
+se valida junto y se guarda con un solo bulk_create.
+
+Consultas (fijas, sin importar el tamaño del lote):
+  1. Las mesas mencionadas en el lote (existencia, dueño y copias).
+  2. Con 'horario': las mesas activas de ese horario y cuántos alumnos
+     tiene cada una, para repartir a los alumnos sin mesa.
+  3. Posibles duplicados: alumnos con alguna de las fechas de nacimiento
+     del lote (índice sobre 'fecha_nacimiento'); los nombres se comparan
+     en Python sin acentos ni mayúsculas.
+  4. El INSERT de todo el lote, dentro de una transacción.
+
+Como bulk_create no llama a save() ni a las señales, aquí mismo se
+calculan 'cumple_mmdd' y las copias facilitador/curso, y al confirmar
+la transacción se invalidan los caches.
+"""
+
+import csv
+import heapq
+import io
+import json
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from . import alcance, cache_respuestas, versiones
+from .models import Alumno, Mesa
+from .serializers import AlumnoImportSerializer
+
+# Máximo de filas por importación
+MAXIMO_FILAS = 2000
+
+
+class ErrorDeImportacion(ValueError):
+    pass
+
+
+def leer_csv(contenido):
+    """
+    Lee un CSV (texto o bytes) con los nombres de campo de Alumno como
+    encabezado. Las celdas vacías se omiten para que apliquen los
+    valores por defecto del modelo.
+
+    Los bytes se leen como UTF-8 y, si no lo son, como Windows-1252 (lo
+    que guarda Excel en español). Un archivo que no se puede leer lanza
+    ErrorDeImportacion.
+    """
+    if isinstance(contenido, bytes):
+        contenido = decodificar(contenido)
+    contenido = contenido.lstrip('\ufeff')
+    lector = csv.DictReader(io.StringIO(contenido))
+    try:
+        return [
+            {
+                (clave or '').strip(): valor.strip()
+                for clave, valor in fila.items()
+                if clave and isinstance(valor, str) and valor.strip() != ''
+            }
+            for fila in lector
+        ]
+    except csv.Error as e:
+        raise ErrorDeImportacion(f"CSV no válido (línea {lector.line_num}): {e}")
+
+
+def decodificar(contenido):
+    for codificacion in ('utf-8-sig', 'cp1252'):
+        try:
+            return contenido.decode(codificacion)
+        except UnicodeDecodeError:
+            pass
+    raise ErrorDeImportacion("El archivo no es un CSV de texto (UTF-8 o Windows-1252).")
+
+
+def leer_json(contenido):
+    """
+    Acepta una lista de alumnos o un objeto {"alumnos": [...]}.
+    """
+    if isinstance(contenido, (bytes, str)):
+        try:
+            contenido = json.loads(contenido)
+        except ValueError as e:
+            raise ErrorDeImportacion(f"JSON no válido: {e}")
+    if isinstance(contenido, dict):
+        contenido = contenido.get('alumnos')
+    if not isinstance(contenido, list):
+        raise ErrorDeImportacion("Se esperaba una lista (array) de alumnos.")
+    return contenido
+
+
+def normalizar(texto):
+    """
+    'José  Pérez ' -> 'jose perez' (sin acentos, minúsculas, un espacio).
+    """
+    sin_acentos = unicodedata.normalize('NFKD', texto or '')
+    sin_acentos = ''.join(c for c in sin_acentos if not unicodedata.combining(c))
+    return ' '.join(sin_acentos.casefold().split())
+
+
+def clave_duplicado(nombres, apellidos, fecha_nacimiento):
+    return normalizar(nombres), normalizar(apellidos), fecha_nacimiento
+
+
+def importar(filas, user=None, mesa=None, horario=None, simular=False, permitir_duplicados=False):
+    """
+    Valida e importa 'filas' (lista de diccionarios con los campos de
+    Alumno). Los alumnos sin 'mesa' van a la mesa 'mesa' o, con
+    'horario', a la mesa activa de ese horario con menos alumnos.
+    Con 'user' facilitador solo se puede importar a sus mesas.
+
+    Devuelve un reporte con el resultado de cada fila ('creado',
+    'duplicado' o 'rechazado'). Con 'simular' no se guarda nada (el
+    resultado de las filas válidas es 'creado' igualmente).
+    """
+    if len(filas) > MAXIMO_FILAS:
+        raise ErrorDeImportacion(f"Máximo {MAXIMO_FILAS} alumnos por importación.")
+
+    facilitador = user if user is not None and user.role == 'FACILITADOR' else None
+    resultados = []
+    candidatos = {}
+
+    for indice, fila in enumerate(filas):
+        resultado = {'indice': indice, 'resultado': None}
+        resultados.append(resultado)
+        if not isinstance(fila, dict):
+            rechazar(resultado, "Se esperaba un objeto con los datos del alumno.")
+            continue
+        serializer = AlumnoImportSerializer(data=fila)
+        if not serializer.is_valid():
+            rechazar(resultado, serializer.errors)
+            continue
+        datos = serializer.validated_data
+        if not datos.get('mesa') and mesa:
+            datos['mesa'] = mesa
+        candidatos[indice] = datos
+
+    # --- 1. Mesas mencionadas ---
+    mesas_ids = {d['mesa'] for d in candidatos.values() if d.get('mesa')}
+    mesas = {
+        m['id']: m
+        for m in Mesa.objects.filter(id__in=mesas_ids).values(
+            'id', 'activo', 'facilitador_id', 'horario__curso_id'
+        )
+    } if mesas_ids else {}
+
+    # --- 2. Reparto por horario (la mesa con menos alumnos activos primero) ---
+    reparto = []
+    if horario and any(not d.get('mesa') for d in candidatos.values()):
+        disponibles = Mesa.objects.filter(horario_id=horario, activo=True)
+        if facilitador is not None:
+            disponibles = disponibles.filter(facilitador=facilitador)
+        for m in disponibles.annotate(
+            ocupados=Count('alumnos', filter=Q(alumnos__activo=True))
+        ).values('id', 'activo', 'facilitador_id', 'horario__curso_id', 'ocupados'):
+            mesas[m['id']] = m
+            reparto.append((m['ocupados'], m['id']))
+        heapq.heapify(reparto)
+
+    for indice, datos in list(candidatos.items()):
+        if not datos.get('mesa'):
+            if not reparto:
+                rechazar(resultados[indice], {'mesa': "Indica la mesa (o un horario para repartir)."})
+                del candidatos[indice]
+                continue
+            ocupados, mesa_id = heapq.heappop(reparto)
+            heapq.heappush(reparto, (ocupados + 1, mesa_id))
+            datos['mesa'] = mesa_id
+
+        info = mesas.get(datos['mesa'])
+        if info is None:
+            error = "La mesa no existe."
+        elif facilitador is not None and info['facilitador_id'] != facilitador.pk:
+            error = "No puedes importar alumnos a una mesa que no es tuya."
+        elif not info['activo']:
+            error = "La mesa está inactiva."
+        else:
+            error = None
+        if error:
+            rechazar(resultados[indice], {'mesa': error})
+            del candidatos[indice]
+
+    # --- 3. Duplicados (contra la base de datos y dentro del mismo lote) ---
+    fechas = {d['fecha_nacimiento'] for d in candidatos.values()}
+    existentes = {
+        clave_duplicado(nombres, apellidos, fecha): alumno_id
+        for alumno_id, nombres, apellidos, fecha in Alumno.objects.filter(
+            fecha_nacimiento__in=fechas
+        ).values_list('id', 'nombres', 'apellidos', 'fecha_nacimiento')
+    } if fechas else {}
+
+    vistos = {}
+    nuevos = []
+    for indice, datos in candidatos.items():
+        resultado = resultados[indice]
+        resultado['mesa'] = datos['mesa']
+        clave = clave_duplicado(datos['nombres'], datos['apellidos'], datos['fecha_nacimiento'])
+        if not permitir_duplicados:
+            if clave in existentes:
+                resultado.update(resultado='duplicado', duplicado_de=existentes[clave])
+                continue
+            if clave in vistos:
+                resultado.update(resultado='duplicado', duplicado_de_indice=vistos[clave])
+                continue
+        vistos[clave] = indice
+
+        info = mesas[datos['mesa']]
+        campos = {k: v for k, v in datos.items() if k != 'mesa'}
+        alumno = Alumno(
+            mesa_id=datos['mesa'],
+            facilitador_id=info['facilitador_id'],
+            curso_id=info['horario__curso_id'],
+            **campos,
+        )
+        fecha = alumno.fecha_nacimiento
+        alumno.cumple_mmdd = fecha.month * 100 + fecha.day
+        nuevos.append((resultado, alumno))
+        resultado['resultado'] = 'creado'
+
+    # --- 4. Un solo INSERT ---
+    if nuevos and not simular:
+        with transaction.atomic():
+            creados = Alumno.objects.bulk_create([alumno for _, alumno in nuevos])
+            facilitadores = {a.facilitador_id for a in creados}
+            transaction.on_commit(lambda: invalidar_caches(facilitadores))
+        for (resultado, _), alumno in zip(nuevos, creados):
+            resultado['alumno'] = alumno.pk
+
+    conteo = {'creado': 0, 'duplicado': 0, 'rechazado': 0}
+    for resultado in resultados:
+        conteo[resultado['resultado']] += 1
+    return {
+        'simulacion': simular,
+        'creados': conteo['creado'],
+        'duplicados': conteo['duplicado'],
+        'rechazados': conteo['rechazado'],
+        'resultados': resultados,
+    }
+
+
+def rechazar(resultado, motivo):
+    resultado['resultado'] = 'rechazado'
+    resultado['motivo'] = motivo
+
+
+def invalidar_caches(facilitadores):
+    cache_respuestas.invalidar()
+    alcance.invalidar(*facilitadores)
+    versiones.tocar(Alumno)
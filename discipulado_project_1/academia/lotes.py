@@ -0,0 +1,87 @@
+# En academia/lotes.py (archivo nuevo)
+
+"""
+Envío de asistencias a prueba de reintentos para facilitadores sin
+conexión estable: el cliente guarda las capturas en una cola local y
+las manda a 'bulk_upsert' cuando puede, reintentando a ciegas.
+
+    POST /asistencias/bulk_upsert/
+    Idempotency-Key: 3f9c...            (o "lote" en el cuerpo)
+    {
+        "lote": "tablet-ana-0042",
+        "capturado": "2025-03-05T19:40:00-06:00",
+        "registros": [{ "alumno": 12, "numero_clase": 5, "estado": "A" }, ...]
+    }
+
+(Sigue aceptando la lista sola, sin clave, como antes.)
+
+- Idempotencia: la respuesta de cada lote aplicado se guarda en
+  LoteAsistencia por usuario + clave. Un reintento con la misma clave
+  devuelve esa respuesta sin tocar las asistencias (una consulta). Si
+  la clave se reusa con otro contenido se responde 422.
+- Orden por captura: cada registro puede traer su propio 'capturado'
+  (si no, usa el del lote, y si tampoco, la hora del servidor). Un
+  registro no sobrescribe otro capturado después; queda como
+  'obsoleto'. Así dos lotes de la misma clase que llegan en desorden
+  terminan con la captura más reciente, no con la que llegó al final.
+  Las capturas "del futuro" (reloj del dispositivo adelantado) se
+  toman como de ahora, para que no bloqueen los cambios siguientes.
+- Los lotes se recuerdan RETENCION días (comando 'purgar_lotes').
+"""
+
+import datetime
+import hashlib
+import json
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import sincronizacion
+from .models import LoteAsistencia
+
+CABECERA = 'Idempotency-Key'
+LARGO_MAXIMO_CLAVE = 100
+
+
+def retencion():
+    return datetime.timedelta(days=getattr(settings, 'LOTES_ASISTENCIA_RETENCION_DIAS', 14))
+
+
+def huella(datos):
+    """
+    sha256 del contenido del lote, sin depender del orden de las claves.
+    """
+    texto = json.dumps(datos, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+def leer_fecha(texto):
+    """
+    Fecha de captura enviada por el cliente, limitada a "ahora".
+    Devuelve None si no viene y lanza ValueError si no es válida.
+    """
+    if texto in (None, ''):
+        return None
+    fecha = sincronizacion.leer_fecha(str(texto))
+    if fecha is None:
+        raise ValueError(f"Fecha de captura no válida: {texto!r}.")
+    return min(fecha, timezone.now())
+
+
+def buscar(user, clave):
+    return LoteAsistencia.objects.filter(usuario=user, clave=clave).first()
+
+
+def registrar(user, clave, lote, huella_lote, respuesta):
+    return LoteAsistencia.objects.create(
+        usuario=user, clave=clave, lote=lote or '', huella=huella_lote, respuesta=respuesta,
+    )
+
+
+def purgar(dias=None):
+    """
+    Olvida los lotes más viejos que la retención. Devuelve cuántos.
+    """
+    limite = timezone.now() - (datetime.timedelta(days=dias) if dias is not None else retencion())
+    borrados, _ = LoteAsistencia.objects.filter(fecha__lt=limite).delete()
+    return borrados
@@ -0,0 +1,58 @@
+# En academia/management/commands/alumnos_en_riesgo.py (archivo nuevo)
+
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academia import riesgo
+from academia.models import Curso
+
+
+class Command(BaseCommand):
+    help = (
+        "Lista los alumnos en riesgo de no completar el curso "
+        "(racha de ausencias, faltas sin recuperar y proyección final)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--curso', type=int, help="ID del curso (por defecto, el activo).")
+        parser.add_argument('--limite', type=int, help="Solo los N alumnos más riesgosos.")
+        parser.add_argument(
+            '--todos', action='store_true', help="Incluye también a los alumnos con riesgo bajo."
+        )
+        parser.add_argument('--json', action='store_true', help="Imprime el resultado completo en JSON.")
+
+    def handle(self, *args, **options):
+        if not riesgo.disponible():
+            raise CommandError("Este comando necesita NumPy (pip install numpy).")
+
+        curso_id = options['curso']
+        if curso_id is None:
+            curso_id = Curso.objects.filter(activo=True).values_list('id', flat=True).first()
+            if curso_id is None:
+                raise CommandError("No hay un curso activo; indica uno con --curso.")
+
+        inicio = time.perf_counter()
+        data = riesgo.analizar(curso_id, incluir_bajo=options['todos'], limite=options['limite'])
+        duracion = time.perf_counter() - inicio
+
+        if options['json']:
+            self.stdout.write(json.dumps(data, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(
+            f"Curso {curso_id}: {data['clases_dictadas']} clases dictadas, "
+            f"mínimo {data['asistencia_minima']} asistencias, {data['total_alumnos']} alumnos."
+        )
+        for fila in data['alumnos']:
+            self.stdout.write(
+                f"{fila['riesgo']:.3f} {fila['nivel']:<5} "
+                f"#{fila['id']} {fila['nombres']} {fila['apellidos']} (mesa {fila['mesa']}): "
+                f"racha={fila['racha_ausencias']} deuda={fila['deuda_recuperacion']} "
+                f"proyección={fila['proyeccion_final']}"
+                + ("" if fila['puede_completar'] else " [ya no puede completar]")
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(data['alumnos'])} alumnos listados en {duracion * 1000:.0f} ms."
+        ))
@@ -0,0 +1,124 @@
+# En academia/management/commands/benchmark_api.py (archivo nuevo)
+
+import datetime
+import json
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment
+
+from academia import benchmark
+from academia.models import Alumno, Asistencia, Curso, Mesa
+
+
+def commit_actual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide rendimiento, latencia p50/p95 y consultas SQL de cada ruta de la API "
+        "sobre los datos de 'generar_datos' y guarda el resultado en JSON "
+        "(ver academia/benchmark.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=20, help="Peticiones medidas por caso.")
+        parser.add_argument('--calentamiento', type=int, default=2, help="Peticiones previas sin medir.")
+        parser.add_argument(
+            '--sin-cache', action='store_true',
+            help="Vacía el cache antes de cada petición (mide sin el cache de respuestas).",
+        )
+        parser.add_argument('--filtro', help="Solo los casos cuyo nombre o ruta contiene este texto.")
+        parser.add_argument(
+            '--salida',
+            help="Archivo JSON de resultados (por defecto benchmark-<commit>-<fecha>.json).",
+        )
+        parser.add_argument('--comparar', help="JSON de una ejecución anterior para comparar el p95.")
+
+    def handle(self, *args, **options):
+        if options['repeticiones'] < 1:
+            raise CommandError("--repeticiones debe ser al menos 1.")
+        anterior = None
+        if options['comparar']:
+            try:
+                anterior = json.loads(Path(options['comparar']).read_text(encoding='utf-8'))
+            except (OSError, ValueError) as error:
+                raise CommandError(f"No se pudo leer {options['comparar']}: {error}")
+
+        # El cliente de pruebas usa el host 'testserver'
+        try:
+            setup_test_environment()
+        except RuntimeError:
+            pass  # Ya estaba preparado (ej. desde las pruebas)
+
+        self.stdout.write(f"{'caso':<22} {'ruta':<24} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'SQL':>7}")
+        medido = benchmark.ejecutar(
+            repeticiones=options['repeticiones'],
+            calentamiento=options['calentamiento'],
+            sin_cache=options['sin_cache'],
+            filtro=options['filtro'],
+            al_medir=self.mostrar,
+        )
+        if medido is None:
+            raise CommandError("No hay datos sintéticos. Ejecuta antes 'generar_datos'.")
+        resultados, sin_caso = medido
+
+        commit = commit_actual()
+        fecha = datetime.datetime.now(datetime.timezone.utc)
+        data = {
+            'fecha': fecha.isoformat(),
+            'commit': commit,
+            'base_de_datos': connection.vendor,
+            'datos': {
+                'cursos': Curso.objects.count(),
+                'mesas': Mesa.objects.count(),
+                'alumnos': Alumno.objects.count(),
+                'asistencias': Asistencia.objects.count(),
+            },
+            'opciones': {
+                'repeticiones': options['repeticiones'],
+                'calentamiento': options['calentamiento'],
+                'sin_cache': options['sin_cache'],
+                'filtro': options['filtro'],
+            },
+            'resultados': resultados,
+            'rutas_sin_caso': sin_caso,
+        }
+        salida = Path(options['salida'] or f"benchmark-{commit or 'sin-commit'}-{fecha:%Y%m%d-%H%M%S}.json")
+        salida.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+
+        errores = [r['nombre'] for r in resultados if any(estado >= 400 for estado in r['estados'])]
+        if errores:
+            self.stdout.write(self.style.WARNING(f"Casos con errores HTTP: {', '.join(errores)}"))
+        if sin_caso:
+            self.stdout.write(self.style.WARNING(f"Rutas sin caso de benchmark: {', '.join(sin_caso)}"))
+        if anterior:
+            self.mostrar_comparacion(anterior, resultados)
+        self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {salida}"))
+
+    def mostrar(self, r):
+        self.stdout.write(
+            f"{r['nombre']:<22} {r['ruta']:<24} {r['peticiones_por_segundo'] or 0:>8} "
+            f"{r['p50_ms']:>9} {r['p95_ms']:>9} {r['consultas_min']:>3}-{r['consultas_max']:<3}"
+        )
+
+    def mostrar_comparacion(self, anterior, resultados):
+        self.stdout.write(f"\nComparado con {anterior.get('commit')} ({anterior.get('fecha')}):")
+        for nombre, p95_antes, p95_ahora, cambio, sql_antes, sql_ahora in benchmark.comparar(
+            anterior.get('resultados', []), resultados
+        ):
+            texto_cambio = f"{cambio:+.1f}%" if cambio is not None else "-"
+            self.stdout.write(
+                f"  {nombre:<22} p95 {p95_antes} -> {p95_ahora} ms ({texto_cambio}), "
+                f"SQL {sql_antes} -> {sql_ahora}"
+            )
@@ -0,0 +1,46 @@
+# En academia/management/commands/cascada.py (archivo nuevo)
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from academia import cascada
+from academia.models import Curso, Horario, Mesa
+
+MODELOS = {'curso': Curso, 'horario': Horario, 'mesa': Mesa}
+
+
+class Command(BaseCommand):
+    help = (
+        "Desactiva (o con --reactivar, reactiva) un curso, horario o mesa "
+        "junto con sus mesas y alumnos. Útil para cursos muy grandes: se "
+        "puede lanzar en segundo plano (cron, nohup, cola de tareas) en "
+        "lugar de hacerlo dentro de una petición HTTP."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('nivel', choices=sorted(MODELOS))
+        parser.add_argument('id', type=int)
+        parser.add_argument('--reactivar', action='store_true')
+
+    def handle(self, *args, **options):
+        modelo = MODELOS[options['nivel']]
+        try:
+            objeto = modelo.objects.get(pk=options['id'])
+        except modelo.DoesNotExist:
+            raise CommandError(f"No existe {options['nivel']} con id {options['id']}.")
+
+        with transaction.atomic():
+            objeto.activo = bool(options['reactivar'])
+            if hasattr(objeto, 'desactivado_por_cascada'):
+                objeto.desactivado_por_cascada = False
+            objeto.save()
+            if options['reactivar']:
+                totales = cascada.reactivar(objeto)
+            else:
+                totales = cascada.desactivar(objeto)
+
+        accion = "reactivados" if options['reactivar'] else "desactivados"
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['nivel'].capitalize()} {objeto.pk}: {totales['mesas']} mesas y "
+            f"{totales['alumnos']} alumnos {accion}."
+        ))
@@ -0,0 +1,61 @@
+# En academia/management/commands/generar_datos.py (archivo nuevo)
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academia import sinteticos
+from academia.models import TOTAL_CLASES
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera datos sintéticos para pruebas de carga: N cursos × 4 horarios × M mesas "
+        "× K alumnos × clases de asistencia (ver academia/sinteticos.py). "
+        "¡Solo en una base de datos de pruebas!"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cursos', type=int, default=1, help="Número de cursos (N).")
+        parser.add_argument('--mesas', type=int, default=5, help="Mesas por horario (M).")
+        parser.add_argument('--alumnos', type=int, default=10, help="Alumnos por mesa (K).")
+        parser.add_argument(
+            '--clases', type=int, default=TOTAL_CLASES,
+            help=f"Clases con asistencia registrada (1 a {TOTAL_CLASES}).",
+        )
+        parser.add_argument('--semilla', type=int, default=0, help="Semilla (mismos datos cada vez).")
+        parser.add_argument('--password', default='discipulado', help="Contraseña de los usuarios creados.")
+        parser.add_argument(
+            '--limpiar', action='store_true',
+            help="Borra antes los datos sintéticos de una ejecución anterior.",
+        )
+
+    def handle(self, *args, **options):
+        for opcion in ('cursos', 'mesas', 'alumnos'):
+            if options[opcion] < 1:
+                raise CommandError(f"--{opcion} debe ser al menos 1.")
+        if not 0 <= options['clases'] <= TOTAL_CLASES:
+            raise CommandError(f"--clases debe estar entre 0 y {TOTAL_CLASES}.")
+
+        if sinteticos.existen():
+            if not options['limpiar']:
+                raise CommandError("Ya hay datos sintéticos. Usa --limpiar para reemplazarlos.")
+            sinteticos.limpiar()
+            self.stdout.write("Datos sintéticos anteriores borrados.")
+
+        inicio = time.perf_counter()
+        creados = sinteticos.generar(
+            cursos=options['cursos'],
+            mesas=options['mesas'],
+            alumnos=options['alumnos'],
+            clases=options['clases'],
+            semilla=options['semilla'],
+            password=options['password'],
+        )
+        segundos = time.perf_counter() - inicio
+
+        for nombre, total in creados.items():
+            self.stdout.write(f"  {nombre}: {total}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Datos generados en {segundos:.1f} s. Admin: '{sinteticos.USUARIO_ADMIN}'."
+        ))
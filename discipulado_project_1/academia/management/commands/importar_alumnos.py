@@ -0,0 +1,74 @@
+# En academia/management/commands/importar_alumnos.py (archivo nuevo)
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academia import importar
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa alumnos desde un archivo CSV o JSON (ver academia/importar.py). "
+        "Con --simular solo valida y reporta."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help="Ruta del archivo .csv o .json.")
+        parser.add_argument('--mesa', type=int, help="Mesa para las filas que no traen 'mesa'.")
+        parser.add_argument('--horario', type=int, help="Reparte las filas sin mesa entre las mesas del horario.")
+        parser.add_argument('--simular', action='store_true', help="No guarda nada; solo reporta.")
+        parser.add_argument(
+            '--permitir-duplicados', action='store_true',
+            help="Importa también las filas que parecen duplicadas.",
+        )
+
+    def handle(self, *args, **options):
+        ruta = Path(options['archivo'])
+        if not ruta.exists():
+            raise CommandError(f"No existe el archivo {ruta}.")
+
+        try:
+            contenido = ruta.read_bytes()
+            if ruta.suffix.lower() == '.json':
+                filas = importar.leer_json(contenido)
+            else:
+                filas = importar.leer_csv(contenido)
+            reporte = importar.importar(
+                filas,
+                mesa=options['mesa'],
+                horario=options['horario'],
+                simular=options['simular'],
+                permitir_duplicados=options['permitir_duplicados'],
+            )
+        except importar.ErrorDeImportacion as e:
+            raise CommandError(str(e))
+
+        for resultado in reporte['resultados']:
+            if resultado['resultado'] == 'rechazado':
+                self.stdout.write(
+                    f"Fila {resultado['indice'] + 1}: rechazada. {self.texto_motivo(resultado['motivo'])}"
+                )
+            elif resultado['resultado'] == 'duplicado':
+                original = resultado.get('duplicado_de')
+                detalle = (
+                    f"alumno #{original}" if original
+                    else f"fila {resultado['duplicado_de_indice'] + 1}"
+                )
+                self.stdout.write(f"Fila {resultado['indice'] + 1}: posible duplicado de {detalle}.")
+
+        resumen = (
+            f"{reporte['creados']} creados, {reporte['duplicados']} duplicados, "
+            f"{reporte['rechazados']} rechazados."
+        )
+        if reporte['simulacion']:
+            resumen = f"Simulación (no se guardó nada): {resumen}"
+        self.stdout.write(self.style.SUCCESS(resumen))
+
+    def texto_motivo(self, motivo):
+        if not isinstance(motivo, dict):
+            return str(motivo)
+        return '; '.join(
+            f"{campo}: {' '.join(map(str, errores)) if isinstance(errores, list) else errores}"
+            for campo, errores in motivo.items()
+        )
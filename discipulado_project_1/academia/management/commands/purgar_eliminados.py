@@ -0,0 +1,22 @@
+# En academia/management/commands/purgar_eliminados.py (archivo nuevo)
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academia import sincronizacion
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra las lápidas de registros eliminados más viejas que la retención "
+        "(SINCRONIZACION_RETENCION_DIAS). Conviene correrlo a diario con cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, help="Retención en días (por defecto, la de settings).")
+
+    def handle(self, *args, **options):
+        dias = options['dias']
+        if dias is not None and dias < 0:
+            raise CommandError("--dias no puede ser negativo.")
+        borradas = sincronizacion.purgar(dias)
+        self.stdout.write(self.style.SUCCESS(f"Lápidas borradas: {borradas}"))
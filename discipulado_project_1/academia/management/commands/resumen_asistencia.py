@@ -0,0 +1,36 @@
+# En academia/management/commands/resumen_asistencia.py (archivo nuevo)
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academia import resumen
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye desde cero la tabla ResumenAsistencia, "
+        "o solo verifica que coincida con Asistencia (--verificar)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help="No modifica nada; solo reporta las diferencias encontradas.",
+        )
+
+    def handle(self, *args, **options):
+        if options['verificar']:
+            diferencias = resumen.verificar()
+            for clave, esperado, guardado in diferencias:
+                self.stdout.write(
+                    f"(mesa, clase, estado)={clave}: esperado={esperado} guardado={guardado}"
+                )
+            if diferencias:
+                raise CommandError(
+                    f"{len(diferencias)} diferencias. Ejecuta 'resumen_asistencia' para reconstruir."
+                )
+            self.stdout.write(self.style.SUCCESS("El resumen de asistencia está al día."))
+            return
+
+        filas = resumen.reconstruir()
+        self.stdout.write(self.style.SUCCESS(f"Resumen reconstruido: {filas} filas."))
@@ -0,0 +1,36 @@
+# En academia/management/commands/verificar_denormalizados.py (archivo nuevo)
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academia import denormalizacion
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifica que las copias facilitador/curso de Alumno y Asistencia "
+        "coincidan con sus mesas. Con --corregir las recalcula todas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--corregir',
+            action='store_true',
+            help="Recalcula (backfill) las copias de todas las filas.",
+        )
+
+    def handle(self, *args, **options):
+        if options['corregir']:
+            alumnos, asistencias = denormalizacion.sincronizar_todo()
+            self.stdout.write(self.style.SUCCESS(
+                f"Copias recalculadas: {alumnos} alumnos, {asistencias} asistencias."
+            ))
+            return
+
+        alumnos, asistencias = denormalizacion.inconsistencias()
+        total_alumnos, total_asistencias = alumnos.count(), asistencias.count()
+        if total_alumnos or total_asistencias:
+            raise CommandError(
+                f"{total_alumnos} alumnos y {total_asistencias} asistencias con copias "
+                "desactualizadas. Ejecuta 'verificar_denormalizados --corregir'."
+            )
+        self.stdout.write(self.style.SUCCESS("Las copias facilitador/curso están al día."))
@@ -0,0 +1,258 @@
+# En academia/metricas.py (archivo nuevo)
+
+"""
+Métricas de la API: latencia, consultas SQL, tiempo de serialización y
+tamaño de la respuesta de cada ruta.
+
+- MetricasMiddleware mide cada petición (una fracción de ellas, ver
+  METRICAS_MUESTREO) y cuenta las consultas SQL y su tiempo con un
+  execute_wrapper de la conexión.
+- MetricasSerializerMixin (en los serializers) suma el tiempo de
+  to_representation del serializer principal de la respuesta. Incluye
+  las consultas que se hagan mientras se serializa.
+- Los valores se acumulan en histogramas en memoria, con el nombre de
+  la ruta como etiqueta (ej. "alumno-detail", "dashboard-stats"), y
+  se exponen en formato de texto de Prometheus en GET /metricas/
+  (solo Admins).
+- Cada petición medida deja además una línea JSON en el logger
+  'academia.metricas' (WARNING si pasa de METRICAS_LENTO_MS).
+
+Con METRICAS_MUESTREO=0 el middleware solo hace una comparación por
+petición. Los histogramas son de cada proceso: con varios workers,
+Prometheus tiene que consultar cada uno (o sumar en el servidor).
+Las respuestas en streaming (exportaciones) miden solo hasta el primer
+byte y no reportan tamaño.
+"""
+
+import bisect
+import contextvars
+import json
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.serializers import ListSerializer
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = 'discipulado'
+
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LIMITES_CONSULTAS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+LIMITES_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Medición de la petición en curso (None si no se está midiendo)
+medicion_actual = contextvars.ContextVar('medicion_actual', default=None)
+
+
+def muestreo():
+    return getattr(settings, 'METRICAS_MUESTREO', 1.0)
+
+
+# --- Registro en memoria ---
+
+def escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def formatear_etiquetas(nombres, valores, extra=''):
+    pares = [f'{nombre}="{escapar(valor)}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+class Contador:
+    def __init__(self, nombre, ayuda, etiquetas):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.valores = {}
+        self.candado = threading.Lock()
+
+    def sumar(self, etiquetas, valor=1):
+        with self.candado:
+            self.valores[etiquetas] = self.valores.get(etiquetas, 0) + valor
+
+    def lineas(self):
+        yield f'# HELP {self.nombre} {self.ayuda}'
+        yield f'# TYPE {self.nombre} counter'
+        with self.candado:
+            valores = sorted(self.valores.items())
+        for etiquetas, valor in valores:
+            yield f'{self.nombre}{formatear_etiquetas(self.etiquetas, etiquetas)} {valor}'
+
+
+class Histograma:
+    def __init__(self, nombre, ayuda, etiquetas, limites):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.limites = limites
+        # etiquetas -> [conteo por cubeta (la última es +Inf), suma, total]
+        self.series = {}
+        self.candado = threading.Lock()
+
+    def observar(self, etiquetas, valor):
+        cubeta = bisect.bisect_left(self.limites, valor)
+        with self.candado:
+            serie = self.series.get(etiquetas)
+            if serie is None:
+                serie = self.series[etiquetas] = [[0] * (len(self.limites) + 1), 0, 0]
+            serie[0][cubeta] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def lineas(self):
+        yield f'# HELP {self.nombre} {self.ayuda}'
+        yield f'# TYPE {self.nombre} histogram'
+        with self.candado:
+            series = sorted((etiquetas, [list(s[0]), s[1], s[2]]) for etiquetas, s in self.series.items())
+        for etiquetas, (cubetas, suma, total) in series:
+            acumulado = 0
+            for limite, conteo in zip(self.limites + ('+Inf',), cubetas):
+                acumulado += conteo
+                le = formatear_etiquetas(self.etiquetas, etiquetas, f'le="{limite}"')
+                yield f'{self.nombre}_bucket{le} {acumulado}'
+            base = formatear_etiquetas(self.etiquetas, etiquetas)
+            yield f'{self.nombre}_sum{base} {round(suma, 6)}'
+            yield f'{self.nombre}_count{base} {total}'
+
+
+RUTA = ('route', 'method')
+
+PETICIONES = Contador(
+    f'{PREFIJO}_http_requests_total', "Peticiones medidas por ruta, método y código.",
+    ('route', 'method', 'status'),
+)
+LATENCIA = Histograma(
+    f'{PREFIJO}_http_request_duration_seconds', "Duración de la petición.", RUTA, LIMITES_SEGUNDOS,
+)
+CONSULTAS = Histograma(
+    f'{PREFIJO}_db_queries_per_request', "Consultas SQL por petición.", RUTA, LIMITES_CONSULTAS,
+)
+TIEMPO_SQL = Histograma(
+    f'{PREFIJO}_db_duration_seconds', "Tiempo total en consultas SQL por petición.", RUTA, LIMITES_SEGUNDOS,
+)
+TIEMPO_SERIALIZACION = Histograma(
+    f'{PREFIJO}_serializer_duration_seconds', "Tiempo en los serializers por petición.", RUTA, LIMITES_SEGUNDOS,
+)
+TAMANO = Histograma(
+    f'{PREFIJO}_http_response_size_bytes', "Tamaño del cuerpo de la respuesta.", RUTA, LIMITES_BYTES,
+)
+METRICAS = (PETICIONES, LATENCIA, CONSULTAS, TIEMPO_SQL, TIEMPO_SERIALIZACION, TAMANO)
+
+
+def texto_prometheus():
+    lineas = [
+        f'# HELP {PREFIJO}_metricas_muestreo Fracción de las peticiones que se miden.',
+        f'# TYPE {PREFIJO}_metricas_muestreo gauge',
+        f'{PREFIJO}_metricas_muestreo {muestreo()}',
+    ]
+    for metrica in METRICAS:
+        lineas.extend(metrica.lineas())
+    return '\n'.join(lineas) + '\n'
+
+
+# --- Medición de una petición ---
+
+class Medicion:
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_sql = 0.0
+        self.tiempo_serializacion = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper: se llama en cada consulta
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas += 1
+            self.tiempo_sql += time.perf_counter() - inicio
+
+
+def ruta_de(request):
+    coincidencia = getattr(request, 'resolver_match', None)
+    if coincidencia is None:
+        # Sin ruta (404): una sola etiqueta para no crear series sin fin
+        return 'sin_ruta'
+    return coincidencia.view_name or coincidencia.route
+
+
+def registrar(request, response, medicion, duracion):
+    ruta = ruta_de(request)
+    etiquetas = (ruta, request.method)
+    tamano = None if response.streaming else len(response.content)
+
+    PETICIONES.sumar((ruta, request.method, str(response.status_code)))
+    LATENCIA.observar(etiquetas, duracion)
+    CONSULTAS.observar(etiquetas, medicion.consultas)
+    TIEMPO_SQL.observar(etiquetas, medicion.tiempo_sql)
+    TIEMPO_SERIALIZACION.observar(etiquetas, medicion.tiempo_serializacion)
+    if tamano is not None:
+        TAMANO.observar(etiquetas, tamano)
+
+    datos = {
+        'ruta': ruta,
+        'metodo': request.method,
+        'estado': response.status_code,
+        'duracion_ms': round(duracion * 1000, 2),
+        'consultas': medicion.consultas,
+        'sql_ms': round(medicion.tiempo_sql * 1000, 2),
+        'serializacion_ms': round(medicion.tiempo_serializacion * 1000, 2),
+        'bytes': tamano,
+        'usuario': getattr(getattr(request, 'user', None), 'pk', None),
+    }
+    lento = duracion * 1000 >= getattr(settings, 'METRICAS_LENTO_MS', 1000)
+    logger.log(logging.WARNING if lento else logging.INFO, json.dumps(datos))
+
+
+class MetricasMiddleware:
+    """
+    Mide una fracción (METRICAS_MUESTREO) de las peticiones.
+    Va primero en MIDDLEWARE para incluir a todos los demás.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        fraccion = muestreo()
+        if fraccion <= 0 or (fraccion < 1 and random.random() >= fraccion):
+            return self.get_response(request)
+
+        medicion = Medicion()
+        token = medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            with connection.execute_wrapper(medicion):
+                response = self.get_response(request)
+        finally:
+            medicion_actual.reset(token)
+        registrar(request, response, medicion, time.perf_counter() - inicio)
+        return response
+
+
+class MetricasSerializerMixin:
+    """
+    Para serializers: suma a la medición en curso el tiempo de
+    to_representation del serializer principal (o de cada elemento de
+    la lista principal). Los serializers anidados ya quedan incluidos.
+    """
+
+    def to_representation(self, instance):
+        medicion = medicion_actual.get()
+        principal = self.parent is None or (
+            isinstance(self.parent, ListSerializer) and self.parent.parent is None
+        )
+        if medicion is None or not principal:
+            return super().to_representation(instance)
+        inicio = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            medicion.tiempo_serializacion += time.perf_counter() - inicio
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academia', '0005_alumno_areas_mejorar_alumno_bautizado_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alumno',
+            index=models.Index(fields=['mesa', 'activo'], name='alumno_mesa_activo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=models.Index(fields=['numero_clase', 'alumno'], name='asist_clase_alumno_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=models.Index(fields=['numero_clase', 'estado'], name='asist_clase_estado_idx'),
+        ),
+    ]
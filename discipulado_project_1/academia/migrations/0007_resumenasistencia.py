@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def llenar_resumen(apps, schema_editor):
+    """
+    Llena la tabla de resumen con las asistencias que ya existen.
+    """
+    Asistencia = apps.get_model('academia', 'Asistencia')
+    ResumenAsistencia = apps.get_model('academia', 'ResumenAsistencia')
+
+    filas = Asistencia.objects.values(
+        'alumno__mesa_id',
+        'alumno__mesa__horario_id',
+        'alumno__mesa__horario__curso_id',
+        'numero_clase',
+        'estado',
+    ).annotate(total=Count('id')).order_by()
+
+    ResumenAsistencia.objects.bulk_create([
+        ResumenAsistencia(
+            mesa_id=f['alumno__mesa_id'],
+            horario_id=f['alumno__mesa__horario_id'],
+            curso_id=f['alumno__mesa__horario__curso_id'],
+            numero_clase=f['numero_clase'],
+            estado=f['estado'],
+            total=f['total'],
+        )
+        for f in filas
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academia', '0006_asistencia_indices'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenAsistencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numero_clase', models.PositiveSmallIntegerField()),
+                ('estado', models.CharField(choices=[('A', 'Asistió'), ('F', 'Faltó'), ('R', 'Recuperó'), ('D', 'Adelantó')], max_length=1)),
+                ('total', models.IntegerField(default=0)),
+                ('curso', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='academia.curso')),
+                ('horario', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='academia.horario')),
+                ('mesa', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='academia.mesa')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['numero_clase', 'estado'], name='resumen_clase_estado_idx')],
+                'constraints': [models.UniqueConstraint(fields=('mesa', 'numero_clase', 'estado'), name='resumen_mesa_clase_estado_uniq', nulls_distinct=False)],
+            },
+        ),
+        migrations.RunPython(llenar_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def llenar_copias(apps, schema_editor):
+    """
+    Copia facilitador/curso de la mesa a cada alumno, y del alumno
+    a cada asistencia.
+    """
+    Mesa = apps.get_model('academia', 'Mesa')
+    Alumno = apps.get_model('academia', 'Alumno')
+    Asistencia = apps.get_model('academia', 'Asistencia')
+
+    mesa = Mesa.objects.filter(pk=OuterRef('mesa_id'))
+    Alumno.objects.update(
+        facilitador_id=Subquery(mesa.values('facilitador_id')[:1]),
+        curso_id=Subquery(mesa.values('horario__curso_id')[:1]),
+    )
+    alumno = Alumno.objects.filter(pk=OuterRef('alumno_id'))
+    Asistencia.objects.update(
+        facilitador_id=Subquery(alumno.values('facilitador_id')[:1]),
+        curso_id=Subquery(alumno.values('curso_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academia', '0007_resumenasistencia'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumno',
+            name='curso',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='academia.curso'),
+        ),
+        migrations.AddField(
+            model_name='alumno',
+            name='facilitador',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='asistencia',
+            name='curso',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='academia.curso'),
+        ),
+        migrations.AddField(
+            model_name='asistencia',
+            name='facilitador',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='alumno',
+            index=models.Index(fields=['facilitador', 'activo'], name='alumno_facilitador_activo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=models.Index(fields=['facilitador', 'numero_clase'], name='asist_facilitador_clase_idx'),
+        ),
+        migrations.RunPython(llenar_copias, migrations.RunPython.noop),
+    ]
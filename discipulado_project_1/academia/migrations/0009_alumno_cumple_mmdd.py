@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:13
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import ExtractDay, ExtractMonth
+
+
+def llenar_cumple(apps, schema_editor):
+    Alumno = apps.get_model('academia', 'Alumno')
+    Alumno.objects.update(
+        cumple_mmdd=ExtractMonth('fecha_nacimiento') * 100 + ExtractDay('fecha_nacimiento')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academia', '0008_facilitador_curso_denormalizados'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumno',
+            name='cumple_mmdd',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='alumno',
+            index=models.Index(fields=['activo', 'cumple_mmdd'], name='alumno_activo_cumple_idx'),
+        ),
+        migrations.RunPython(llenar_cumple, migrations.RunPython.noop),
+    ]
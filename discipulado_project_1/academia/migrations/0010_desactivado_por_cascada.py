@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academia', '0009_alumno_cumple_mmdd'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumno',
+            name='desactivado_por_cascada',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='mesa',
+            name='desactivado_por_cascada',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
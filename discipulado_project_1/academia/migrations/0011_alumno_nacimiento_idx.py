@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academia', '0010_desactivado_por_cascada'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alumno',
+            index=models.Index(fields=['fecha_nacimiento'], name='alumno_nacimiento_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Índice de trigramas para la búsqueda de alumnos (ver academia/busqueda.py).
+# Solo aplica en PostgreSQL; en otras bases no hace nada.
+
+from django.db import migrations
+
+CREAR_FUNCION = """
+CREATE OR REPLACE FUNCTION academia_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+"""
+
+# unaccent() no es IMMUTABLE y no se puede usar en un índice; la
+# función de arriba la envuelve con el diccionario fijo para que sí.
+CREAR_INDICE = """
+CREATE INDEX IF NOT EXISTS alumno_busqueda_trgm_idx ON academia_alumno USING gin (
+    academia_unaccent(lower(nombres)) gin_trgm_ops,
+    academia_unaccent(lower(apellidos)) gin_trgm_ops,
+    academia_unaccent(lower(telefono)) gin_trgm_ops,
+    academia_unaccent(lower(colonia)) gin_trgm_ops
+)
+"""
+
+
+def crear(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+    schema_editor.execute(CREAR_FUNCION)
+    schema_editor.execute(CREAR_INDICE)
+
+
+def borrar(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS alumno_busqueda_trgm_idx')
+    schema_editor.execute('DROP FUNCTION IF EXISTS academia_unaccent(text)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academia', '0011_alumno_nacimiento_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear, borrar),
+    ]
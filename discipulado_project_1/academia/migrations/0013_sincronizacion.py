@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academia', '0012_busqueda_trigramas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroEliminado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=20)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('motivo', models.CharField(choices=[('borrado', 'Borrado'), ('reasignado', 'Reasignado a otro facilitador')], default='borrado', max_length=10)),
+                ('fecha', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='alumno',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='asistencia',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='horario',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='mesa',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='alumno',
+            index=models.Index(fields=['facilitador', 'actualizado'], name='alumno_fac_actualizado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alumno',
+            index=models.Index(fields=['actualizado'], name='alumno_actualizado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=models.Index(fields=['facilitador', 'actualizado'], name='asist_fac_actualizado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=models.Index(fields=['actualizado'], name='asist_actualizado_idx'),
+        ),
+        migrations.AddField(
+            model_name='registroeliminado',
+            name='facilitador',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academia', '0014_lotes_asistencia'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='resumenasistencia',
+            name='resumen_mesa_clase_estado_uniq',
+        ),
+        migrations.AddConstraint(
+            model_name='resumenasistencia',
+            constraint=models.UniqueConstraint(fields=('mesa', 'numero_clase', 'estado'), name='resumen_mesa_clase_estado_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='resumenasistencia',
+            constraint=models.UniqueConstraint(condition=models.Q(('mesa__isnull', True)), fields=('numero_clase', 'estado'), name='resumen_sin_mesa_clase_estado_uniq'),
+        ),
+    ]
@@ -3,6 +3,9 @@
 from django.db import models
 from django.conf import settings # Para relacionar con nuestro CustomUser
 
+# Cada curso tiene 23 clases (numero_clase va de 1 a 23)
+TOTAL_CLASES = 23
+
 # Modelo 1: Curso (El contenedor más grande)
 class Curso(models.Model):
     nombre = models.CharField(max_length=100) # Ej: "Discipulado 2025 - Semestre 1"
@@ -40,6 +43,8 @@ class Horario(models.Model):
     hora = models.TimeField() # Ej: 19:00, 09:00, 11:00, 13:00
     
     activo = models.BooleanField(default=True) # <-- AÑADE ESTA LÍNEA
+    # Última modificación, para la sincronización incremental (ver academia/sincronizacion.py)
+    actualizado = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         # Texto descriptivo, ej: "Discipulado 2025 - S1 - Miércoles 19:00"
@@ -57,6 +62,9 @@ class Mesa(models.Model):
     )
     nombre_mesa = models.CharField(max_length=100, blank=True) # Ej: "Mesa 1"
     activo = models.BooleanField(default=True)
+    # True si se desactivó porque se desactivó su horario/curso (ver academia/cascada.py)
+    desactivado_por_cascada = models.BooleanField(default=False, editable=False)
+    actualizado = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         # Ej: "Mesa de [Facilitador] (Miércoles 19:00)"
@@ -87,12 +95,60 @@ class Alumno(models.Model):
     numero_casa = models.CharField(max_length=20, blank=True)
     
     activo = models.BooleanField(default=True) # Si el alumno sigue en el curso
+    # True si se desactivó porque se desactivó su mesa/horario/curso (ver academia/cascada.py)
+    desactivado_por_cascada = models.BooleanField(default=False, editable=False)
     
     meta_personal = models.CharField(max_length=255, blank=True, default='')
     testimonio = models.TextField(blank=True, default='')
     areas_mejorar = models.CharField(max_length=255, blank=True, default='')
     bautizado = models.BooleanField(default=False)
 
+    # Copias de mesa.facilitador y mesa.horario.curso, para filtrar por
+    # facilitador o curso sin joins. Se mantienen solas (ver
+    # academia/denormalizacion.py); no se editan directamente.
+    facilitador = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        editable=False,
+        related_name='+'
+    )
+    curso = models.ForeignKey(Curso, on_delete=models.SET_NULL, null=True, editable=False, related_name='+')
+
+    # Mes y día de nacimiento como número MMDD (ej. 14 de marzo = 314).
+    # Se calcula solo al guardar; permite buscar cumpleaños con un índice
+    # en lugar de aplicar funciones sobre 'fecha_nacimiento' en cada fila.
+    cumple_mmdd = models.PositiveSmallIntegerField(null=True, editable=False)
+
+    # Última modificación. OJO: .update() no lo cambia solo; las
+    # operaciones en bloque lo ponen a mano (ver academia/sincronizacion.py)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Listas de alumnos de una mesa (activos primero)
+            models.Index(fields=['mesa', 'activo'], name='alumno_mesa_activo_idx'),
+            models.Index(fields=['facilitador', 'activo'], name='alumno_facilitador_activo_idx'),
+            # Cumpleaños de alumnos activos en un rango de fechas
+            models.Index(fields=['activo', 'cumple_mmdd'], name='alumno_activo_cumple_idx'),
+            # Detección de duplicados al importar (mismos nombres + fecha de nacimiento)
+            models.Index(fields=['fecha_nacimiento'], name='alumno_nacimiento_idx'),
+            # Sincronización incremental (?since=) de un facilitador o de todo
+            models.Index(fields=['facilitador', 'actualizado'], name='alumno_fac_actualizado_idx'),
+            models.Index(fields=['actualizado'], name='alumno_actualizado_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """
+        Mantiene 'cumple_mmdd' al día con 'fecha_nacimiento'.
+        """
+        fecha = self._meta.get_field('fecha_nacimiento').to_python(self.fecha_nacimiento)
+        self.cumple_mmdd = fecha.month * 100 + fecha.day if fecha else None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'fecha_nacimiento' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'cumple_mmdd'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.nombres} {self.apellidos}"
 
@@ -121,10 +177,128 @@ class Asistencia(models.Model):
         null=True
     )
 
+    # Copias de alumno.facilitador y alumno.curso (ver Alumno)
+    facilitador = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        editable=False,
+        related_name='+'
+    )
+    curso = models.ForeignKey(Curso, on_delete=models.SET_NULL, null=True, editable=False, related_name='+')
+    # Última modificación (ver Alumno.actualizado)
+    actualizado = models.DateTimeField(auto_now=True)
+    # Cuándo se capturó el estado actual en el dispositivo del facilitador
+    # (puede ser días antes de llegar al servidor). 'bulk_upsert' no
+    # sobrescribe un registro con una captura más vieja (ver academia/lotes.py).
+    capturado = models.DateTimeField(null=True, blank=True, editable=False)
+
     class Meta:
         # Creamos un índice único para evitar duplicados:
         # Un alumno no puede tener dos registros para la misma "numero_clase"
         unique_together = ('alumno', 'numero_clase')
+        # El índice único de arriba ya cubre las búsquedas por 'alumno'.
+        # Estos cubren las consultas "por clase" (pantalla de asistencia
+        # y dashboard), que siempre filtran primero por numero_clase.
+        indexes = [
+            models.Index(fields=['numero_clase', 'alumno'], name='asist_clase_alumno_idx'),
+            models.Index(fields=['numero_clase', 'estado'], name='asist_clase_estado_idx'),
+            models.Index(fields=['facilitador', 'numero_clase'], name='asist_facilitador_clase_idx'),
+            models.Index(fields=['facilitador', 'actualizado'], name='asist_fac_actualizado_idx'),
+            models.Index(fields=['actualizado'], name='asist_actualizado_idx'),
+        ]
+
+    def __str__(self):
+        return f"Clase {self.numero_clase} - {self.alumno.nombres} ({self.get_estado_display()})"
+
+# Modelo 6: ResumenAsistencia (tabla de conteos pre-calculados)
+class ResumenAsistencia(models.Model):
+    """
+    Cuántas asistencias hay por mesa, número de clase y estado.
+    Se mantiene al día con cada escritura de Asistencia (ver
+    academia/resumen.py y academia/signals.py) para que el dashboard
+    lea unas pocas filas en lugar de agrupar toda la tabla.
+
+    'horario' y 'curso' son copias de los de la mesa, para poder
+    filtrar sin joins. 'mesa' es NULL para alumnos sin mesa.
+    """
+    curso = models.ForeignKey(Curso, on_delete=models.CASCADE, null=True, related_name='+')
+    horario = models.ForeignKey(Horario, on_delete=models.CASCADE, null=True, related_name='+')
+    mesa = models.ForeignKey(Mesa, on_delete=models.CASCADE, null=True, related_name='+')
+    numero_clase = models.PositiveSmallIntegerField()
+    estado = models.CharField(max_length=1, choices=Asistencia.Estado.choices)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        # Una fila por (mesa, clase, estado), también para mesa NULL. Son
+        # dos restricciones (la segunda parcial) en lugar de una con
+        # nulls_distinct=False, que SQLite no soporta.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['mesa', 'numero_clase', 'estado'],
+                name='resumen_mesa_clase_estado_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['numero_clase', 'estado'],
+                condition=models.Q(mesa__isnull=True),
+                name='resumen_sin_mesa_clase_estado_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['numero_clase', 'estado'], name='resumen_clase_estado_idx'),
+        ]
+
+    def __str__(self):
+        return f"Clase {self.numero_clase} - Mesa {self.mesa_id} - {self.estado}: {self.total}"
+
+# Modelo 7: RegistroEliminado ("lápidas" para la sincronización incremental)
+class RegistroEliminado(models.Model):
+    """
+    Deja constancia de que un registro ya no está para un facilitador:
+    se borró de verdad, o pasó a otro facilitador (reasignado). Las
+    desactivaciones (activo=False) no necesitan lápida: el registro
+    sigue existiendo y aparece como actualizado.
+    Ver academia/sincronizacion.py.
+    """
+    class Motivo(models.TextChoices):
+        BORRADO = 'borrado', 'Borrado'
+        REASIGNADO = 'reasignado', 'Reasignado a otro facilitador'
+
+    modelo = models.CharField(max_length=20) # 'alumno', 'asistencia', 'mesa' u 'horario'
+    objeto_id = models.PositiveBigIntegerField()
+    # A quién le "desaparece" (NULL = a todos)
+    facilitador = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='+'
+    )
+    motivo = models.CharField(max_length=10, choices=Motivo.choices, default=Motivo.BORRADO)
+    fecha = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.modelo} #{self.objeto_id} ({self.motivo})"
+
+
+# Modelo 8: LoteAsistencia (lotes de 'bulk_upsert' ya aplicados)
+class LoteAsistencia(models.Model):
+    """
+    Registro de los lotes de asistencia ya aplicados, por usuario y clave
+    de idempotencia, con la respuesta que se devolvió. Si el cliente
+    reenvía el lote (reintento tras perder la conexión) se le devuelve la
+    misma respuesta sin volver a escribir. Ver academia/lotes.py.
+    """
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    clave = models.CharField(max_length=100)
+    lote = models.CharField(max_length=100, blank=True) # Id del lote en el cliente
+    huella = models.CharField(max_length=64) # sha256 del contenido enviado
+    respuesta = models.JSONField()
+    fecha = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'clave'], name='lote_usuario_clave_uniq'),
+        ]
 
     def __str__(self):
-        return f"Clase {self.numero_clase} - {self.alumno.nombres} ({self.get_estado_display()})"
\ No newline at end of file
+        return f"Lote {self.clave} ({self.usuario_id})"
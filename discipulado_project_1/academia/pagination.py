@@ -0,0 +1,177 @@
+# En academia/pagination.py (archivo nuevo)
+
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por "cursor" (keyset) que respeta el 'order_by' que ya
+    define cada ViewSet (ej. '-activo', 'apellidos').
+
+    En lugar de OFFSET, cada página guarda los valores de orden del último
+    registro y la siguiente consulta pide "los que vienen después de esos
+    valores". Así el costo de cada página no crece con el historial.
+
+    Modo de compatibilidad: si el cliente NO manda '?page_size=' ni
+    '?cursor=', se devuelve la lista completa como antes (a menos que
+    settings.PAGINACION_OBLIGATORIA sea True). Así el frontend actual
+    sigue funcionando mientras migra.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if not getattr(settings, 'PAGINACION_OBLIGATORIA', False) and \
+                self.cursor_query_param not in params and \
+                self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        cursor = self.decode_cursor(params.get(self.cursor_query_param))
+        self.reverse = bool(cursor and cursor.get('r'))
+
+        ordering = self.ordering
+        if self.reverse:
+            # Para ir hacia atrás invertimos el orden y luego la página
+            ordering = [self.invert(campo) for campo in ordering]
+            queryset = queryset.order_by(*ordering)
+
+        if cursor:
+            queryset = queryset.filter(self.after(ordering, cursor['v']))
+
+        # Pedimos un registro de más para saber si hay otra página
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    # --- Helpers ---
+
+    def get_page_size(self, request):
+        page_size = getattr(settings, 'REST_FRAMEWORK', {}).get('PAGE_SIZE') or 50
+        valor = request.query_params.get(self.page_size_query_param)
+        if valor:
+            try:
+                page_size = int(valor)
+            except ValueError:
+                pass
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering(self, queryset):
+        """
+        Toma el orden del queryset y le añade 'id' como desempate,
+        para que cada registro tenga una posición única y estable.
+        """
+        ordering = [str(campo) for campo in queryset.query.order_by]
+        if not ordering:
+            ordering = list(queryset.model._meta.ordering or [])
+        nombres = {campo.lstrip('-') for campo in ordering}
+        if not nombres & {'id', 'pk'}:
+            ordering.append('id')
+        return ordering
+
+    def invert(self, campo):
+        return campo[1:] if campo.startswith('-') else '-' + campo
+
+    def after(self, ordering, valores):
+        """
+        Construye el filtro "(a, b, id) > (va, vb, vid)" respetando la
+        dirección de cada campo:
+            a > va  OR  (a = va AND b > vb)  OR  (a = va AND b = vb AND id > vid)
+        """
+        filtro = Q()
+        iguales = {}
+        for campo, valor in zip(ordering, valores):
+            nombre = campo.lstrip('-')
+            lookup = 'lt' if campo.startswith('-') else 'gt'
+            filtro |= Q(**iguales, **{f'{nombre}__{lookup}': valor})
+            iguales[nombre] = valor
+        return filtro
+
+    def valores_de(self, obj):
+        valores = []
+        for campo in self.ordering:
+            nombre = campo.lstrip('-')
+            valor = getattr(obj, 'pk' if nombre == 'pk' else nombre)
+            if hasattr(valor, 'isoformat'):
+                valor = valor.isoformat()
+            valores.append(valor)
+        return valores
+
+    def encode_cursor(self, obj, reverse):
+        payload = {'v': self.valores_de(obj)}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    def decode_cursor(self, encoded):
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if len(cursor['v']) != len(self.ordering):
+                raise ValueError
+            return cursor
+        except (TypeError, ValueError, KeyError):
+            raise NotFound("Cursor no válido.")
+
+    def build_link(self, cursor):
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        if cursor is None:
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.build_link(self.encode_cursor(self.page[-1], reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return self.build_link(None)
+        return self.build_link(self.encode_cursor(self.page[0], reverse=True))
@@ -38,16 +38,11 @@ class IsFacilitadorOwnerOrAdmin(permissions.BasePermission):
         if request.user.role == 'ADMIN':
             return True
         
-        # Si el objeto es una 'Mesa', verificamos si el facilitador es el dueño
-        if hasattr(obj, 'facilitador'):
-            return obj.facilitador == request.user
-        
-        # Si el objeto es un 'Alumno', verificamos la mesa del alumno
-        if hasattr(obj, 'mesa'):
-            return obj.mesa.facilitador == request.user
-
-        # Si el objeto es 'Asistencia', verificamos el alumno
-        if hasattr(obj, 'alumno'):
-            return obj.alumno.mesa.facilitador == request.user
-
-        return False
\ No newline at end of file
+        # Mesa, Alumno y Asistencia guardan el id de su facilitador en la
+        # misma fila (en Alumno/Asistencia es una copia, ver
+        # academia/denormalizacion.py), así que no hace falta recorrer
+        # obj.alumno.mesa.facilitador con consultas extra.
+        if hasattr(obj, 'facilitador_id'):
+            return obj.facilitador_id == request.user.pk
+
+        return False
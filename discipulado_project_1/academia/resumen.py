@@ -0,0 +1,191 @@
+# En academia/resumen.py (archivo nuevo)
+
+"""
+Mantenimiento de la tabla ResumenAsistencia.
+
+Cada cambio en Asistencia se traduce en "deltas": un Counter con
+{(mesa_id, numero_clase, estado): +n / -n}. Se aplican todos juntos
+con un "upsert" (INSERT ... ON CONFLICT DO UPDATE SET total = total + n).
+"""
+
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from .models import Asistencia, Horario, Mesa, ResumenAsistencia
+
+
+def aplicar_deltas(deltas):
+    """
+    Suma (o resta) los conteos de 'deltas' en la tabla de resumen.
+    Las claves con delta 0 se ignoran.
+
+    Es un solo INSERT ... ON CONFLICT DO UPDATE SET total = total + n
+    para todas las claves (dos si hay claves con mesa NULL, que tienen
+    su propia restricción única): las filas que faltan se crean con el
+    horario/curso de su mesa y las que existen se suman en la base, sin
+    leerlas antes, así dos peticiones a la vez no se pisan.
+    """
+    grupos = {CONFLICTO_CON_MESA: [], CONFLICTO_SIN_MESA: []}
+    for clave, n in deltas.items():
+        if n:
+            grupos[CONFLICTO_SIN_MESA if clave[0] is None else CONFLICTO_CON_MESA].append((clave, n))
+    for conflicto, grupo in grupos.items():
+        for inicio in range(0, len(grupo), LOTE_DELTAS):
+            sumar(grupo[inicio:inicio + LOTE_DELTAS], conflicto)
+
+
+# Las dos restricciones únicas de ResumenAsistencia (ver models.py)
+CONFLICTO_CON_MESA = '(mesa_id, numero_clase, estado)'
+CONFLICTO_SIN_MESA = '(numero_clase, estado) WHERE mesa_id IS NULL'
+
+# Claves por sentencia (4 parámetros cada una)
+LOTE_DELTAS = 200
+
+
+def sumar(deltas, conflicto):
+    tabla = connection.ops.quote_name(ResumenAsistencia._meta.db_table)
+    mesas = connection.ops.quote_name(Mesa._meta.db_table)
+    horarios = connection.ops.quote_name(Horario._meta.db_table)
+    valores = ', '.join(['(CAST(%s AS bigint), CAST(%s AS integer), %s, CAST(%s AS integer))'] * len(deltas))
+    parametros = [
+        valor
+        for (mesa_id, numero_clase, estado), n in deltas
+        for valor in (mesa_id, numero_clase, estado, n)
+    ]
+    # 'WHERE 1 = 1': SQLite lo exige en un INSERT ... SELECT con ON CONFLICT
+    sql = f"""
+        WITH deltas (mesa_id, numero_clase, estado, n) AS (VALUES {valores})
+        INSERT INTO {tabla} (mesa_id, horario_id, curso_id, numero_clase, estado, total)
+        SELECT d.mesa_id, m.horario_id, h.curso_id, d.numero_clase, d.estado, d.n
+        FROM deltas d
+        LEFT JOIN {mesas} m ON m.id = d.mesa_id
+        LEFT JOIN {horarios} h ON h.id = m.horario_id
+        WHERE 1 = 1
+        ON CONFLICT {conflicto} DO UPDATE SET total = {tabla}.total + EXCLUDED.total
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, parametros)
+
+
+def deltas_de_alumno(alumno_id, mesa_anterior_id, mesa_nueva_id):
+    """
+    Si un alumno cambia de mesa, todas sus asistencias pasan de contar
+    en la mesa anterior a contar en la nueva.
+    """
+    deltas = Counter()
+    asistencias = Asistencia.objects.filter(alumno_id=alumno_id).values_list('numero_clase', 'estado')
+    for numero_clase, estado in asistencias:
+        deltas[(mesa_anterior_id, numero_clase, estado)] -= 1
+        deltas[(mesa_nueva_id, numero_clase, estado)] += 1
+    return deltas
+
+
+def mover_mesa(mesa):
+    """
+    Si una mesa cambia de horario, actualiza las copias de horario/curso.
+    """
+    ResumenAsistencia.objects.filter(mesa=mesa).update(
+        horario_id=mesa.horario_id,
+        curso_id=mesa.horario.curso_id,
+    )
+
+
+def conteos_de_mesa(mesa_id):
+    """
+    Counter {(numero_clase, estado): total} de una mesa, leído del resumen.
+    """
+    return Counter({
+        (numero_clase, estado): total
+        for numero_clase, estado, total in ResumenAsistencia.objects.filter(
+            mesa_id=mesa_id, total__gt=0
+        ).values_list('numero_clase', 'estado', 'total')
+    })
+
+
+def quitar_mesa(mesa_id, conteos):
+    """
+    Si se borra una mesa, sus alumnos quedan sin mesa (SET_NULL): sus
+    asistencias ('conteos', leídos antes del borrado) pasan a contar en
+    las filas con mesa NULL, y las filas de la mesa desaparecen.
+    """
+    ResumenAsistencia.objects.filter(mesa_id=mesa_id).delete()
+    aplicar_deltas(Counter({
+        (None, numero_clase, estado): total for (numero_clase, estado), total in conteos.items()
+    }))
+
+
+def mover_horario(horario):
+    """
+    Si un horario cambia de curso, actualiza la copia de curso.
+    """
+    ResumenAsistencia.objects.filter(horario=horario).update(curso_id=horario.curso_id)
+
+
+def calcular_desde_cero():
+    """
+    Calcula el resumen completo directamente desde Asistencia.
+    Devuelve {(mesa_id, numero_clase, estado): (horario_id, curso_id, total)}.
+    """
+    filas = Asistencia.objects.values(
+        'alumno__mesa_id',
+        'alumno__mesa__horario_id',
+        'alumno__mesa__horario__curso_id',
+        'numero_clase',
+        'estado',
+    ).annotate(total=Count('id')).order_by()
+
+    return {
+        (f['alumno__mesa_id'], f['numero_clase'], f['estado']): (
+            f['alumno__mesa__horario_id'],
+            f['alumno__mesa__horario__curso_id'],
+            f['total'],
+        )
+        for f in filas
+    }
+
+
+def reconstruir():
+    """
+    Borra y vuelve a llenar toda la tabla de resumen.
+    Devuelve cuántas filas se crearon.
+    """
+    calculado = calcular_desde_cero()
+    with transaction.atomic():
+        ResumenAsistencia.objects.all().delete()
+        ResumenAsistencia.objects.bulk_create([
+            ResumenAsistencia(
+                mesa_id=mesa_id,
+                horario_id=horario_id,
+                curso_id=curso_id,
+                numero_clase=numero_clase,
+                estado=estado,
+                total=total,
+            )
+            for (mesa_id, numero_clase, estado), (horario_id, curso_id, total) in calculado.items()
+        ])
+    return len(calculado)
+
+
+def verificar():
+    """
+    Compara la tabla de resumen con el cálculo desde cero.
+    Devuelve una lista de diferencias: (clave, esperado, guardado).
+    """
+    calculado = calcular_desde_cero()
+    guardado = {
+        (r.mesa_id, r.numero_clase, r.estado): (r.horario_id, r.curso_id, r.total)
+        for r in ResumenAsistencia.objects.all()
+    }
+
+    diferencias = []
+    for clave in calculado.keys() | guardado.keys():
+        esperado = calculado.get(clave)
+        actual = guardado.get(clave)
+        # Una fila guardada con total 0 equivale a que no exista
+        if esperado is None and actual is not None and actual[2] == 0:
+            continue
+        if esperado != actual:
+            diferencias.append((clave, esperado, actual))
+    return sorted(diferencias, key=lambda d: tuple(str(x) for x in d[0]))
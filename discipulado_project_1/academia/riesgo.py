@@ -0,0 +1,226 @@
+# En academia/riesgo.py (archivo nuevo)
+
+"""
+Detección de alumnos en riesgo de no completar el curso.
+
+La asistencia de un curso se carga en una matriz densa de NumPy
+(alumnos x TOTAL_CLASES) con el estado codificado como número, y todos
+los indicadores se calculan para todos los alumnos a la vez:
+
+  - racha:  ausencias seguidas hasta la última clase dictada del curso
+            (aquí una clase ya dictada sin registro cuenta como ausencia).
+  - deuda:  faltas (F) pendientes. Al recuperar una clase su registro
+            deja de ser F, así que son los registros F que quedan (lo
+            mismo que 'faltas_pendientes' en la hoja de asistencia).
+  - proyección: asistencias esperadas al final del curso si el alumno
+            mantiene su tasa actual en las clases que faltan.
+
+Lo usan la vista 'alumnos-riesgo/' y el comando 'alumnos_en_riesgo'.
+NumPy es una dependencia opcional: sin ella 'disponible()' es False.
+"""
+
+from django.conf import settings
+
+from .models import Alumno, Asistencia, TOTAL_CLASES
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# Código numérico de cada estado en la matriz (0 = sin registro)
+SIN_REGISTRO = 0
+CODIGOS = {'A': 1, 'F': 2, 'R': 3, 'D': 4}
+
+# Peso de cada indicador en el puntaje final (suman 1)
+PESO_RACHA = 0.4
+PESO_DEUDA = 0.2
+PESO_PROYECCION = 0.4
+
+# A partir de cuántas ausencias seguidas / faltas sin recuperar el
+# indicador correspondiente ya está "al máximo"
+RACHA_MAXIMA = 3
+DEUDA_MAXIMA = 3
+
+NIVELES = (('alto', 0.6), ('medio', 0.3), ('bajo', 0.0))
+
+
+def disponible():
+    return np is not None
+
+
+def asistencia_minima():
+    """
+    Clases que hay que asistir para completar el curso.
+    """
+    return round(getattr(settings, 'ASISTENCIA_MINIMA', 0.8) * TOTAL_CLASES)
+
+
+def cargar_matriz(curso_id, facilitador=None):
+    """
+    Devuelve (alumnos, matriz): la lista de alumnos activos del curso
+    y una matriz uint8 de forma (len(alumnos), TOTAL_CLASES) con el
+    código del estado de cada clase.
+
+    Dos consultas: los alumnos y TODAS las asistencias del curso
+    (solo tres columnas, sin instanciar modelos). Las asistencias de
+    alumnos inactivos se descartan al ubicarlas en la matriz.
+    """
+    alumnos = Alumno.objects.filter(curso_id=curso_id, activo=True)
+    asistencias = Asistencia.objects.filter(curso_id=curso_id)
+    if facilitador is not None:
+        alumnos = alumnos.filter(facilitador=facilitador)
+        asistencias = asistencias.filter(facilitador=facilitador)
+
+    alumnos = list(alumnos.order_by('id').values(
+        'id', 'nombres', 'apellidos', 'mesa_id', 'mesa__nombre_mesa',
+        'facilitador_id', 'facilitador__first_name', 'facilitador__last_name',
+    ))
+    matriz = np.zeros((len(alumnos), TOTAL_CLASES), dtype=np.uint8)
+    if not alumnos:
+        return alumnos, matriz
+
+    filas = asistencias.values_list('alumno_id', 'numero_clase', 'estado')
+    datos = [
+        (alumno_id, numero_clase, CODIGOS[estado])
+        for alumno_id, numero_clase, estado in filas
+        if 1 <= numero_clase <= TOTAL_CLASES
+    ]
+    if datos:
+        registros = np.array(datos, dtype=np.int64)
+        ids = np.fromiter((a['id'] for a in alumnos), dtype=np.int64, count=len(alumnos))
+        # 'alumnos' está ordenado por id: la fila de cada asistencia sale
+        # de una búsqueda binaria vectorizada
+        posiciones = np.searchsorted(ids, registros[:, 0])
+        posiciones = np.minimum(posiciones, len(ids) - 1)
+        validas = ids[posiciones] == registros[:, 0]
+        matriz[posiciones[validas], registros[validas, 1] - 1] = registros[validas, 2]
+    return alumnos, matriz
+
+
+def indicadores(matriz):
+    """
+    Calcula los indicadores de riesgo de cada fila de la matriz.
+    Devuelve un diccionario de arrays (uno por indicador) y el número
+    de clases dictadas (la última clase con algún registro en el curso).
+    """
+    con_registro = (matriz != SIN_REGISTRO).any(axis=0)
+    dictadas = int(np.flatnonzero(con_registro)[-1]) + 1 if con_registro.any() else 0
+    restantes = TOTAL_CLASES - dictadas
+    hasta_hoy = matriz[:, :dictadas]
+
+    faltas = hasta_hoy == CODIGOS['F']
+    ausente = faltas | (hasta_hoy == SIN_REGISTRO)
+    asistidas = np.isin(hasta_hoy, (CODIGOS['A'], CODIGOS['R'], CODIGOS['D'])).sum(axis=1)
+
+    # Racha: ausencias seguidas contando hacia atrás desde la última clase dictada
+    if dictadas:
+        invertida = ausente[:, ::-1]
+        racha = np.where(invertida.all(axis=1), dictadas, invertida.argmin(axis=1))
+    else:
+        racha = np.zeros(len(matriz), dtype=np.int64)
+
+    # Deuda: las F que siguen registradas como tales
+    deuda = faltas.sum(axis=1)
+
+    tasa = asistidas / dictadas if dictadas else np.ones(len(matriz))
+    proyeccion = asistidas + tasa * restantes
+    # Lo máximo que puede llegar a asistir: todo lo que queda + recuperar su deuda
+    maximo_posible = asistidas + restantes + deuda
+
+    return {
+        'asistidas': asistidas,
+        'racha': racha,
+        'deuda': deuda,
+        'tasa': tasa,
+        'proyeccion': proyeccion,
+        'maximo_posible': maximo_posible,
+    }, dictadas
+
+
+def puntajes(datos, minimo):
+    """
+    Combina los indicadores en un puntaje entre 0 (sin riesgo) y 1.
+    Quien ya no puede llegar al mínimo, aunque venga a todo, tiene 1.
+    """
+    riesgo_racha = np.minimum(datos['racha'] / RACHA_MAXIMA, 1)
+    riesgo_deuda = np.minimum(datos['deuda'] / DEUDA_MAXIMA, 1)
+    riesgo_proyeccion = np.clip((minimo - datos['proyeccion']) / minimo, 0, 1)
+    puntaje = (
+        PESO_RACHA * riesgo_racha
+        + PESO_DEUDA * riesgo_deuda
+        + PESO_PROYECCION * riesgo_proyeccion
+    )
+    return np.where(datos['maximo_posible'] < minimo, 1.0, puntaje)
+
+
+def nivel(puntaje):
+    for nombre, desde in NIVELES:
+        if puntaje >= desde:
+            return nombre
+    return NIVELES[-1][0]
+
+
+def analizar(curso_id, facilitador=None, incluir_bajo=False, limite=None):
+    """
+    Lista de alumnos ordenada de mayor a menor riesgo, más la misma
+    información agrupada por mesa y por facilitador.
+    """
+    alumnos, matriz = cargar_matriz(curso_id, facilitador)
+    datos, dictadas = indicadores(matriz)
+    minimo = asistencia_minima()
+    puntaje = puntajes(datos, minimo)
+
+    ranking = []
+    # argsort estable: a igual puntaje, se respeta el orden por id
+    for i in np.argsort(-puntaje, kind='stable'):
+        nivel_alumno = nivel(puntaje[i])
+        if nivel_alumno == 'bajo' and not incluir_bajo:
+            continue
+        a = alumnos[i]
+        ranking.append({
+            'id': a['id'],
+            'nombres': a['nombres'],
+            'apellidos': a['apellidos'],
+            'mesa': a['mesa_id'],
+            'facilitador': a['facilitador_id'],
+            'riesgo': round(float(puntaje[i]), 3),
+            'nivel': nivel_alumno,
+            'asistidas': int(datos['asistidas'][i]),
+            'racha_ausencias': int(datos['racha'][i]),
+            'deuda_recuperacion': int(datos['deuda'][i]),
+            'tasa_asistencia': round(float(datos['tasa'][i]), 3),
+            'proyeccion_final': round(float(datos['proyeccion'][i]), 1),
+            'puede_completar': bool(datos['maximo_posible'][i] >= minimo),
+        })
+        if limite and len(ranking) >= limite:
+            break
+
+    info = {a['id']: a for a in alumnos}
+    por_mesa, por_facilitador = {}, {}
+    for fila in ranking:
+        a = info[fila['id']]
+        mesa = por_mesa.setdefault(a['mesa_id'], {
+            'id': a['mesa_id'],
+            'nombre_mesa': a['mesa__nombre_mesa'],
+            'facilitador': a['facilitador_id'],
+            'alumnos': [],
+        })
+        mesa['alumnos'].append(fila['id'])
+        facilitador_grupo = por_facilitador.setdefault(a['facilitador_id'], {
+            'id': a['facilitador_id'],
+            'nombre': f"{a['facilitador__first_name'] or ''} {a['facilitador__last_name'] or ''}".strip(),
+            'alumnos': [],
+        })
+        facilitador_grupo['alumnos'].append(fila['id'])
+
+    # Los grupos quedan en el orden del alumno más riesgoso de cada uno
+    return {
+        'curso': curso_id,
+        'clases_dictadas': dictadas,
+        'asistencia_minima': minimo,
+        'total_alumnos': len(alumnos),
+        'alumnos': ranking,
+        'por_mesa': list(por_mesa.values()),
+        'por_facilitador': list(por_facilitador.values()),
+    }
@@ -1,21 +1,23 @@
 # En academia/serializers.py
 
 from rest_framework import serializers
-from .models import Curso, Horario, Mesa, Alumno, Asistencia
+from .models import Curso, Horario, Mesa, Alumno, Asistencia, TOTAL_CLASES
+from .campos import CamposDinamicosMixin
+from .metricas import MetricasSerializerMixin
 from usuarios.serializers import FacilitadorSimpleSerializer
 from usuarios.models import CustomUser  # <-- 1. AÑADE ESTA LÍNEA DE IMPORTACIÓN
 
-class CursoSerializer(serializers.ModelSerializer):
+class CursoSerializer(MetricasSerializerMixin, CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Curso
         fields = '__all__'  # '__all__' es un atajo para incluir todos los campos
 
-class HorarioSerializer(serializers.ModelSerializer):
+class HorarioSerializer(MetricasSerializerMixin, CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Horario
         fields = '__all__'
 
-class MesaSerializer(serializers.ModelSerializer):
+class MesaSerializer(MetricasSerializerMixin, CamposDinamicosMixin, serializers.ModelSerializer):
     # --- AÑADIR ESTAS LÍNEAS ---
     # Esto le dice a DRF que use el serializer anidado
     # 'read_only=True' significa que no se usará para crear/actualizar,
@@ -38,12 +40,75 @@ class MesaSerializer(serializers.ModelSerializer):
             'facilitador_id' # El ID (para ESCRIBIR)
         ]
 
-class AlumnoSerializer(serializers.ModelSerializer):
+class AlumnoSerializer(MetricasSerializerMixin, CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Alumno
-        fields = '__all__'
+        # 'facilitador' y 'curso' son copias internas (ver academia/denormalizacion.py)
+        # y 'cumple_mmdd' se calcula de 'fecha_nacimiento'
+        exclude = ['facilitador', 'curso', 'cumple_mmdd', 'desactivado_por_cascada']
+
+class AlumnoImportSerializer(AlumnoSerializer):
+    """
+    Las mismas reglas que AlumnoSerializer para cada fila de una
+    importación (ver academia/importar.py), pero 'mesa' llega como un
+    número: las mesas de todo el lote se validan juntas, con una sola
+    consulta, en lugar de una por fila.
+    """
+    mesa = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+
+class AlumnoConResumenSerializer(AlumnoSerializer):
+    """
+    AlumnoSerializer + 'resumen_asistencia', calculado a partir de las
+    anotaciones de AlumnoViewSet.anotar_resumen (no hace consultas).
+    """
+    resumen_asistencia = serializers.SerializerMethodField()
+
+    def get_resumen_asistencia(self, alumno):
+        registros = int(alumno.mascara_registros or 0)
+        faltas = int(alumno.mascara_faltas or 0)
+
+        # Clases sin registro, desde la 1 hasta la última registrada en su curso
+        ultima_del_curso = self.context.get('ultima_clase_por_curso', {}).get(alumno.curso_id)
+        hasta = max(ultima_del_curso or 0, registros.bit_length())
+        clases_faltantes = [n for n in range(1, hasta + 1) if not registros >> (n - 1) & 1]
 
-class AsistenciaSerializer(serializers.ModelSerializer):
+        # Faltas seguidas contando hacia atrás desde su última clase registrada
+        racha = 0
+        for n in range(registros.bit_length(), 0, -1):
+            if not faltas >> (n - 1) & 1:
+                break
+            racha += 1
+
+        return {
+            'asistio': alumno.total_asistio,
+            'falto': alumno.total_falto,
+            'recupero': alumno.total_recupero,
+            'adelanto': alumno.total_adelanto,
+            # Sin registros no hay tasa (la anotación usa 0 solo para ordenar)
+            'tasa_asistencia': round(alumno.tasa_asistencia, 3) if alumno.total_registros else None,
+            'clases_faltantes': clases_faltantes,
+            'ultima_clase_asistida': alumno.ultima_clase_asistida or None,
+            'racha_faltas': racha,
+        }
+
+class AsistenciaSerializer(MetricasSerializerMixin, CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Asistencia
-        fields = '__all__'
\ No newline at end of file
+        exclude = ['facilitador', 'curso']
+
+class AsistenciaBulkItemSerializer(serializers.Serializer):
+    """
+    Valida la *forma* de cada registro que llega a 'bulk_upsert'.
+    Las comprobaciones contra la base de datos (que el alumno exista,
+    que pertenezca al facilitador, etc.) se hacen después, de una sola
+    vez para todo el lote.
+    """
+    alumno = serializers.IntegerField(min_value=1)
+    numero_clase = serializers.IntegerField(min_value=1, max_value=TOTAL_CLASES)
+    estado = serializers.ChoiceField(choices=Asistencia.Estado.choices)
+    motivo_falta_recupero = serializers.CharField(
+        required=False, allow_null=True, allow_blank=True, default=None
+    )
+    horario_adelanto = serializers.IntegerField(required=False, allow_null=True, default=None)
+    # Cuándo se capturó en el dispositivo (si no viene, se usa la del lote)
+    capturado = serializers.DateTimeField(required=False, allow_null=True, default=None)
@@ -0,0 +1,203 @@
+# En academia/signals.py (archivo nuevo)
+
+"""
+Señales que mantienen al día los datos derivados de academia
+(la tabla ResumenAsistencia, las copias facilitador/curso de Alumno y
+Asistencia, el alcance cacheado de cada facilitador, la versión del
+cache de respuestas, la versión de cada tabla para los ETag y las
+lápidas de la sincronización) cuando se guarda o borra un registro uno
+por uno (ViewSets, admin, shell...).
+
+OJO: las operaciones en bloque (bulk_create, queryset.update) NO
+disparan señales. 'bulk_upsert' y las cascadas de los ViewSets
+actualizan el resumen y el cache por su cuenta.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models.signals import pre_delete, pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import alcance, cache_respuestas, denormalizacion, resumen, sincronizacion, versiones
+from .models import Alumno, Asistencia, Curso, Horario, Mesa
+
+
+def al_confirmar(funcion, *args):
+    """
+    Ejecuta 'funcion(*args)' al confirmar la transacción en curso (o ya,
+    si no hay una). Los caches se invalidan después del COMMIT: si se
+    invalidan antes, una petición concurrente puede volver a llenarlos
+    con los datos viejos.
+    """
+    transaction.on_commit(lambda: funcion(*args))
+
+
+def valores_previos(instance, *campos):
+    """
+    Lee de la base de datos los valores que tenía 'instance' antes de
+    guardarse. Devuelve None si es un registro nuevo.
+    """
+    if instance.pk is None:
+        return None
+    return type(instance).objects.filter(pk=instance.pk).values(*campos).first()
+
+
+# --- Cache de respuestas ---
+
+@receiver(post_save, sender=Curso)
+@receiver(post_save, sender=Horario)
+@receiver(post_save, sender=Mesa)
+@receiver(post_save, sender=Alumno)
+@receiver(post_save, sender=Asistencia)
+@receiver(post_delete, sender=Curso)
+@receiver(post_delete, sender=Horario)
+@receiver(post_delete, sender=Mesa)
+@receiver(post_delete, sender=Alumno)
+@receiver(post_delete, sender=Asistencia)
+def invalidar_cache(sender, **kwargs):
+    al_confirmar(cache_respuestas.invalidar)
+    al_confirmar(versiones.tocar, sender)
+
+
+# --- Asistencia ---
+
+@receiver(pre_save, sender=Asistencia)
+def asistencia_pre_save(sender, instance, **kwargs):
+    # Una edición en línea es la captura más reciente (ver academia/lotes.py)
+    instance.capturado = timezone.now()
+    instance._previo = valores_previos(
+        instance, 'estado', 'numero_clase', 'alumno_id', 'alumno__mesa_id'
+    )
+    if instance._previo and instance._previo['alumno_id'] == instance.alumno_id:
+        instance._mesa_id = instance._previo['alumno__mesa_id']
+    else:
+        instance.facilitador_id, instance.curso_id, instance._mesa_id = Alumno.objects.filter(
+            pk=instance.alumno_id
+        ).values_list('facilitador_id', 'curso_id', 'mesa_id').first() or (None, None, None)
+
+
+@receiver(post_save, sender=Asistencia)
+def asistencia_post_save(sender, instance, created, **kwargs):
+    deltas = Counter()
+    previo = getattr(instance, '_previo', None)
+    if previo:
+        deltas[(previo['alumno__mesa_id'], previo['numero_clase'], previo['estado'])] -= 1
+    deltas[(instance._mesa_id, instance.numero_clase, instance.estado)] += 1
+    resumen.aplicar_deltas(deltas)
+
+
+@receiver(post_delete, sender=Asistencia)
+def asistencia_post_delete(sender, instance, **kwargs):
+    mesa_id = Alumno.objects.filter(pk=instance.alumno_id).values_list('mesa_id', flat=True).first()
+    resumen.aplicar_deltas(Counter({(mesa_id, instance.numero_clase, instance.estado): -1}))
+
+
+# --- Alumno (cambio de mesa) ---
+
+@receiver(pre_save, sender=Alumno)
+def alumno_pre_save(sender, instance, **kwargs):
+    instance._previo = valores_previos(instance, 'mesa_id', 'facilitador_id')
+    if not instance._previo or instance._previo['mesa_id'] != instance.mesa_id:
+        instance.facilitador_id, instance.curso_id = denormalizacion.claves_de_mesa(instance.mesa_id)
+
+
+@receiver(post_save, sender=Alumno)
+def alumno_post_save(sender, instance, created, **kwargs):
+    previo = getattr(instance, '_previo', None)
+    if created:
+        al_confirmar(alcance.invalidar, instance.facilitador_id)
+    if previo and previo['mesa_id'] != instance.mesa_id:
+        al_confirmar(alcance.invalidar, previo['facilitador_id'], instance.facilitador_id)
+        resumen.aplicar_deltas(
+            resumen.deltas_de_alumno(instance.pk, previo['mesa_id'], instance.mesa_id)
+        )
+        denormalizacion.sincronizar_asistencias(Asistencia.objects.filter(alumno=instance))
+        if previo['facilitador_id'] != instance.facilitador_id:
+            sincronizacion.registrar_reasignados('alumno', [instance.pk], previo['facilitador_id'])
+
+
+# --- Mesa (cambio de horario) ---
+
+@receiver(pre_save, sender=Mesa)
+def mesa_pre_save(sender, instance, **kwargs):
+    instance._previo = valores_previos(instance, 'horario_id', 'facilitador_id', 'activo')
+
+
+@receiver(post_save, sender=Mesa)
+def mesa_post_save(sender, instance, created, **kwargs):
+    previo = getattr(instance, '_previo', None)
+    if not previo:
+        al_confirmar(alcance.invalidar, instance.facilitador_id)
+        return
+    if any(previo[campo] != getattr(instance, campo) for campo in previo):
+        al_confirmar(alcance.invalidar, previo['facilitador_id'], instance.facilitador_id)
+    if previo['horario_id'] != instance.horario_id:
+        resumen.mover_mesa(instance)
+    if previo['horario_id'] != instance.horario_id or \
+            previo['facilitador_id'] != instance.facilitador_id:
+        denormalizacion.sincronizar_alumnos(Alumno.objects.filter(mesa=instance))
+    if previo['facilitador_id'] != instance.facilitador_id:
+        sincronizacion.registrar_reasignados('mesa', [instance.pk], previo['facilitador_id'])
+        sincronizacion.registrar_reasignados(
+            'alumno',
+            Alumno.objects.filter(mesa=instance).values_list('id', flat=True),
+            previo['facilitador_id'],
+        )
+
+
+# --- Mesa (borrado) ---
+
+@receiver(pre_delete, sender=Mesa)
+def mesa_pre_delete(sender, instance, **kwargs):
+    # Después del borrado sus alumnos ya tienen mesa NULL (el SET_NULL
+    # no dispara señales): se guarda aquí qué había en la mesa
+    instance._conteos = resumen.conteos_de_mesa(instance.pk)
+    instance._alumnos_ids = list(Alumno.objects.filter(mesa=instance).values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Mesa)
+def mesa_post_delete(sender, instance, **kwargs):
+    resumen.quitar_mesa(instance.pk, getattr(instance, '_conteos', {}))
+    alumnos_ids = getattr(instance, '_alumnos_ids', [])
+    if alumnos_ids:
+        # Sin mesa no tienen facilitador ni curso: el anterior deja de verlos
+        denormalizacion.sincronizar_alumnos(Alumno.objects.filter(id__in=alumnos_ids))
+        sincronizacion.registrar_reasignados('alumno', alumnos_ids, instance.facilitador_id)
+
+
+# --- Horario (cambio de curso) ---
+
+@receiver(pre_save, sender=Horario)
+def horario_pre_save(sender, instance, **kwargs):
+    instance._previo = valores_previos(instance, 'curso_id')
+
+
+@receiver(post_save, sender=Horario)
+def horario_post_save(sender, instance, created, **kwargs):
+    previo = getattr(instance, '_previo', None)
+    if previo and previo['curso_id'] != instance.curso_id:
+        resumen.mover_horario(instance)
+        denormalizacion.sincronizar_alumnos(Alumno.objects.filter(mesa__horario=instance))
+        al_confirmar(alcance.invalidar_todos)
+
+
+# --- Borrados que cambian el alcance de un facilitador ---
+
+@receiver(post_delete, sender=Alumno)
+@receiver(post_delete, sender=Mesa)
+def alcance_post_delete(sender, instance, **kwargs):
+    al_confirmar(alcance.invalidar, instance.facilitador_id)
+
+
+# --- Lápidas para la sincronización incremental ---
+
+@receiver(post_delete, sender=Horario)
+@receiver(post_delete, sender=Mesa)
+@receiver(post_delete, sender=Alumno)
+@receiver(post_delete, sender=Asistencia)
+def registrar_borrado(sender, instance, **kwargs):
+    sincronizacion.registrar_borrado(
+        sender._meta.model_name, instance.pk, getattr(instance, 'facilitador_id', None)
+    )
@@ -0,0 +1,154 @@
+# En academia/sincronizacion.py (archivo nuevo)
+
+"""
+Sincronización incremental para clientes con mala conexión: en lugar
+de volver a descargar todas las listas, el cliente pide solo lo que
+cambió desde su último 'cursor' (GET /sync/?since=<cursor>).
+
+- Horario, Mesa, Alumno y Asistencia tienen 'actualizado' (auto_now).
+  Las operaciones en bloque (.update() de las cascadas y de las copias
+  desnormalizadas, bulk_create) lo ponen a mano con 'ahora()', así una
+  desactivación en cascada aparece como un cambio con activo=False.
+- Lo que desaparece de verdad deja una "lápida" (RegistroEliminado):
+  registros borrados y, para el facilitador anterior, alumnos y mesas
+  reasignados a otro facilitador. Al recibir la lápida de un alumno, el
+  cliente debe borrar también sus asistencias.
+- El cliente aplica primero 'eliminados' y después 'actualizados' (lo
+  actualizado refleja cómo está el registro ahora).
+- Las lápidas se guardan RETENCION días (comando 'purgar_eliminados');
+  un cursor más viejo recibe de nuevo todo ('completo': true).
+"""
+
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Alumno, Asistencia, Horario, Mesa, RegistroEliminado
+
+# Margen hacia atrás al comparar con el cursor: una transacción que
+# empezó antes del cursor pero confirmó después no se pierde (a cambio,
+# algunos registros pueden llegar repetidos).
+SOLAPE = datetime.timedelta(seconds=5)
+
+
+def ahora():
+    return timezone.now()
+
+
+def retencion():
+    return datetime.timedelta(days=getattr(settings, 'SINCRONIZACION_RETENCION_DIAS', 30))
+
+
+def leer_fecha(texto):
+    """
+    Convierte una fecha ISO 8601 en datetime (UTC si no trae zona), o
+    None si no es válida.
+    """
+    try:
+        fecha = parse_datetime(texto)
+    except (TypeError, ValueError):
+        return None
+    if fecha is not None and timezone.is_naive(fecha):
+        fecha = timezone.make_aware(fecha, datetime.timezone.utc)
+    return fecha
+
+
+def crear_cursor(fecha):
+    """
+    Cursor opaco (base64 de un JSON, como en academia/pagination.py):
+    se puede pegar en la URL sin codificar. Una fecha ISO cruda no,
+    porque el '+' de '+00:00' llega como espacio.
+    """
+    raw = json.dumps({'t': fecha.isoformat()}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def leer_cursor(texto):
+    """
+    La fecha de un cursor de 'crear_cursor()', o None si no es válido.
+    También acepta los cursores de antes (la fecha ISO sin codificar).
+    """
+    try:
+        return leer_fecha(json.loads(base64.urlsafe_b64decode(texto.encode()))['t'])
+    except (TypeError, ValueError, KeyError):
+        return leer_fecha(texto.replace(' ', '+'))
+
+
+# --- Lápidas ---
+
+def registrar_borrado(modelo, objeto_id, facilitador_id=None):
+    RegistroEliminado.objects.create(
+        modelo=modelo, objeto_id=objeto_id, facilitador_id=facilitador_id,
+        motivo=RegistroEliminado.Motivo.BORRADO,
+    )
+
+
+def registrar_reasignados(modelo, objetos_ids, facilitador_anterior_id):
+    """
+    Lápidas para el facilitador anterior de registros que pasaron a otro.
+    """
+    if not facilitador_anterior_id:
+        return
+    RegistroEliminado.objects.bulk_create([
+        RegistroEliminado(
+            modelo=modelo, objeto_id=objeto_id, facilitador_id=facilitador_anterior_id,
+            motivo=RegistroEliminado.Motivo.REASIGNADO,
+        )
+        for objeto_id in objetos_ids
+    ])
+
+
+def purgar(dias=None):
+    """
+    Borra las lápidas más viejas que la retención. Devuelve cuántas.
+    """
+    limite = ahora() - (datetime.timedelta(days=dias) if dias is not None else retencion())
+    borradas, _ = RegistroEliminado.objects.filter(fecha__lt=limite).delete()
+    return borradas
+
+
+# --- Cambios para un usuario ---
+
+def alcance_de(user, alcance_usuario=None):
+    """
+    Querysets de cada tipo de registro que puede ver 'user'.
+    """
+    horarios = Horario.objects.all()
+    mesas = Mesa.objects.select_related('facilitador')
+    alumnos = Alumno.objects.all()
+    asistencias = Asistencia.objects.all()
+    if user.role == 'FACILITADOR':
+        horarios_ids = {m['horario_id'] for m in alcance_usuario['mesas'].values()}
+        horarios = horarios.filter(id__in=horarios_ids)
+        mesas = mesas.filter(facilitador=user)
+        alumnos = alumnos.filter(facilitador=user)
+        asistencias = asistencias.filter(facilitador=user)
+    return {
+        'horarios': horarios,
+        'mesas': mesas,
+        'alumnos': alumnos,
+        'asistencias': asistencias,
+    }
+
+
+def eliminados_de(user, desde):
+    """
+    {'alumnos': [ids], ...} con las lápidas que le tocan a 'user'.
+    """
+    lapidas = RegistroEliminado.objects.filter(fecha__gte=desde - SOLAPE)
+    if user.role == 'FACILITADOR':
+        lapidas = lapidas.filter(Q(facilitador=user) | Q(facilitador__isnull=True))
+    else:
+        # Una reasignación no le quita nada al admin
+        lapidas = lapidas.filter(motivo=RegistroEliminado.Motivo.BORRADO)
+
+    eliminados = {f'{modelo}s': set() for modelo in ('horario', 'mesa', 'alumno', 'asistencia')}
+    for modelo, objeto_id in lapidas.values_list('modelo', 'objeto_id'):
+        if f'{modelo}s' in eliminados:
+            eliminados[f'{modelo}s'].add(objeto_id)
+    return {nombre: sorted(ids) for nombre, ids in eliminados.items()}
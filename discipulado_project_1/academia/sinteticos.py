@@ -0,0 +1,237 @@
+# En academia/sinteticos.py (archivo nuevo)
+
+"""
+Datos sintéticos para pruebas de carga (comando 'generar_datos' y
+'benchmark_api'): N cursos × 4 horarios × M mesas por horario × K
+alumnos por mesa × las clases de asistencia.
+
+- Cada mesa tiene su facilitador ("sint_fac_<n>"); el mismo grupo de
+  facilitadores se reparte en todos los cursos. También se crea un
+  admin "sint_admin". Todos con la contraseña indicada.
+- Cada alumno tiene su propia probabilidad de asistir; sus faltas a
+  veces se recuperan (R) y a veces se adelanta la clase (D) en otro
+  horario del curso. Un 5% de los alumnos está inactivo.
+- Se escribe con bulk_create (sin señales) y al final se reconstruye
+  el resumen de asistencia y se invalidan los caches.
+- Solo el último curso queda activo.
+
+Pensado para una base de datos de pruebas: 'limpiar()' borra todo lo
+sintético anterior (cursos "Sintético ..." y usuarios "sint_...").
+"""
+
+import datetime
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from usuarios.models import CustomUser
+from . import alcance, cache_respuestas, resumen, versiones
+from .models import (
+    Alumno, Asistencia, Curso, Horario, LoteAsistencia, Mesa, RegistroEliminado,
+    ResumenAsistencia, TOTAL_CLASES,
+)
+
+PREFIJO_CURSO = 'Sintético'
+PREFIJO_USUARIO = 'sint_'
+USUARIO_ADMIN = f'{PREFIJO_USUARIO}admin'
+
+HORARIOS = (
+    (Horario.Dia.MIERCOLES, datetime.time(19, 0)),
+    (Horario.Dia.DOMINGO, datetime.time(9, 0)),
+    (Horario.Dia.DOMINGO, datetime.time(11, 0)),
+    (Horario.Dia.DOMINGO, datetime.time(13, 0)),
+)
+
+NOMBRES = (
+    'José', 'María', 'Juan', 'Guadalupe', 'Luis', 'Ana', 'Carlos', 'Sofía', 'Jorge', 'Fernanda',
+    'Miguel', 'Daniela', 'Andrés', 'Valeria', 'Ricardo', 'Paola', 'Héctor', 'Lucía', 'Raúl', 'Mónica',
+)
+APELLIDOS = (
+    'Hernández', 'García', 'Martínez', 'López', 'González', 'Pérez', 'Rodríguez', 'Sánchez',
+    'Ramírez', 'Cruz', 'Flores', 'Gómez', 'Morales', 'Vázquez', 'Reyes', 'Jiménez', 'Torres',
+    'Díaz', 'Gutiérrez', 'Ruiz',
+)
+COLONIAS = ('Centro', 'Del Valle', 'Las Fuentes', 'San Rafael', 'Lomas', 'Jardines', 'Roma', 'Obrera')
+
+PROBABILIDAD_INACTIVO = 0.05
+PROBABILIDAD_RECUPERO = 0.3
+PROBABILIDAD_ADELANTO = 0.03
+LOTE = 5000
+
+
+def existen():
+    return Curso.objects.filter(nombre__startswith=PREFIJO_CURSO).exists()
+
+
+def limpiar():
+    """
+    Borra los datos sintéticos sin pasar por las señales (serían una
+    consulta por fila): hijos primero, porque las FK de Django no son
+    ON DELETE CASCADE en la base.
+    """
+    cursos = Curso.objects.filter(nombre__startswith=PREFIJO_CURSO)
+    horarios = Horario.objects.filter(curso__in=cursos)
+    usuarios = CustomUser.objects.filter(username__startswith=PREFIJO_USUARIO)
+    with transaction.atomic():
+        Asistencia.objects.filter(horario_adelanto__in=horarios).exclude(curso__in=cursos).update(
+            horario_adelanto=None
+        )
+        for queryset in (
+            Asistencia.objects.filter(curso__in=cursos),
+            ResumenAsistencia.objects.filter(curso__in=cursos),
+            RegistroEliminado.objects.filter(facilitador__in=usuarios),
+            LoteAsistencia.objects.filter(usuario__in=usuarios),
+            Alumno.objects.filter(curso__in=cursos),
+            Mesa.objects.filter(horario__in=horarios),
+            horarios,
+            cursos,
+            usuarios,
+        ):
+            queryset._raw_delete(queryset.db)
+    invalidar_caches()
+
+
+def invalidar_caches():
+    alcance.invalidar_todos()
+    cache_respuestas.invalidar()
+    versiones.tocar(Curso, Horario, Mesa, Alumno, Asistencia, CustomUser)
+
+
+def fecha_nacimiento(azar):
+    return datetime.date(azar.randint(1950, 2007), azar.randint(1, 12), azar.randint(1, 28))
+
+
+def asistencias_de(alumno, otros_horarios, clases, azar):
+    """
+    Registros de un alumno: asiste con su probabilidad personal; si
+    falta, a veces recupera la clase y a veces la adelanta.
+    """
+    probabilidad = azar.betavariate(8, 2)
+    for numero_clase in range(1, clases + 1):
+        horario_adelanto = None
+        if azar.random() < probabilidad:
+            estado = Asistencia.Estado.ASISTIO
+        elif otros_horarios and azar.random() < PROBABILIDAD_ADELANTO:
+            estado = Asistencia.Estado.ADELANTO
+            horario_adelanto = azar.choice(otros_horarios)
+        elif azar.random() < PROBABILIDAD_RECUPERO:
+            estado = Asistencia.Estado.RECUPERO
+        else:
+            estado = Asistencia.Estado.FALTO
+        yield Asistencia(
+            alumno_id=alumno.id,
+            numero_clase=numero_clase,
+            estado=estado,
+            horario_adelanto_id=horario_adelanto,
+            facilitador_id=alumno.facilitador_id,
+            curso_id=alumno.curso_id,
+        )
+
+
+def guardar_en_lotes(modelo, objetos):
+    """
+    bulk_create por partes, sin tener toda la lista en memoria.
+    """
+    total = 0
+    pendientes = []
+    for objeto in objetos:
+        pendientes.append(objeto)
+        if len(pendientes) >= LOTE:
+            modelo.objects.bulk_create(pendientes)
+            total += len(pendientes)
+            pendientes = []
+    if pendientes:
+        modelo.objects.bulk_create(pendientes)
+        total += len(pendientes)
+    return total
+
+
+def generar(cursos=1, mesas=5, alumnos=10, clases=TOTAL_CLASES, semilla=0, password='discipulado'):
+    """
+    Genera los datos y devuelve cuántos registros se crearon de cada tipo.
+    """
+    azar = random.Random(semilla)
+    clave = make_password(password)  # Un solo hash para todos (es lento)
+
+    with transaction.atomic():
+        CustomUser.objects.bulk_create([
+            CustomUser(username=USUARIO_ADMIN, password=clave, role='ADMIN', first_name='Admin'),
+        ] + [
+            CustomUser(
+                username=f'{PREFIJO_USUARIO}fac_{n}', password=clave, role='FACILITADOR',
+                first_name=azar.choice(NOMBRES), last_name=azar.choice(APELLIDOS),
+            )
+            for n in range(len(HORARIOS) * mesas)
+        ])
+        facilitadores = list(
+            CustomUser.objects.filter(username__startswith=f'{PREFIJO_USUARIO}fac_').order_by('id')
+            .values_list('id', flat=True)
+        )
+
+        hoy = datetime.date.today()
+        lista_cursos = Curso.objects.bulk_create([
+            Curso(
+                nombre=f'{PREFIJO_CURSO} {n + 1}',
+                fecha_inicio=hoy - datetime.timedelta(weeks=26 * (cursos - n)),
+                fecha_fin=hoy - datetime.timedelta(weeks=26 * (cursos - n) - 24),
+                activo=n == cursos - 1,
+            )
+            for n in range(cursos)
+        ])
+        lista_horarios = Horario.objects.bulk_create([
+            Horario(curso=curso, dia=dia, hora=hora)
+            for curso in lista_cursos
+            for dia, hora in HORARIOS
+        ])
+        lista_mesas = Mesa.objects.bulk_create([
+            Mesa(horario=horario, facilitador_id=facilitadores[n], nombre_mesa=f'Mesa {n + 1}')
+            for indice, horario in enumerate(lista_horarios)
+            for n in range((indice % len(HORARIOS)) * mesas, (indice % len(HORARIOS) + 1) * mesas)
+        ])
+
+        horarios_por_curso = {}
+        for horario in lista_horarios:
+            horarios_por_curso.setdefault(horario.curso_id, []).append(horario.id)
+        curso_de_horario = {horario.id: horario.curso_id for horario in lista_horarios}
+
+        lista_alumnos = []
+        for mesa in lista_mesas:
+            for _ in range(alumnos):
+                nacimiento = fecha_nacimiento(azar)
+                lista_alumnos.append(Alumno(
+                    mesa=mesa,
+                    nombres=azar.choice(NOMBRES),
+                    apellidos=f'{azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}',
+                    fecha_nacimiento=nacimiento,
+                    cumple_mmdd=nacimiento.month * 100 + nacimiento.day,
+                    telefono=f'81{azar.randint(10000000, 99999999)}',
+                    colonia=azar.choice(COLONIAS),
+                    activo=azar.random() >= PROBABILIDAD_INACTIVO,
+                    facilitador_id=mesa.facilitador_id,
+                    curso_id=curso_de_horario[mesa.horario_id],
+                ))
+        lista_alumnos = Alumno.objects.bulk_create(lista_alumnos, batch_size=LOTE)
+
+        mesa_horario = {mesa.id: mesa.horario_id for mesa in lista_mesas}
+        total_asistencias = guardar_en_lotes(Asistencia, (
+            asistencia
+            for alumno in lista_alumnos
+            for asistencia in asistencias_de(
+                alumno,
+                [h for h in horarios_por_curso[alumno.curso_id] if h != mesa_horario[alumno.mesa_id]],
+                clases,
+                azar,
+            )
+        ))
+        resumen.reconstruir()
+
+    invalidar_caches()
+    return {
+        'usuarios': len(facilitadores) + 1,
+        'cursos': len(lista_cursos),
+        'horarios': len(lista_horarios),
+        'mesas': len(lista_mesas),
+        'alumnos': len(lista_alumnos),
+        'asistencias': total_asistencias,
+    }
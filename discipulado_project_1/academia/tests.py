@@ -1,3 +1,1843 @@
+import csv
+import datetime
+import json
+from io import BytesIO, StringIO
+from unittest import mock, skipIf
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from usuarios.authentication import clave_estado, estado_usuario
+from usuarios.models import CustomUser
+from . import (
+    alcance, benchmark, cache_respuestas, denormalizacion, metricas, resumen, riesgo, sincronizacion, versiones,
+)
+from .exportar import openpyxl
+from .models import Curso, Horario, Mesa, Alumno, Asistencia, ResumenAsistencia, TOTAL_CLASES
+from .permissions import IsFacilitadorOwnerOrAdmin
+from .views import AlumnoViewSet
+
+
+class PresupuestoConsultasTests(TestCase):
+    """
+    Presupuesto de consultas SQL por endpoint de detalle.
+    El permiso de objeto no debe añadir consultas para recorrer
+    alumno -> mesa -> facilitador, y el costo no debe depender de
+    cuántos alumnos o asistencias haya.
+    """
+
+    # Máximo de consultas permitidas por petición. Las escrituras de
+    # Asistencia: leer el registro (y su alumno o mesa), el UPDATE o
+    # DELETE, un solo upsert del resumen y, al borrar, la lápida.
+    PRESUPUESTOS = {
+        'asistencia-detalle': 1,
+        'asistencia-actualizar': 5,
+        'asistencia-borrar': 5,
+        'alumno-detalle': 1,
+        'alumno-actualizar': 3,
+        'mesa-detalle': 1,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.facilitador = CustomUser.objects.create_user(
+            'facilitador', password='x', role='FACILITADOR', first_name='Ana'
+        )
+        cls.otro = CustomUser.objects.create_user('otro', password='x', role='FACILITADOR')
+        curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        horario = Horario.objects.create(curso=curso, dia='MIE', hora='19:00')
+        cls.mesa = Mesa.objects.create(horario=horario, facilitador=cls.facilitador, nombre_mesa='Mesa 1')
+        cls.mesa_ajena = Mesa.objects.create(horario=horario, facilitador=cls.otro, nombre_mesa='Mesa 2')
+        cls.alumno = Alumno.objects.create(
+            mesa=cls.mesa, nombres='Juan', apellidos='Pérez', fecha_nacimiento='2000-01-01'
+        )
+        cls.alumno_ajeno = Alumno.objects.create(
+            mesa=cls.mesa_ajena, nombres='Luis', apellidos='López', fecha_nacimiento='2000-01-01'
+        )
+        cls.asistencia = Asistencia.objects.create(alumno=cls.alumno, numero_clase=1, estado='A')
+        cls.asistencia_ajena = Asistencia.objects.create(alumno=cls.alumno_ajeno, numero_clase=1, estado='A')
+
+    def setUp(self):
+        # Los caches se invalidan al confirmar, y aquí cada prueba se deshace:
+        # sin esto quedarían datos (alcance, respuestas) de otras pruebas
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.facilitador)
+
+    def medir(self, nombre, metodo, url, data=None):
+        with CaptureQueriesContext(connection) as consultas:
+            response = getattr(self.client, metodo)(url, data, format='json')
+        self.assertLessEqual(
+            len(consultas), self.PRESUPUESTOS[nombre],
+            f"{nombre}: {len(consultas)} consultas\n" + "\n".join(q['sql'] for q in consultas),
+        )
+        return response, len(consultas)
+
+    def crear_mas_datos(self):
+        for i in range(10):
+            alumno = Alumno.objects.create(
+                mesa=self.mesa, nombres=f'N{i}', apellidos='X', fecha_nacimiento='2000-01-01'
+            )
+            for clase in range(1, 6):
+                Asistencia.objects.create(alumno=alumno, numero_clase=clase, estado='F')
+
+    def test_detalle_asistencia(self):
+        response, antes = self.medir(
+            'asistencia-detalle', 'get', f'/api/v1/asistencias/{self.asistencia.pk}/'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.crear_mas_datos()
+        _, despues = self.medir(
+            'asistencia-detalle', 'get', f'/api/v1/asistencias/{self.asistencia.pk}/'
+        )
+        self.assertEqual(antes, despues)
+
+    def test_actualizar_asistencia(self):
+        response, antes = self.medir(
+            'asistencia-actualizar', 'patch',
+            f'/api/v1/asistencias/{self.asistencia.pk}/', {'estado': 'F'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.crear_mas_datos()
+        _, despues = self.medir(
+            'asistencia-actualizar', 'patch',
+            f'/api/v1/asistencias/{self.asistencia.pk}/', {'estado': 'R'},
+        )
+        self.assertEqual(antes, despues)
+
+    def test_borrar_asistencia(self):
+        response, _ = self.medir(
+            'asistencia-borrar', 'delete', f'/api/v1/asistencias/{self.asistencia.pk}/'
+        )
+        self.assertEqual(response.status_code, 204)
+
+    def test_detalle_y_actualizar_alumno(self):
+        response, _ = self.medir('alumno-detalle', 'get', f'/api/v1/alumnos/{self.alumno.pk}/')
+        self.assertEqual(response.status_code, 200)
+        response, _ = self.medir(
+            'alumno-actualizar', 'patch', f'/api/v1/alumnos/{self.alumno.pk}/', {'telefono': '123'}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_detalle_mesa(self):
+        response, _ = self.medir('mesa-detalle', 'get', f'/api/v1/mesas/{self.mesa.pk}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_permiso_de_objeto_sin_consultas(self):
+        permiso = IsFacilitadorOwnerOrAdmin()
+        request = type('Request', (), {'user': self.facilitador})()
+        asistencia = Asistencia.objects.get(pk=self.asistencia.pk)
+        asistencia_ajena = Asistencia.objects.get(pk=self.asistencia_ajena.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(permiso.has_object_permission(request, None, asistencia))
+            self.assertFalse(permiso.has_object_permission(request, None, asistencia_ajena))
+
+    def test_objetos_ajenos(self):
+        # Un facilitador no ve lo de otro facilitador
+        response = self.client.get(f'/api/v1/asistencias/{self.asistencia_ajena.pk}/')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.patch(
+            f'/api/v1/alumnos/{self.alumno_ajeno.pk}/', {'telefono': '1'}, format='json'
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class BulkUpsertTests(TestCase):
+    """
+    POST /asistencias/bulk_upsert/: reparto entre creados y actualizados,
+    errores por registro, todo o nada ante un error de la base de datos,
+    el resumen al día después del lote, reintentos con la misma clave y
+    capturas que llegan fuera de orden.
+    """
+
+    URL = '/api/v1/asistencias/bulk_upsert/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.facilitador = CustomUser.objects.create_user('facilitador', password='x', role='FACILITADOR')
+        otro = CustomUser.objects.create_user('otro', password='x', role='FACILITADOR')
+        curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        horario = Horario.objects.create(curso=curso, dia='MIE', hora='19:00')
+        mesa = Mesa.objects.create(horario=horario, facilitador=cls.facilitador, nombre_mesa='Mesa 1')
+        mesa_ajena = Mesa.objects.create(horario=horario, facilitador=otro, nombre_mesa='Mesa 2')
+        cls.alumnos = [
+            Alumno.objects.create(mesa=mesa, nombres=f'A{n}', apellidos='X', fecha_nacimiento='2000-01-01')
+            for n in range(3)
+        ]
+        cls.alumno_ajeno = Alumno.objects.create(
+            mesa=mesa_ajena, nombres='Ajeno', apellidos='X', fecha_nacimiento='2000-01-01'
+        )
+        Asistencia.objects.create(alumno=cls.alumnos[0], numero_clase=1, estado='F')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.facilitador)
+
+    def registro(self, alumno, estado='A', numero_clase=1, **extra):
+        return {'alumno': alumno.pk, 'numero_clase': numero_clase, 'estado': estado, **extra}
+
+    def test_creados_y_actualizados(self):
+        registros = [self.registro(alumno) for alumno in self.alumnos]
+        response = self.client.post(self.URL, registros, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['creados'], response.data['actualizados']), (2, 1))
+        self.assertEqual(
+            [r['resultado'] for r in response.data['resultados']], ['actualizado', 'creado', 'creado']
+        )
+        self.assertEqual(Asistencia.objects.filter(numero_clase=1, estado='A').count(), 3)
+        self.assertEqual(resumen.verificar(), [])
+        self.assertEqual(ResumenAsistencia.objects.get(numero_clase=1, estado='A').total, 3)
+        self.assertEqual(ResumenAsistencia.objects.get(numero_clase=1, estado='F').total, 0)
+
+    def test_errores_por_registro(self):
+        a1, a2, a3 = self.alumnos
+        registros = [
+            self.registro(a1, estado='X'),
+            self.registro(self.alumno_ajeno),
+            self.registro(a2, horario_adelanto=999999),
+            self.registro(a3),
+            self.registro(a3, estado='F'),
+            self.registro(a2, numero_clase=2),
+        ]
+        with self.assertLogs('academia.views', 'WARNING'):
+            response = self.client.post(self.URL, registros, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [r['resultado'] for r in response.data['resultados']],
+            ['rechazado', 'rechazado', 'rechazado', 'creado', 'rechazado', 'creado'],
+        )
+        self.assertIn('estado', response.data['resultados'][0]['motivo'])
+        self.assertEqual(Asistencia.objects.get(alumno=a1, numero_clase=1).estado, 'F')
+        self.assertFalse(Asistencia.objects.filter(alumno=self.alumno_ajeno).exists())
+        self.assertEqual(resumen.verificar(), [])
+
+    def test_todo_o_nada(self):
+        registros = [self.registro(alumno) for alumno in self.alumnos]
+        with mock.patch('academia.resumen.aplicar_deltas', side_effect=DatabaseError("falla")):
+            with self.assertRaises(DatabaseError):
+                self.client.post(self.URL, registros, format='json')
+        self.assertEqual(Asistencia.objects.count(), 1)
+        self.assertEqual(Asistencia.objects.get().estado, 'F')
+        self.assertEqual(resumen.verificar(), [])
+
+    # --- Envíos desde la cola sin conexión (ver academia/lotes.py) ---
+
+    def enviar(self, registros, clave='lote-1', **extra):
+        return self.client.post(
+            self.URL, {'registros': registros, **extra}, format='json', HTTP_IDEMPOTENCY_KEY=clave
+        )
+
+    def test_reintento_devuelve_la_misma_respuesta(self):
+        registros = [self.registro(alumno) for alumno in self.alumnos]
+        primera = self.enviar(registros)
+        self.assertEqual(primera.status_code, 201)
+        Asistencia.objects.filter(numero_clase=1).update(estado='R')
+
+        with self.assertNumQueries(1):
+            segunda = self.enviar(registros)
+        self.assertEqual(segunda.status_code, 201)
+        self.assertEqual(segunda['Idempotent-Replayed'], 'true')
+        self.assertEqual(segunda.data, primera.data)
+        self.assertEqual(Asistencia.objects.filter(numero_clase=1, estado='R').count(), 3)
+
+    def test_misma_clave_con_otro_contenido(self):
+        self.enviar([self.registro(self.alumnos[1])])
+        response = self.enviar([self.registro(self.alumnos[1], estado='F')])
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Asistencia.objects.get(alumno=self.alumnos[1]).estado, 'A')
+
+    def test_captura_vieja_no_sobrescribe(self):
+        nueva = self.enviar(
+            [self.registro(self.alumnos[1], estado='A')], clave='nueva', capturado='2025-03-02T10:00:00Z'
+        )
+        self.assertEqual(nueva.data['creados'], 1)
+        vieja = self.enviar(
+            [self.registro(self.alumnos[1], estado='F'), self.registro(self.alumnos[2], estado='F')],
+            clave='vieja', capturado='2025-03-01T10:00:00Z',
+        )
+        self.assertEqual([r['resultado'] for r in vieja.data['resultados']], ['obsoleto', 'creado'])
+        self.assertEqual(Asistencia.objects.get(alumno=self.alumnos[1]).estado, 'A')
+        self.assertEqual(resumen.verificar(), [])
+
+        # Una captura por registro más reciente sí lo sobrescribe
+        response = self.enviar(
+            [self.registro(self.alumnos[1], estado='R', capturado='2025-03-03T10:00:00Z')], clave='otra'
+        )
+        self.assertEqual(response.data['actualizados'], 1)
+
+
+class DatosSinteticosTests(TestCase):
+    """
+    'generar_datos' crea la escala pedida con las copias y el resumen al
+    día, y cada caso del benchmark responde sin errores.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('generar_datos', cursos=1, mesas=2, alumnos=3, clases=5, stdout=StringIO())
+
+    def test_escala(self):
+        self.assertEqual(Horario.objects.count(), 4)
+        self.assertEqual(Mesa.objects.count(), 4 * 2)
+        self.assertEqual(Alumno.objects.count(), 4 * 2 * 3)
+        self.assertEqual(Asistencia.objects.count(), 4 * 2 * 3 * 5)
+        self.assertEqual(resumen.verificar(), [])
+        self.assertFalse(Alumno.objects.filter(facilitador__isnull=True).exists())
+
+    def test_benchmark(self):
+        resultados, sin_caso = benchmark.ejecutar(repeticiones=1, calentamiento=0)
+        self.assertEqual(sin_caso, [])
+        for resultado in resultados:
+            self.assertTrue(
+                all(estado < 400 for estado in resultado['estados']),
+                f"{resultado['nombre']}: {resultado['estados']}",
+            )
+
+
+class CascadaTests(TestCase):
+    """
+    Desactivar y reactivar un curso u horario deja a cada mesa y alumno
+    como estaba: lo que se dio de baja a mano no vuelve, ni lo que
+    cuelga de un padre que sigue dado de baja.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        facilitador = CustomUser.objects.create_user('facilitador', password='x', role='FACILITADOR')
+        cls.curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        cls.h1 = Horario.objects.create(curso=cls.curso, dia='MIE', hora='19:00')
+        cls.h2 = Horario.objects.create(curso=cls.curso, dia='DOM', hora='09:00')
+        cls.m1 = Mesa.objects.create(horario=cls.h1, facilitador=facilitador, nombre_mesa='Mesa 1')
+        cls.m2 = Mesa.objects.create(horario=cls.h2, facilitador=facilitador, nombre_mesa='Mesa 2')
+        cls.m3 = Mesa.objects.create(horario=cls.h2, facilitador=facilitador, nombre_mesa='Mesa 3')
+        cls.a1 = Alumno.objects.create(mesa=cls.m1, nombres='A1', apellidos='X', fecha_nacimiento='2000-01-01')
+        cls.a2 = Alumno.objects.create(mesa=cls.m2, nombres='A2', apellidos='X', fecha_nacimiento='2000-01-01')
+        cls.a3 = Alumno.objects.create(mesa=cls.m3, nombres='A3', apellidos='X', fecha_nacimiento='2000-01-01')
+        cls.baja = Alumno.objects.create(
+            mesa=cls.m3, nombres='Baja', apellidos='X', fecha_nacimiento='2000-01-01', activo=False
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def activos(self):
+        nombres = ['h1', 'h2', 'm1', 'm2', 'm3', 'a1', 'a2', 'a3', 'baja']
+        for nombre in nombres:
+            getattr(self, nombre).refresh_from_db()
+        return {nombre: getattr(self, nombre).activo for nombre in nombres}
+
+    def patch(self, url, activo):
+        response = self.client.patch(url, {'activo': activo}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_ida_y_vuelta_del_curso(self):
+        antes = self.activos()
+        self.patch(f'/api/v1/cursos/{self.curso.pk}/', False)
+        self.assertFalse(any(
+            activo for nombre, activo in self.activos().items()
+            if nombre not in ('h1', 'h2')
+        ))
+        self.patch(f'/api/v1/cursos/{self.curso.pk}/', True)
+        self.assertEqual(self.activos(), antes)
+
+    def test_padres_dados_de_baja_no_vuelven_con_el_curso(self):
+        self.assertEqual(self.client.delete(f'/api/v1/horarios/{self.h1.pk}/').status_code, 204)
+        self.assertEqual(self.client.delete(f'/api/v1/mesas/{self.m2.pk}/').status_code, 204)
+        antes = self.activos()
+        self.assertFalse(antes['m1'] or antes['a1'] or antes['a2'])
+
+        self.patch(f'/api/v1/cursos/{self.curso.pk}/', False)
+        self.patch(f'/api/v1/cursos/{self.curso.pk}/', True)
+        self.assertEqual(self.activos(), antes)
+        self.assertTrue(self.activos()['a3'])
+
+        # Al reactivar el horario vuelven su mesa y sus alumnos
+        self.patch(f'/api/v1/horarios/{self.h1.pk}/', True)
+        activos = self.activos()
+        self.assertTrue(activos['m1'] and activos['a1'])
+        self.assertFalse(activos['a2'])
+
+    def test_ida_y_vuelta_del_horario(self):
+        self.patch(f'/api/v1/mesas/{self.m2.pk}/', False)
+        antes = self.activos()
+        self.patch(f'/api/v1/horarios/{self.h2.pk}/', False)
+        activos = self.activos()
+        self.assertFalse(activos['m3'] or activos['a3'])
+        self.patch(f'/api/v1/horarios/{self.h2.pk}/', True)
+        self.assertEqual(self.activos(), antes)
+        self.assertFalse(self.activos()['baja'])
+
+
+class ImportacionTests(TestCase):
+    """
+    POST /alumnos/importar/: simulación, duplicados, errores por fila y
+    archivos CSV que no se pueden leer (400, nunca 500).
+    """
+
+    URL = '/api/v1/alumnos/importar/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.facilitador = CustomUser.objects.create_user('facilitador', password='x', role='FACILITADOR')
+        otro = CustomUser.objects.create_user('otro', password='x', role='FACILITADOR')
+        curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        horario = Horario.objects.create(curso=curso, dia='MIE', hora='19:00')
+        cls.mesa = Mesa.objects.create(horario=horario, facilitador=cls.facilitador, nombre_mesa='Mesa 1')
+        cls.mesa_ajena = Mesa.objects.create(horario=horario, facilitador=otro, nombre_mesa='Mesa 2')
+        Alumno.objects.create(mesa=cls.mesa, nombres='José', apellidos='Pérez', fecha_nacimiento='1990-05-01')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.facilitador)
+
+    def fila(self, nombres, **extra):
+        return {'nombres': nombres, 'apellidos': 'López', 'fecha_nacimiento': '2000-01-01', **extra}
+
+    def subir_csv(self, contenido):
+        archivo = SimpleUploadedFile('alumnos.csv', contenido, content_type='text/csv')
+        return self.client.post(f'{self.URL}?mesa={self.mesa.pk}', {'archivo': archivo}, format='multipart')
+
+    def test_simular_no_guarda(self):
+        response = self.client.post(f'{self.URL}?mesa={self.mesa.pk}&simular=1', [self.fila('Ana')], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['simulacion'], response.data['creados']), (True, 1))
+        self.assertFalse(Alumno.objects.filter(nombres='Ana').exists())
+
+    def test_duplicados(self):
+        filas = [
+            {'nombres': 'jose', 'apellidos': 'PEREZ', 'fecha_nacimiento': '1990-05-01'},
+            self.fila('Ana'),
+            self.fila('ANA'),
+        ]
+        response = self.client.post(f'{self.URL}?mesa={self.mesa.pk}', filas, format='json')
+        self.assertEqual(response.status_code, 201)
+        resultados = response.data['resultados']
+        self.assertEqual([r['resultado'] for r in resultados], ['duplicado', 'creado', 'duplicado'])
+        self.assertIn('duplicado_de', resultados[0])
+        self.assertEqual(resultados[2]['duplicado_de_indice'], 1)
+
+        response = self.client.post(
+            f'{self.URL}?mesa={self.mesa.pk}&permitir_duplicados=1', filas[:1], format='json'
+        )
+        self.assertEqual(response.data['creados'], 1)
+
+    def test_errores_por_fila(self):
+        filas = [
+            self.fila('Ana'),
+            {'nombres': 'Sin fecha', 'apellidos': 'X'},
+            self.fila('Ajena', mesa=self.mesa_ajena.pk),
+            'no es un objeto',
+        ]
+        response = self.client.post(f'{self.URL}?mesa={self.mesa.pk}', filas, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [r['resultado'] for r in response.data['resultados']],
+            ['creado', 'rechazado', 'rechazado', 'rechazado'],
+        )
+        self.assertIn('fecha_nacimiento', response.data['resultados'][1]['motivo'])
+        self.assertIn('mesa', response.data['resultados'][2]['motivo'])
+        self.assertEqual(Alumno.objects.filter(mesa=self.mesa_ajena).count(), 0)
+
+    def test_csv_en_windows_1252(self):
+        contenido = 'nombres,apellidos,fecha_nacimiento\nMaría,Núñez,1995-03-02\n'.encode('cp1252')
+        response = self.subir_csv(contenido)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Alumno.objects.filter(nombres='María', apellidos='Núñez').exists())
+
+    def test_csv_ilegible(self):
+        response = self.subir_csv(b'nombres,apellidos\n\x81\x8d\x90,X\n')
+        self.assertEqual(response.status_code, 400)
+        grande = 'x' * (csv.field_size_limit() + 1)
+        response = self.subir_csv(f'nombres,apellidos\n{grande},X\n'.encode())
+        self.assertEqual(response.status_code, 400)
+
+
+class InvalidacionTests(TestCase):
+    """
+    El cache de respuestas y las versiones de los ETag se invalidan al
+    confirmar la transacción, no antes: si no, un GET concurrente podría
+    volver a cachear los datos viejos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.facilitador = CustomUser.objects.create_user('facilitador', password='x', role='FACILITADOR')
+        curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        horario = Horario.objects.create(curso=curso, dia='MIE', hora='19:00')
+        cls.mesa = Mesa.objects.create(horario=horario, facilitador=cls.facilitador, nombre_mesa='Mesa 1')
+        cls.alumno = Alumno.objects.create(
+            mesa=cls.mesa, nombres='Juan', apellidos='Pérez', fecha_nacimiento='2000-01-01'
+        )
+        cls.asistencia = Asistencia.objects.create(alumno=cls.alumno, numero_clase=1, estado='A')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.facilitador)
+
+    def assertCambiaAlConfirmar(self, peticion, version=lambda: versiones.estado(Asistencia)[0]):
+        antes = version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = peticion()
+            self.assertLess(response.status_code, 300)
+            self.assertEqual(version(), antes)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(version(), antes)
+
+    def test_bulk_upsert(self):
+        registros = [{'alumno': self.alumno.pk, 'numero_clase': 2, 'estado': 'A'}]
+        self.assertCambiaAlConfirmar(
+            lambda: self.client.post('/api/v1/asistencias/bulk_upsert/', registros, format='json')
+        )
+
+    def test_edicion(self):
+        self.assertCambiaAlConfirmar(lambda: self.client.patch(
+            f'/api/v1/asistencias/{self.asistencia.pk}/', {'estado': 'F'}, format='json'
+        ))
+
+    def test_cascada(self):
+        admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        self.client.force_authenticate(admin)
+        self.assertCambiaAlConfirmar(
+            lambda: self.client.patch(f'/api/v1/mesas/{self.mesa.pk}/', {'activo': False}, format='json'),
+            cache_respuestas.version_actual,
+        )
+
+    def test_cambio_de_facilitador(self):
+        # Las copias se propagan en la transacción; la versión, al confirmar
+        otro = CustomUser.objects.create_user('otro', password='x', role='FACILITADOR')
+        admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        self.client.force_authenticate(admin)
+        self.assertCambiaAlConfirmar(
+            lambda: self.client.patch(f'/api/v1/mesas/{self.mesa.pk}/', {'facilitador_id': otro.pk}, format='json'),
+            lambda: versiones.estado(Alumno)[0],
+        )
+
+    def test_usuario_desactivado(self):
+        estado_usuario(self.facilitador.pk)
+        clave = clave_estado(self.facilitador.pk)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.facilitador.is_active = False
+            self.facilitador.save()
+            self.assertIsNotNone(cache.get(clave))
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(cache.get(clave))
+
+
+class ResumenAsistenciaTests(TestCase):
+    """
+    La tabla de resumen coincide con el cálculo desde cero después de
+    cada tipo de escritura.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        facilitador = CustomUser.objects.create_user('facilitador', password='x', role='FACILITADOR')
+        curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        cls.h1 = Horario.objects.create(curso=curso, dia='MIE', hora='19:00')
+        cls.h2 = Horario.objects.create(curso=curso, dia='DOM', hora='09:00')
+        cls.m1 = Mesa.objects.create(horario=cls.h1, facilitador=facilitador, nombre_mesa='Mesa 1')
+        cls.m2 = Mesa.objects.create(horario=cls.h2, facilitador=facilitador, nombre_mesa='Mesa 2')
+        cls.alumnos = [
+            Alumno.objects.create(mesa=mesa, nombres=f'A{n}', apellidos='X', fecha_nacimiento='2000-01-01')
+            for n, mesa in enumerate([cls.m1, cls.m1, cls.m2])
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def assertResumenAlDia(self):
+        self.assertEqual(resumen.verificar(), [])
+
+    def test_escrituras_por_la_api(self):
+        a1, a2, a3 = self.alumnos
+        response = self.client.post(
+            '/api/v1/asistencias/', {'alumno': a1.pk, 'numero_clase': 1, 'estado': 'A'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertResumenAlDia()
+
+        registros = [
+            {'alumno': alumno.pk, 'numero_clase': clase, 'estado': 'F'}
+            for alumno in self.alumnos for clase in (1, 2)
+        ]
+        response = self.client.post('/api/v1/asistencias/bulk_upsert/', registros, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertResumenAlDia()
+
+        asistencia = Asistencia.objects.get(alumno=a2, numero_clase=2)
+        self.client.patch(f'/api/v1/asistencias/{asistencia.pk}/', {'estado': 'R'}, format='json')
+        self.assertResumenAlDia()
+
+        self.client.delete(f'/api/v1/asistencias/{asistencia.pk}/')
+        self.assertResumenAlDia()
+
+        # Cambio de mesa del alumno y de horario de la mesa
+        self.client.patch(f'/api/v1/alumnos/{a1.pk}/', {'mesa': self.m2.pk}, format='json')
+        self.assertResumenAlDia()
+        self.client.patch(f'/api/v1/mesas/{self.m1.pk}/', {'horario': self.h2.pk}, format='json')
+        self.assertResumenAlDia()
+
+    def test_borrados(self):
+        for alumno in self.alumnos:
+            for clase in (1, 2, 3):
+                Asistencia.objects.create(alumno=alumno, numero_clase=clase, estado='A' if clase < 3 else 'F')
+        self.assertResumenAlDia()
+
+        # Los alumnos de una mesa borrada quedan sin mesa
+        mesa_id = self.m1.pk
+        self.m1.delete()
+        self.assertResumenAlDia()
+        self.assertFalse(ResumenAsistencia.objects.filter(mesa_id=mesa_id).exists())
+
+        self.alumnos[0].delete()
+        self.assertResumenAlDia()
+        self.h2.delete()
+        self.assertResumenAlDia()
+        self.assertEqual(
+            sum(ResumenAsistencia.objects.filter(mesa__isnull=True).values_list('total', flat=True)),
+            Asistencia.objects.count(),
+        )
+
+    def test_una_fila_por_clave_sin_mesa(self):
+        ResumenAsistencia.objects.create(mesa=None, numero_clase=1, estado='A', total=1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ResumenAsistencia.objects.create(mesa=None, numero_clase=1, estado='A', total=1)
+
+
+class SincronizacionTests(TestCase):
+    """
+    GET /sync/: el cursor se puede pegar en la URL tal cual, con él solo
+    llega lo que cambió, y las lápidas llegan a quien corresponde.
+    """
+
+    URL = '/api/v1/sync/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        cls.facilitador = CustomUser.objects.create_user('facilitador', password='x', role='FACILITADOR')
+        cls.otro = CustomUser.objects.create_user('otro', password='x', role='FACILITADOR')
+        curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        horario = Horario.objects.create(curso=curso, dia='MIE', hora='19:00')
+        cls.m1 = Mesa.objects.create(horario=horario, facilitador=cls.facilitador, nombre_mesa='Mesa 1')
+        cls.m2 = Mesa.objects.create(horario=horario, facilitador=cls.facilitador, nombre_mesa='Mesa 2')
+        cls.a1 = Alumno.objects.create(mesa=cls.m1, nombres='A1', apellidos='X', fecha_nacimiento='2000-01-01')
+        cls.a2 = Alumno.objects.create(mesa=cls.m1, nombres='A2', apellidos='X', fecha_nacimiento='2000-01-01')
+        cls.a3 = Alumno.objects.create(mesa=cls.m2, nombres='A3', apellidos='X', fecha_nacimiento='2000-01-01')
+        cls.asistencia = Asistencia.objects.create(alumno=cls.a1, numero_clase=1, estado='A')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.facilitador)
+        # Todo lo de setUpTestData quedó "viejo" respecto al cursor
+        hace_una_hora = sincronizacion.ahora() - datetime.timedelta(hours=1)
+        for modelo in (Horario, Mesa, Alumno, Asistencia):
+            modelo.objects.update(actualizado=hace_una_hora)
+
+    def sincronizar(self, cursor=None):
+        # El cursor va en la URL sin codificar, como lo pegaría un cliente
+        response = self.client.get(self.URL + (f'?since={cursor}' if cursor else ''))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def ids(self, data, nombre, clave='actualizados'):
+        return sorted(fila['id'] if isinstance(fila, dict) else fila for fila in data[nombre].get(clave, []))
+
+    def test_completo_y_cursor(self):
+        data = self.sincronizar()
+        self.assertTrue(data['completo'])
+        self.assertEqual(self.ids(data, 'alumnos'), [self.a1.pk, self.a2.pk, self.a3.pk])
+        self.assertNotIn('+', data['cursor'])
+        self.assertNotIn(' ', data['cursor'])
+
+        data = self.sincronizar(data['cursor'])
+        self.assertFalse(data['completo'])
+        self.assertEqual(self.ids(data, 'alumnos'), [])
+
+        response = self.client.get(self.URL, {'since': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_iso_de_antes(self):
+        # Los cursores viejos eran la fecha ISO; el '+' llegaba como espacio
+        fecha = sincronizacion.ahora().isoformat()
+        self.assertEqual(sincronizacion.leer_cursor(fecha.replace('+', ' ')), sincronizacion.leer_fecha(fecha))
+        self.assertFalse(self.sincronizar(fecha.replace('+', '%2B'))['completo'])
+
+    def test_cambios_y_lapidas(self):
+        cursor = self.sincronizar()['cursor']
+
+        self.client.patch(f'/api/v1/alumnos/{self.a2.pk}/', {'telefono': '123'}, format='json')
+        self.client.delete(f'/api/v1/asistencias/{self.asistencia.pk}/')
+        # La mesa 2 (con su alumno) pasa a otro facilitador
+        self.m2.facilitador = self.otro
+        self.m2.save()
+
+        data = self.sincronizar(cursor)
+        self.assertEqual(self.ids(data, 'alumnos'), [self.a2.pk])
+        self.assertEqual(self.ids(data, 'asistencias', 'eliminados'), [self.asistencia.pk])
+        self.assertEqual(self.ids(data, 'mesas', 'eliminados'), [self.m2.pk])
+        self.assertEqual(self.ids(data, 'alumnos', 'eliminados'), [self.a3.pk])
+
+        # Al admin una reasignación no le quita nada; un borrado sí
+        self.client.force_authenticate(self.admin)
+        data = self.sincronizar(cursor)
+        self.assertEqual(self.ids(data, 'mesas', 'eliminados'), [])
+        self.assertEqual(self.ids(data, 'asistencias', 'eliminados'), [self.asistencia.pk])
+        self.assertIn(self.m2.pk, self.ids(data, 'mesas'))
+
+        self.client.force_authenticate(self.otro)
+        data = self.sincronizar(cursor)
+        self.assertEqual(self.ids(data, 'mesas'), [self.m2.pk])
+        self.assertEqual(self.ids(data, 'alumnos'), [self.a3.pk])
+
+
+class PaginacionKeysetTests(TestCase):
+    """
+    Paginación por cursor ordenando por un campo con empates
+    (?ordering=-faltas): ninguna fila se salta ni se repite, hacia
+    adelante ni hacia atrás, aunque cambien los datos entre páginas.
+    """
+
+    URL = '/api/v1/alumnos/?resumen=1&ordering=-faltas'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        facilitador = CustomUser.objects.create_user('facilitador', password='x', role='FACILITADOR')
+        curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        horario = Horario.objects.create(curso=curso, dia='MIE', hora='19:00')
+        cls.mesa = Mesa.objects.create(horario=horario, facilitador=facilitador, nombre_mesa='Mesa 1')
+        # (faltas, activo): muchos empates en faltas y apellidos
+        cls.esperado = []
+        for n, (faltas, activo) in enumerate([(2, True), (0, True), (2, True), (1, False), (1, True),
+                                              (2, False), (0, True), (1, True), (2, True)]):
+            alumno = Alumno.objects.create(
+                mesa=cls.mesa, nombres=f'A{n}', apellidos='Igual', fecha_nacimiento='2000-01-01', activo=activo
+            )
+            for clase in range(1, faltas + 1):
+                Asistencia.objects.create(alumno=alumno, numero_clase=clase, estado='F')
+            cls.esperado.append((-faltas, not activo, alumno.pk))
+        cls.esperado = [pk for *_, pk in sorted(cls.esperado)]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def pagina(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [fila['id'] for fila in response.data['results']], response.data
+
+    def test_hacia_adelante_y_hacia_atras(self):
+        ids, data = self.pagina(f'{self.URL}&page_size=2')
+        paginas = [ids]
+        while data['next']:
+            ids, data = self.pagina(data['next'])
+            paginas.append(ids)
+        self.assertEqual([pk for pagina in paginas for pk in pagina], self.esperado)
+        self.assertEqual(len(paginas), 5)
+
+        atras = []
+        while data['previous']:
+            ids, data = self.pagina(data['previous'])
+            atras.append(ids)
+        self.assertEqual(atras, paginas[-2::-1])
+
+    def test_cursor_estable(self):
+        ids, data = self.pagina(f'{self.URL}&page_size=3')
+        # Un alumno nuevo que quedaría antes del cursor no mueve las páginas siguientes
+        nuevo = Alumno.objects.create(
+            mesa=self.mesa, nombres='Nuevo', apellidos='Igual', fecha_nacimiento='2000-01-01'
+        )
+        for clase in range(1, 6):
+            Asistencia.objects.create(alumno=nuevo, numero_clase=clase, estado='F')
+        vistos = list(ids)
+        while data['next']:
+            ids, data = self.pagina(data['next'])
+            vistos.extend(ids)
+        self.assertEqual(vistos, self.esperado)
+
+        # El mismo cursor devuelve la misma página
+        _, data = self.pagina(f'{self.URL}&page_size=3')
+        siguiente = data['next']
+        self.assertEqual(self.pagina(siguiente)[0], self.pagina(siguiente)[0])
+
+    def test_modo_compatibilidad(self):
+        # Sin ?page_size ni ?cursor: la lista completa, como antes
+        response = self.client.get(self.URL)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual([fila['id'] for fila in response.data], self.esperado)
+        with self.settings(PAGINACION_OBLIGATORIA=True):
+            _, data = self.pagina(self.URL)
+        self.assertEqual(len(data['results']), len(self.esperado))
+
+        response = self.client.get(f'{self.URL}&cursor=no-es-un-cursor')
+        self.assertEqual(response.status_code, 404)
+
+
+class DenormalizacionTests(TestCase):
+    """
+    Las copias facilitador/curso de Alumno y Asistencia (las que usa el
+    permiso de objeto) siguen a la mesa cuando un alumno cambia de mesa,
+    una mesa de facilitador o un horario de curso.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.f1 = CustomUser.objects.create_user('f1', password='x', role='FACILITADOR')
+        cls.f2 = CustomUser.objects.create_user('f2', password='x', role='FACILITADOR')
+        cls.c1 = Curso.objects.create(nombre='Curso 1', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        cls.c2 = Curso.objects.create(nombre='Curso 2', fecha_inicio='2025-07-01', fecha_fin='2025-12-01')
+        cls.h1 = Horario.objects.create(curso=cls.c1, dia='MIE', hora='19:00')
+        h2 = Horario.objects.create(curso=cls.c2, dia='DOM', hora='09:00')
+        cls.m1 = Mesa.objects.create(horario=cls.h1, facilitador=cls.f1, nombre_mesa='Mesa 1')
+        cls.m2 = Mesa.objects.create(horario=h2, facilitador=cls.f2, nombre_mesa='Mesa 2')
+        cls.alumno = Alumno.objects.create(
+            mesa=cls.m1, nombres='Juan', apellidos='Pérez', fecha_nacimiento='2000-01-01'
+        )
+        cls.asistencia = Asistencia.objects.create(alumno=cls.alumno, numero_clase=1, estado='A')
+
+    def setUp(self):
+        cache.clear()
+
+    def assertCopias(self, facilitador, curso):
+        self.alumno.refresh_from_db()
+        self.asistencia.refresh_from_db()
+        for objeto in (self.alumno, self.asistencia):
+            self.assertEqual((objeto.facilitador_id, objeto.curso_id), (facilitador.pk, curso.pk))
+        self.assertEqual([list(qs) for qs in denormalizacion.inconsistencias()], [[], []])
+
+    def assertDueno(self, dueno, otro):
+        for user, codigo in ((dueno, 200), (otro, 404)):
+            client = APIClient()
+            client.force_authenticate(user)
+            self.assertEqual(client.get(f'/api/v1/alumnos/{self.alumno.pk}/').status_code, codigo)
+            self.assertEqual(client.get(f'/api/v1/asistencias/{self.asistencia.pk}/').status_code, codigo)
+            permiso = IsFacilitadorOwnerOrAdmin()
+            request = type('Request', (), {'user': user})()
+            self.assertEqual(permiso.has_object_permission(request, None, self.asistencia), codigo == 200)
+
+    def test_alumno_cambia_de_mesa(self):
+        self.assertCopias(self.f1, self.c1)
+        self.alumno.mesa = self.m2
+        self.alumno.save()
+        self.assertCopias(self.f2, self.c2)
+        self.assertDueno(self.f2, self.f1)
+
+    def test_mesa_cambia_de_facilitador(self):
+        self.m1.facilitador = self.f2
+        self.m1.save()
+        self.assertCopias(self.f2, self.c1)
+        self.assertDueno(self.f2, self.f1)
+
+    def test_horario_cambia_de_curso(self):
+        self.h1.curso = self.c2
+        self.h1.save()
+        self.assertCopias(self.f1, self.c2)
+
+    def test_mesa_borrada(self):
+        # El SET_NULL del borrado no dispara señales: las copias se limpian aparte
+        self.m1.delete()
+        self.alumno.refresh_from_db()
+        self.asistencia.refresh_from_db()
+        self.assertIsNone(self.alumno.mesa_id)
+        for objeto in (self.alumno, self.asistencia):
+            self.assertEqual((objeto.facilitador_id, objeto.curso_id), (None, None))
+        self.assertEqual([list(qs) for qs in denormalizacion.inconsistencias()], [[], []])
+
+        client = APIClient()
+        client.force_authenticate(self.f1)
+        self.assertEqual(client.get('/api/v1/alumnos/').data, [])
+        self.assertEqual(client.get(f'/api/v1/alumnos/{self.alumno.pk}/').status_code, 404)
+        self.assertEqual(client.get(f'/api/v1/asistencias/{self.asistencia.pk}/').status_code, 404)
+        permiso = IsFacilitadorOwnerOrAdmin()
+        request = type('Request', (), {'user': self.f1})()
+        self.assertFalse(permiso.has_object_permission(request, None, self.alumno))
+
+
+class ExportarTests(TestCase):
+    """
+    Las exportaciones no dejan pasar fórmulas: en CSV el texto que Excel
+    ejecutaría sale con un apóstrofo delante; en XLSX sale tal cual, en
+    celdas de texto.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        facilitador = CustomUser.objects.create_user(
+            'facilitador', password='x', role='FACILITADOR', first_name='@Ana'
+        )
+        cls.curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        horario = Horario.objects.create(curso=cls.curso, dia='MIE', hora='19:00')
+        mesa = Mesa.objects.create(horario=horario, facilitador=facilitador, nombre_mesa='-Mesa')
+        Alumno.objects.create(
+            mesa=mesa, nombres='=HYPERLINK("http://x","y")', apellidos='Pérez',
+            fecha_nacimiento='2000-01-01', telefono='+528112345678', colonia='Centro',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def filas(self, formato):
+        response = self.client.get('/api/v1/exportar/alumnos/', {'curso': self.curso.pk, 'formato': formato})
+        self.assertEqual(response.status_code, 200)
+        contenido = b''.join(response.streaming_content)
+        if formato == 'csv':
+            return list(csv.reader(StringIO(contenido.decode('utf-8-sig'))))
+        libro = openpyxl.load_workbook(BytesIO(contenido))
+        return [list(fila) for fila in libro.active.iter_rows()]
+
+    def test_csv(self):
+        encabezado, alumno = self.filas('csv')
+        fila = dict(zip(encabezado, alumno))
+        self.assertEqual(fila['Nombres'], '\'=HYPERLINK("http://x","y")')
+        self.assertEqual(fila['Teléfono'], "'+528112345678")
+        self.assertEqual(fila['Mesa'], "'-Mesa")
+        self.assertEqual(fila['Facilitador'], "'@Ana")
+        self.assertEqual((fila['Apellidos'], fila['Colonia']), ('Pérez', 'Centro'))
+
+    @skipIf(openpyxl is None, "openpyxl no está instalado")
+    def test_xlsx(self):
+        encabezado, alumno = self.filas('xlsx')
+        fila = dict(zip([celda.value for celda in encabezado], alumno))
+        # Ninguna celda es fórmula y los datos no cambian
+        self.assertNotIn('f', {celda.data_type for celda in alumno})
+        self.assertEqual(fila['Nombres'].data_type, 's')
+        self.assertEqual(fila['Nombres'].value, '=HYPERLINK("http://x","y")')
+        self.assertEqual(fila['Teléfono'].value, '+528112345678')
+        self.assertEqual(fila['Mesa'].value, '-Mesa')
+        self.assertEqual(fila['Facilitador'].value, '@Ana')
+
+
+
+class HojaAsistenciaTests(TestCase):
+    """
+    GET /asistencia-hoja/: cuatro consultas por mesa o por horario, las
+    faltas pendientes de cada alumno, solo las mesas propias y la
+    validación de los parámetros.
+    """
+
+    URL = '/api/v1/asistencia-hoja/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        cls.f1 = CustomUser.objects.create_user('f1', password='x', role='FACILITADOR')
+        f2 = CustomUser.objects.create_user('f2', password='x', role='FACILITADOR')
+        curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        cls.h1 = Horario.objects.create(curso=curso, dia='MIE', hora='19:00')
+        cls.h2 = Horario.objects.create(curso=curso, dia='DOM', hora='09:00')
+        Horario.objects.create(curso=curso, dia='SAB', hora='10:00', activo=False)
+        cls.m1 = Mesa.objects.create(horario=cls.h1, facilitador=cls.f1, nombre_mesa='Mesa 1')
+        cls.m2 = Mesa.objects.create(horario=cls.h1, facilitador=f2, nombre_mesa='Mesa 2')
+        cls.alumnos = [
+            Alumno.objects.create(mesa=mesa, nombres=f'A{n}', apellidos=f'X{n}', fecha_nacimiento='2000-01-01')
+            for n, mesa in enumerate([cls.m1, cls.m1, cls.m1, cls.m2, cls.m2])
+        ]
+        Alumno.objects.create(
+            mesa=cls.m1, nombres='Baja', apellidos='Z', fecha_nacimiento='2000-01-01', activo=False
+        )
+        cls.actual = Asistencia.objects.create(alumno=cls.alumnos[0], numero_clase=4, estado='A')
+        for clase, estado in [(1, 'F'), (2, 'R'), (3, 'F'), (5, 'F')]:
+            Asistencia.objects.create(alumno=cls.alumnos[0], numero_clase=clase, estado=estado)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.f1)
+
+    def test_por_mesa(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(self.URL, {'mesa': self.m1.pk, 'numero_clase': 4})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['horario']['id'], self.h1.pk)
+        self.assertEqual([h['id'] for h in response.data['horarios_alternativos']], [self.h2.pk])
+        [mesa] = response.data['mesas']
+        self.assertEqual(mesa['id'], self.m1.pk)
+        alumnos = {a['id']: a for a in mesa['alumnos']}
+        self.assertEqual(list(alumnos), [a.pk for a in self.alumnos[:3]])
+
+        primero = alumnos[self.alumnos[0].pk]
+        self.assertEqual((primero['asistencia']['id'], primero['asistencia']['estado']), (self.actual.pk, 'A'))
+        # Solo las F anteriores a la clase pedida (la R no cuenta, la clase 5 es posterior)
+        self.assertEqual(primero['faltas_pendientes'], [1, 3])
+        segundo = alumnos[self.alumnos[1].pk]
+        self.assertEqual((segundo['asistencia'], segundo['faltas_pendientes']), (None, []))
+
+    def test_por_horario(self):
+        self.client.force_authenticate(self.admin)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.URL, {'horario': self.h1.pk, 'numero_clase': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([m['id'] for m in response.data['mesas']], [self.m1.pk, self.m2.pk])
+        self.assertEqual([len(m['alumnos']) for m in response.data['mesas']], [3, 2])
+
+        # El facilitador solo ve sus mesas del horario
+        self.client.force_authenticate(self.f1)
+        response = self.client.get(self.URL, {'horario': self.h1.pk, 'numero_clase': 1})
+        self.assertEqual([m['id'] for m in response.data['mesas']], [self.m1.pk])
+
+    def test_mesa_ajena(self):
+        response = self.client.get(self.URL, {'mesa': self.m2.pk, 'numero_clase': 1})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(self.URL, {'horario': 0, 'numero_clase': 1})
+        self.assertEqual(response.status_code, 404)
+
+    def test_validacion(self):
+        casos = [
+            ({'mesa': self.m1.pk}, 'numero_clase'),
+            ({'mesa': self.m1.pk, 'numero_clase': 'x'}, 'numero_clase'),
+            ({'mesa': self.m1.pk, 'numero_clase': 0}, 'numero_clase'),
+            ({'mesa': self.m1.pk, 'numero_clase': TOTAL_CLASES + 1}, 'numero_clase'),
+            ({'numero_clase': 1}, 'mesa'),
+            ({'mesa': 'x', 'numero_clase': 1}, 'mesa'),
+            ({'horario': 'x', 'numero_clase': 1}, 'horario'),
+        ]
+        for params, campo in casos:
+            with self.subTest(params=params):
+                response = self.client.get(self.URL, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.data), [campo])
+
+
+class ArbolCursoTests(TestCase):
+    """
+    GET /cursos/{id}/arbol/: número de consultas constante, conteos de
+    alumnos y de la última clase, y solo las mesas propias para un
+    facilitador.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        cls.f1 = CustomUser.objects.create_user('f1', password='x', role='FACILITADOR')
+        cls.f2 = CustomUser.objects.create_user('f2', password='x', role='FACILITADOR')
+        cls.curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        cls.h1 = Horario.objects.create(curso=cls.curso, dia='MIE', hora='19:00')
+        cls.h2 = Horario.objects.create(curso=cls.curso, dia='DOM', hora='09:00')
+        cls.m1 = Mesa.objects.create(horario=cls.h1, facilitador=cls.f1, nombre_mesa='Mesa 1')
+        cls.m2 = Mesa.objects.create(horario=cls.h1, facilitador=cls.f2, nombre_mesa='Mesa 2')
+        cls.m3 = Mesa.objects.create(horario=cls.h2, facilitador=cls.f2, nombre_mesa='Mesa 3')
+        # Mesa 1: dos activos y uno inactivo. Última clase (2): una A y una F
+        a1, a2, _ = [
+            Alumno.objects.create(
+                mesa=cls.m1, nombres=f'A{n}', apellidos='X', fecha_nacimiento='2000-01-01', activo=activo
+            )
+            for n, activo in enumerate([True, True, False])
+        ]
+        a3 = Alumno.objects.create(mesa=cls.m2, nombres='B', apellidos='X', fecha_nacimiento='2000-01-01')
+        Asistencia.objects.create(alumno=a1, numero_clase=1, estado='F')
+        Asistencia.objects.create(alumno=a1, numero_clase=2, estado='A')
+        Asistencia.objects.create(alumno=a2, numero_clase=2, estado='F')
+        Asistencia.objects.create(alumno=a3, numero_clase=2, estado='R')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def url(self):
+        return f'/api/v1/cursos/{self.curso.pk}/arbol/'
+
+    def test_consultas_constantes(self):
+        with CaptureQueriesContext(connection) as antes:
+            self.assertEqual(self.client.get(self.url()).status_code, 200)
+        horario = Horario.objects.create(curso=self.curso, dia='SAB', hora='10:00')
+        for n in range(5):
+            mesa = Mesa.objects.create(horario=horario, facilitador=self.f1, nombre_mesa=f'Extra {n}')
+            alumno = Alumno.objects.create(mesa=mesa, nombres='N', apellidos='X', fecha_nacimiento='2000-01-01')
+            Asistencia.objects.create(alumno=alumno, numero_clase=2, estado='A')
+        cache.clear()
+        with self.assertNumQueries(len(antes)):
+            self.assertEqual(self.client.get(self.url()).status_code, 200)
+        self.assertLessEqual(len(antes), 4)
+
+    def test_conteos(self):
+        data = self.client.get(self.url()).data
+        self.assertEqual(data['numero_ultima_clase'], 2)
+        self.assertEqual((data['alumnos_activos'], data['alumnos_inactivos']), (3, 1))
+        self.assertEqual(data['ultima_clase'], {'registros': 3, 'presentes': 2, 'tasa_asistencia': 0.6667})
+
+        domingo, miercoles = data['horarios']
+        self.assertEqual((miercoles['alumnos_activos'], miercoles['alumnos_inactivos']), (3, 1))
+        mesa1, mesa2 = miercoles['mesas']
+        self.assertEqual((mesa1['alumnos_activos'], mesa1['alumnos_inactivos']), (2, 1))
+        self.assertEqual(mesa1['ultima_clase'], {'registros': 2, 'presentes': 1, 'tasa_asistencia': 0.5})
+        self.assertEqual(mesa2['ultima_clase']['tasa_asistencia'], 1.0)
+        self.assertEqual(mesa1['facilitador']['id'], self.f1.pk)
+        # Sin registros en la última clase la tasa es null
+        self.assertEqual(domingo['mesas'][0]['ultima_clase'], {'registros': 0, 'presentes': 0, 'tasa_asistencia': None})
+
+    def test_facilitador_solo_ve_sus_mesas(self):
+        self.client.force_authenticate(self.f1)
+        data = self.client.get(self.url()).data
+        # El horario del domingo no tiene mesas suyas: no aparece
+        self.assertEqual([h['id'] for h in data['horarios']], [self.h1.pk])
+        self.assertEqual([m['id'] for m in data['horarios'][0]['mesas']], [self.m1.pk])
+        self.assertEqual((data['alumnos_activos'], data['alumnos_inactivos']), (2, 1))
+        self.assertEqual(data['ultima_clase']['registros'], 2)
+
+        self.client.force_authenticate(self.f2)
+        data = self.client.get(self.url()).data
+        self.assertEqual(
+            [m['id'] for h in data['horarios'] for m in h['mesas']], [self.m3.pk, self.m2.pk]
+        )
+
+
+class FiltrosAsistenciaTests(TestCase):
+    """
+    Filtros de GET /asistencias/ (?numero_clase, ?alumno, ?mesa,
+    ?horario, ?curso, ?estado), combinados con el alcance del usuario.
+    """
+
+    URL = '/api/v1/asistencias/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        cls.f1 = CustomUser.objects.create_user('f1', password='x', role='FACILITADOR')
+        f2 = CustomUser.objects.create_user('f2', password='x', role='FACILITADOR')
+        c1 = Curso.objects.create(nombre='Curso 1', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        c2 = Curso.objects.create(nombre='Curso 2', fecha_inicio='2025-07-01', fecha_fin='2025-12-01')
+        h1 = Horario.objects.create(curso=c1, dia='MIE', hora='19:00')
+        h2 = Horario.objects.create(curso=c2, dia='DOM', hora='09:00')
+        m1 = Mesa.objects.create(horario=h1, facilitador=cls.f1, nombre_mesa='Mesa 1')
+        m2 = Mesa.objects.create(horario=h1, facilitador=f2, nombre_mesa='Mesa 2')
+        m3 = Mesa.objects.create(horario=h2, facilitador=cls.f1, nombre_mesa='Mesa 3')
+        cls.ids = {'c1': c1.pk, 'h2': h2.pk, 'm1': m1.pk, 'm2': m2.pk, 'm3': m3.pk}
+        # Un alumno por mesa con las clases 1 (A), 2 (F) y 3 (R); clave (mesa, clase)
+        cls.asistencias = {}
+        for n, mesa in enumerate((m1, m2, m3), 1):
+            alumno = Alumno.objects.create(mesa=mesa, nombres='A', apellidos='X', fecha_nacimiento='2000-01-01')
+            cls.ids[f'alumno{n}'] = alumno.pk
+            for clase, estado in [(1, 'A'), (2, 'F'), (3, 'R')]:
+                cls.asistencias[n, clase] = Asistencia.objects.create(
+                    alumno=alumno, numero_clase=clase, estado=estado
+                ).pk
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def ids_de(self, **params):
+        response = self.client.get(self.URL, params)
+        self.assertEqual(response.status_code, 200)
+        return {fila['id'] for fila in response.data}
+
+    def esperados(self, *claves):
+        return {self.asistencias[clave] for clave in claves}
+
+    def test_filtros(self):
+        casos = [
+            ({'numero_clase': 2}, [(1, 2), (2, 2), (3, 2)]),
+            ({'alumno': self.ids['alumno2']}, [(2, 1), (2, 2), (2, 3)]),
+            ({'mesa': self.ids['m1']}, [(1, 1), (1, 2), (1, 3)]),
+            ({'horario': self.ids['h2']}, [(3, 1), (3, 2), (3, 3)]),
+            ({'curso': self.ids['c1'], 'numero_clase': 1}, [(1, 1), (2, 1)]),
+            ({'estado': 'f,r', 'mesa': self.ids['m3']}, [(3, 2), (3, 3)]),
+            ({'numero_clase': ''}, list(self.asistencias)),
+        ]
+        for params, claves in casos:
+            with self.subTest(params=params):
+                self.assertEqual(self.ids_de(**params), self.esperados(*claves))
+
+    def test_filtros_dentro_del_alcance(self):
+        self.client.force_authenticate(self.f1)
+        self.assertEqual(self.ids_de(numero_clase=1), self.esperados((1, 1), (3, 1)))
+        # Filtrar por una mesa ajena no la hace visible
+        self.assertEqual(self.ids_de(mesa=self.ids['m2']), set())
+
+    def test_parametros_invalidos(self):
+        casos = [
+            ({'numero_clase': 'x'}, 'numero_clase'),
+            ({'alumno': '1.5'}, 'alumno'),
+            ({'mesa': 'abc'}, 'mesa'),
+            ({'horario': '[1]'}, 'horario'),
+            ({'curso': 'uno'}, 'curso'),
+            ({'estado': 'A,X'}, 'estado'),
+        ]
+        for params, campo in casos:
+            with self.subTest(params=params):
+                response = self.client.get(self.URL, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.data), [campo])
+
+
+class AlcanceTests(TestCase):
+    """
+    El alcance cacheado de un facilitador se descarta (al confirmar)
+    cuando cambia alguna de sus asignaciones.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.f1 = CustomUser.objects.create_user('f1', password='x', role='FACILITADOR')
+        cls.f2 = CustomUser.objects.create_user('f2', password='x', role='FACILITADOR')
+        cls.c1 = Curso.objects.create(nombre='Curso 1', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        cls.c2 = Curso.objects.create(nombre='Curso 2', fecha_inicio='2025-07-01', fecha_fin='2025-12-01')
+        cls.h1 = Horario.objects.create(curso=cls.c1, dia='MIE', hora='19:00')
+        cls.m1 = Mesa.objects.create(horario=cls.h1, facilitador=cls.f1, nombre_mesa='Mesa 1')
+        cls.m2 = Mesa.objects.create(horario=cls.h1, facilitador=cls.f2, nombre_mesa='Mesa 2')
+        cls.alumno = Alumno.objects.create(
+            mesa=cls.m1, nombres='Juan', apellidos='Pérez', fecha_nacimiento='2000-01-01'
+        )
+
+    def setUp(self):
+        cache.clear()
+        # Ambos alcances quedan en el cache
+        alcance.de(self.f1)
+        alcance.de(self.f2)
+
+    def cambiar(self, funcion):
+        """
+        Ejecuta 'funcion' y comprueba que el cache sigue igual hasta que
+        se confirma la transacción.
+        """
+        with self.captureOnCommitCallbacks() as callbacks:
+            funcion()
+            with self.assertNumQueries(0):
+                alcance.de(self.f1)
+                alcance.de(self.f2)
+        self.assertTrue(callbacks)
+        for callback in callbacks:
+            callback()
+
+    def test_cacheado(self):
+        with self.assertNumQueries(0):
+            datos = alcance.de(self.f1)
+        self.assertEqual(datos['alumnos'], {self.alumno.pk: self.m1.pk})
+        self.assertEqual(datos['mesas_activas'], {self.m1.pk})
+
+    def test_mesa_cambia_de_facilitador(self):
+        self.m1.facilitador = self.f2
+        self.cambiar(self.m1.save)
+        self.assertEqual((alcance.de(self.f1)['mesas'], alcance.de(self.f1)['alumnos']), ({}, {}))
+        self.assertEqual(set(alcance.de(self.f2)['mesas']), {self.m1.pk, self.m2.pk})
+        self.assertIn(self.alumno.pk, alcance.de(self.f2)['alumnos'])
+
+    def test_mesa_desactivada(self):
+        self.m1.activo = False
+        self.cambiar(self.m1.save)
+        self.assertEqual(alcance.de(self.f1)['mesas_activas'], set())
+
+    def test_alumno_cambia_de_mesa(self):
+        self.alumno.mesa = self.m2
+        self.cambiar(self.alumno.save)
+        self.assertEqual(alcance.de(self.f1)['alumnos'], {})
+        self.assertEqual(alcance.de(self.f2)['alumnos'], {self.alumno.pk: self.m2.pk})
+
+    def test_alumno_nuevo_y_borrado(self):
+        nuevo = Alumno(mesa=self.m1, nombres='Ana', apellidos='X', fecha_nacimiento='2000-01-01')
+        self.cambiar(nuevo.save)
+        self.assertIn(nuevo.pk, alcance.de(self.f1)['alumnos'])
+        self.cambiar(self.alumno.delete)
+        self.assertEqual(alcance.de(self.f1)['alumnos'], {nuevo.pk: self.m1.pk})
+
+    def test_horario_cambia_de_curso(self):
+        self.h1.curso = self.c2
+        self.cambiar(self.h1.save)
+        for facilitador, mesa in [(self.f1, self.m1), (self.f2, self.m2)]:
+            self.assertEqual(alcance.de(facilitador)['mesas'][mesa.pk]['curso_id'], self.c2.pk)
+
+
+class MatrizAsistenciaTests(TestCase):
+    """
+    GET /asistencia-matriz/: conteos por clase del curso, de cada
+    horario y de cada mesa, la fila compacta por alumno y solo las
+    mesas propias para un facilitador.
+    """
+
+    URL = '/api/v1/asistencia-matriz/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        cls.f1 = CustomUser.objects.create_user('f1', password='x', role='FACILITADOR', first_name='Ana')
+        f2 = CustomUser.objects.create_user('f2', password='x', role='FACILITADOR')
+        cls.curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        otro_curso = Curso.objects.create(
+            nombre='Otro', fecha_inicio='2025-07-01', fecha_fin='2025-12-01', activo=False
+        )
+        h1 = Horario.objects.create(curso=cls.curso, dia='MIE', hora='19:00')
+        cls.m1 = Mesa.objects.create(horario=h1, facilitador=cls.f1, nombre_mesa='Mesa 1')
+        cls.m2 = Mesa.objects.create(horario=h1, facilitador=f2, nombre_mesa='Mesa 2')
+        m3 = Mesa.objects.create(
+            horario=Horario.objects.create(curso=otro_curso, dia='DOM', hora='09:00'),
+            facilitador=cls.f1, nombre_mesa='Mesa 3',
+        )
+        historiales = [(cls.m1, 'AF'), (cls.m1, 'A-R'), (cls.m2, 'FF'), (m3, 'AAA')]
+        cls.alumnos = []
+        for mesa, historial in historiales:
+            alumno = Alumno.objects.create(mesa=mesa, nombres='A', apellidos='X', fecha_nacimiento='2000-01-01')
+            cls.alumnos.append(alumno.pk)
+            for clase, estado in enumerate(historial, 1):
+                if estado != '-':
+                    Asistencia.objects.create(alumno=alumno, numero_clase=clase, estado=estado)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def conteos(self, **por_estado):
+        vacios = {estado: [0] * TOTAL_CLASES for estado in Asistencia.Estado.values}
+        for estado, valores in por_estado.items():
+            vacios[estado][:len(valores)] = valores
+        return vacios
+
+    def test_conteos(self):
+        # Sin ?curso= se usa el curso activo
+        data = self.client.get(self.URL).data
+        self.assertEqual((data['curso'], data['total_clases']), (self.curso.pk, TOTAL_CLASES))
+        self.assertEqual(data['conteos'], self.conteos(A=[2], F=[1, 2], R=[0, 0, 1]))
+        [horario] = data['horarios']
+        self.assertEqual(horario['conteos'], data['conteos'])
+        mesa1, mesa2 = horario['mesas']
+        self.assertEqual((mesa1['id'], mesa1['facilitador']), (self.m1.pk, 'Ana'))
+        self.assertEqual(mesa1['conteos'], self.conteos(A=[2], F=[0, 1], R=[0, 0, 1]))
+        self.assertEqual(mesa2['conteos'], self.conteos(F=[1, 1]))
+        self.assertNotIn('alumnos', data)
+
+    def test_filas_por_alumno(self):
+        data = self.client.get(self.URL, {'curso': self.curso.pk, 'alumnos': 1}).data
+        clases = {fila['id']: fila['clases'] for fila in data['alumnos']}
+        relleno = '-' * (TOTAL_CLASES - 3)
+        self.assertEqual(clases, {
+            self.alumnos[0]: 'AF-' + relleno,
+            self.alumnos[1]: 'A-R' + relleno,
+            self.alumnos[2]: 'FF-' + relleno,
+        })
+
+    def test_facilitador_solo_ve_sus_mesas(self):
+        self.client.force_authenticate(self.f1)
+        data = self.client.get(self.URL, {'curso': self.curso.pk, 'alumnos': 1}).data
+        self.assertEqual([m['id'] for m in data['horarios'][0]['mesas']], [self.m1.pk])
+        self.assertEqual(data['conteos'], self.conteos(A=[2], F=[0, 1], R=[0, 0, 1]))
+        self.assertEqual({fila['id'] for fila in data['alumnos']}, set(self.alumnos[:2]))
+
+    def test_curso_invalido(self):
+        response = self.client.get(self.URL, {'curso': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CumpleanosTests(TestCase):
+    """
+    GET /cumpleanos/ (por mes, próximos N días cruzando el fin de año y
+    calendario) y el campo 'cumple_mmdd' al día con la fecha de nacimiento.
+    """
+
+    URL = '/api/v1/cumpleanos/'
+    HOY = datetime.date(2025, 12, 28)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        cls.facilitador = CustomUser.objects.create_user('facilitador', password='x', role='FACILITADOR')
+        curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        horario = Horario.objects.create(curso=curso, dia='MIE', hora='19:00')
+        cls.mesa = Mesa.objects.create(horario=horario, facilitador=cls.facilitador, nombre_mesa='Mesa 1')
+        cls.mesa_inactiva = Mesa.objects.create(
+            horario=horario, facilitador=cls.facilitador, nombre_mesa='Mesa 2', activo=False
+        )
+        cls.alumnos = {
+            fecha: Alumno.objects.create(
+                mesa=cls.mesa, nombres=fecha, apellidos='X', fecha_nacimiento=f'2000-{fecha}'
+            ).pk
+            for fecha in ('12-27', '12-28', '12-31', '01-01', '01-03', '01-04')
+        }
+        Alumno.objects.create(
+            mesa=cls.mesa, nombres='Baja', apellidos='X', fecha_nacimiento='2000-12-30', activo=False
+        )
+        cls.en_mesa_inactiva = Alumno.objects.create(
+            mesa=cls.mesa_inactiva, nombres='Otra', apellidos='X', fecha_nacimiento='2000-12-29'
+        ).pk
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def ids_de(self, **params):
+        with mock.patch('academia.views.timezone.localdate', return_value=self.HOY):
+            response = self.client.get(self.URL, params)
+        self.assertEqual(response.status_code, 200)
+        return [alumno['id'] for alumno in response.data]
+
+    def test_proximos_dias_cruzando_el_anio(self):
+        # Del 28 de diciembre al 3 de enero, en el orden en que cumplen
+        self.assertEqual(
+            self.ids_de(dias=7),
+            [self.alumnos['12-28'], self.en_mesa_inactiva]
+            + [self.alumnos[f] for f in ('12-31', '01-01', '01-03')],
+        )
+        self.assertEqual(self.ids_de(dias=1), [self.alumnos['12-28']])
+        self.assertEqual(len(self.ids_de(dias=366)), 7)
+
+    def test_por_mes(self):
+        # Sin parámetros, el mes actual (diciembre)
+        self.assertEqual(
+            self.ids_de(),
+            [self.alumnos['12-27'], self.alumnos['12-28'], self.en_mesa_inactiva, self.alumnos['12-31']],
+        )
+        self.assertEqual(self.ids_de(mes=1), [self.alumnos[f] for f in ('01-01', '01-03', '01-04')])
+
+    def test_facilitador_sin_mesas_inactivas(self):
+        self.client.force_authenticate(self.facilitador)
+        self.assertNotIn(self.en_mesa_inactiva, self.ids_de(dias=7))
+
+    def test_calendario(self):
+        with mock.patch('academia.views.timezone.localdate', return_value=self.HOY):
+            data = self.client.get(self.URL, {'anio': 1}).data
+        self.assertEqual(list(data), [str(mes) for mes in range(1, 13)])
+        self.assertEqual([(a['id'], a['dia']) for a in data['1']], [
+            (self.alumnos['01-01'], 1), (self.alumnos['01-03'], 3), (self.alumnos['01-04'], 4),
+        ])
+        self.assertEqual(len(data['12']), 4)
+
+    def test_parametros_invalidos(self):
+        for params in ({'dias': 0}, {'dias': 367}, {'dias': 'x'}, {'mes': 13}, {'mes': 'x'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.URL, params).status_code, 400)
+
+    def test_cumple_mmdd_al_guardar(self):
+        alumno = Alumno.objects.get(pk=self.alumnos['01-03'])
+        self.assertEqual(alumno.cumple_mmdd, 103)
+
+        alumno.fecha_nacimiento = datetime.date(1999, 2, 28)
+        alumno.save(update_fields=['fecha_nacimiento'])
+        alumno.refresh_from_db()
+        self.assertEqual(alumno.cumple_mmdd, 228)
+
+        # También al editar por la API (la fecha llega como texto)
+        response = self.client.patch(
+            f'/api/v1/alumnos/{alumno.pk}/', {'fecha_nacimiento': '2001-11-05'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        alumno.refresh_from_db()
+        self.assertEqual(alumno.cumple_mmdd, 1105)
+
+
+class ResumenAlumnoTests(TestCase):
+    """
+    GET /alumnos/?resumen=1: conteos, tasa, clases faltantes y racha de
+    faltas de cada alumno, calculados con una sola agregación.
+    """
+
+    URL = '/api/v1/alumnos/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        facilitador = CustomUser.objects.create_user('facilitador', password='x', role='FACILITADOR')
+        curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        horario = Horario.objects.create(curso=curso, dia='MIE', hora='19:00')
+        cls.mesa = Mesa.objects.create(horario=horario, facilitador=facilitador, nombre_mesa='Mesa 1')
+        # '-' = sin registro. La última clase del curso con registros es la 7
+        historiales = {'Irregular': 'AFR-FF', 'Tardio': '------A', 'Nuevo': ''}
+        cls.alumnos = {}
+        for nombre, historial in historiales.items():
+            alumno = Alumno.objects.create(
+                mesa=cls.mesa, nombres=nombre, apellidos=nombre, fecha_nacimiento='2000-01-01'
+            )
+            for clase, estado in enumerate(historial, 1):
+                if estado != '-':
+                    Asistencia.objects.create(alumno=alumno, numero_clase=clase, estado=estado)
+            cls.alumnos[nombre] = alumno.pk
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def resumenes(self, **params):
+        response = self.client.get(self.URL, {'resumen': 1, **params})
+        self.assertEqual(response.status_code, 200)
+        return {fila['nombres']: fila['resumen_asistencia'] for fila in response.data}
+
+    def test_resumen(self):
+        resumenes = self.resumenes()
+        self.assertEqual(resumenes['Irregular'], {
+            'asistio': 1, 'falto': 3, 'recupero': 1, 'adelanto': 0,
+            'tasa_asistencia': 0.4,
+            # Hasta la última clase del curso, aunque el alumno no llegue a ella
+            'clases_faltantes': [4, 7],
+            'ultima_clase_asistida': 3,
+            'racha_faltas': 2,
+        })
+        self.assertEqual(resumenes['Tardio']['clases_faltantes'], [1, 2, 3, 4, 5, 6])
+        self.assertEqual((resumenes['Tardio']['racha_faltas'], resumenes['Tardio']['tasa_asistencia']), (0, 1.0))
+        self.assertEqual(resumenes['Nuevo'], {
+            'asistio': 0, 'falto': 0, 'recupero': 0, 'adelanto': 0,
+            'tasa_asistencia': None,
+            'clases_faltantes': [1, 2, 3, 4, 5, 6, 7],
+            'ultima_clase_asistida': None,
+            'racha_faltas': 0,
+        })
+        detalle = self.client.get(f"{self.URL}{self.alumnos['Irregular']}/", {'resumen': 1}).data
+        self.assertEqual(detalle['resumen_asistencia'], resumenes['Irregular'])
+
+    def test_mascaras(self):
+        # Bit n-1 = clase n
+        alumno = AlumnoViewSet().anotar_resumen(Alumno.objects.filter(pk=self.alumnos['Irregular'])).get()
+        self.assertEqual(int(alumno.mascara_registros), 0b110111)
+        self.assertEqual(int(alumno.mascara_faltas), 0b110010)
+
+    def test_consultas_constantes(self):
+        with CaptureQueriesContext(connection) as antes:
+            self.resumenes()
+        for n in range(5):
+            alumno = Alumno.objects.create(
+                mesa=self.mesa, nombres=f'N{n}', apellidos='X', fecha_nacimiento='2000-01-01'
+            )
+            Asistencia.objects.create(alumno=alumno, numero_clase=1, estado='F')
+        cache.clear()
+        with self.assertNumQueries(len(antes)):
+            self.resumenes()
+
+    def test_orden_por_resumen(self):
+        response = self.client.get(self.URL, {'resumen': 1, 'ordering': '-tasa_asistencia'})
+        self.assertEqual([fila['nombres'] for fila in response.data], ['Tardio', 'Irregular', 'Nuevo'])
+        response = self.client.get(self.URL, {'resumen': 1, 'ordering': 'nada'})
+        self.assertEqual(response.status_code, 400)
+
+
+class BusquedaAlumnosTests(TestCase):
+    """
+    GET /alumnos/?search=: todas las palabras deben coincidir, orden por
+    relevancia, límite de resultados y, según la base, tolerancia (o no)
+    a acentos y errores de escritura.
+    """
+
+    URL = '/api/v1/alumnos/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        cls.f1 = CustomUser.objects.create_user('f1', password='x', role='FACILITADOR')
+        f2 = CustomUser.objects.create_user('f2', password='x', role='FACILITADOR')
+        curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        horario = Horario.objects.create(curso=curso, dia='MIE', hora='19:00')
+        m1 = Mesa.objects.create(horario=horario, facilitador=cls.f1, nombre_mesa='Mesa 1')
+        m2 = Mesa.objects.create(horario=horario, facilitador=f2, nombre_mesa='Mesa 2')
+        datos = [
+            (m1, 'Luis', 'Pérez', 'Santa Ana', '8110000001'),
+            (m1, 'Mariana', 'Ruiz', 'Centro', '8110000002'),
+            (m1, 'Ana', 'López', 'Centro', '8110000003'),
+            (m2, 'Ana', 'Ajena', 'Centro', '8110000004'),
+            (m1, 'José', 'Martínez', 'Mitras', '8119999999'),
+        ]
+        cls.alumnos = {}
+        for mesa, nombres, apellidos, colonia, telefono in datos:
+            cls.alumnos[apellidos] = Alumno.objects.create(
+                mesa=mesa, nombres=nombres, apellidos=apellidos, colonia=colonia,
+                telefono=telefono, fecha_nacimiento='2000-01-01',
+            ).pk
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.f1)
+
+    def buscar(self, texto, **params):
+        response = self.client.get(self.URL, {'search': texto, **params})
+        self.assertEqual(response.status_code, 200)
+        return [fila['id'] for fila in response.data]
+
+    def ids(self, *apellidos):
+        return [self.alumnos[a] for a in apellidos]
+
+    def test_orden_por_relevancia(self):
+        # Empieza con "ana" > contiene "ana" > solo en otro campo (colonia)
+        self.assertEqual(self.buscar('ana'), self.ids('López', 'Ruiz', 'Pérez'))
+
+    def test_todas_las_palabras(self):
+        self.assertEqual(self.buscar('ana centro'), self.ids('López', 'Ruiz'))
+        self.assertEqual(self.buscar('ANA lópez'), self.ids('López'))
+        self.assertEqual(self.buscar('9999'), self.ids('Martínez'))
+
+    def test_alcance_y_limite(self):
+        self.assertNotIn(self.alumnos['Ajena'], self.buscar('ana'))
+        self.client.force_authenticate(self.admin)
+        self.assertIn(self.alumnos['Ajena'], self.buscar('ana'))
+        self.assertEqual(len(self.buscar('ana', limite=2)), 2)
+        response = self.client.get(self.URL, {'search': 'ana', 'limite': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_sin_texto(self):
+        # Un texto vacío no es una búsqueda: se lista todo
+        self.assertEqual(len(self.buscar('  ')), 4)
+
+    @skipIf(connection.vendor == 'postgresql', "En PostgreSQL se usa pg_trgm")
+    def test_sin_postgresql_coincidencia_simple(self):
+        # Parte del texto tal cual: los acentos tienen que coincidir y no
+        # tolera errores de escritura
+        self.assertEqual(self.buscar('José'), self.ids('Martínez'))
+        self.assertEqual(self.buscar('mart'), self.ids('Martínez'))
+        self.assertEqual(self.buscar('jose'), [])
+        self.assertEqual(self.buscar('Jsoe'), [])
+
+    @skipIf(connection.vendor != 'postgresql', "Necesita PostgreSQL con pg_trgm")
+    def test_postgresql_sin_acentos_y_con_errores(self):
+        self.assertEqual(self.buscar('jose'), self.ids('Martínez'))
+        self.assertEqual(self.buscar('José'), self.ids('Martínez'))
+        self.assertEqual(self.buscar('Martines'), self.ids('Martínez'))
+
+
+class CamposDinamicosTests(TestCase):
+    """
+    ?fields= / ?omit=: la respuesta trae solo los campos elegidos, el
+    SQL lee solo sus columnas y un campo desconocido es un error 400.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        cls.facilitador = CustomUser.objects.create_user('facilitador', password='x', role='FACILITADOR')
+        curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        horario = Horario.objects.create(curso=curso, dia='MIE', hora='19:00')
+        mesa = Mesa.objects.create(horario=horario, facilitador=cls.facilitador, nombre_mesa='Mesa 1')
+        cls.alumno = Alumno.objects.create(
+            mesa=mesa, nombres='Juan', apellidos='Pérez', fecha_nacimiento='2000-01-01',
+            testimonio='Un texto largo', meta_personal='Meta',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.facilitador)
+
+    def pedir(self, url, **params):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        sql = '\n'.join(q['sql'] for q in consultas if 'academia_alumno' in q['sql'])
+        return response.data, sql
+
+    def test_fields(self):
+        data, sql = self.pedir('/api/v1/alumnos/', fields='nombres,apellidos')
+        # 'id' siempre va
+        self.assertEqual(list(data[0]), ['id', 'nombres', 'apellidos'])
+        self.assertNotIn('testimonio', sql)
+        self.assertNotIn('meta_personal', sql)
+
+    def test_omit(self):
+        data, sql = self.pedir('/api/v1/alumnos/', omit='testimonio,meta_personal')
+        self.assertNotIn('testimonio', data[0])
+        self.assertIn('areas_mejorar', data[0])
+        self.assertNotIn('testimonio', sql)
+        self.assertIn('areas_mejorar', sql)
+
+    def test_detalle_con_permiso_de_objeto(self):
+        # El permiso necesita 'facilitador' aunque no se muestre (campos_siempre)
+        data, sql = self.pedir(f'/api/v1/alumnos/{self.alumno.pk}/', fields='nombres')
+        self.assertEqual(data, {'id': self.alumno.pk, 'nombres': 'Juan'})
+        self.assertNotIn('testimonio', sql)
+
+    def test_sin_parametros(self):
+        data, sql = self.pedir('/api/v1/alumnos/')
+        self.assertEqual(data[0]['testimonio'], 'Un texto largo')
+        self.assertIn('testimonio', sql)
+
+    def test_campos_desconocidos(self):
+        response = self.client.get('/api/v1/alumnos/', {'fields': 'nombres,edad'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data), ['fields'])
+        self.assertIn('edad', str(response.data['fields']))
+        response = self.client.get(f'/api/v1/alumnos/{self.alumno.pk}/', {'omit': 'nada'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data), ['omit'])
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get('/api/v1/auth/usuarios/', {'fields': 'password_hash'})
+        self.assertEqual(response.status_code, 400)
+
+
+class MetricasTests(TestCase):
+    """
+    MetricasMiddleware: muestreo, consultas contadas por ruta, el texto
+    de Prometheus y GET /metricas/ solo para Admins.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        cls.facilitador = CustomUser.objects.create_user('facilitador', password='x', role='FACILITADOR')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def medidas(self):
+        # Los registros son del proceso: se comparan diferencias
+        return metricas.PETICIONES.valores.get(('curso-list', 'GET', '200'), 0)
+
+    def pedir(self, muestreo, aleatorio=0.5):
+        antes = self.medidas()
+        with self.settings(METRICAS_MUESTREO=muestreo), \
+                mock.patch('academia.metricas.random.random', return_value=aleatorio):
+            self.assertEqual(self.client.get('/api/v1/cursos/').status_code, 200)
+        return self.medidas() - antes
+
+    def test_muestreo(self):
+        self.assertEqual(self.pedir(1.0), 1)
+        self.assertEqual(self.pedir(0), 0)
+        self.assertEqual(self.pedir(0.25, aleatorio=0.2), 1)
+        self.assertEqual(self.pedir(0.25, aleatorio=0.3), 0)
+
+    def test_consultas_y_log(self):
+        antes = metricas.CONSULTAS.series.get(('curso-list', 'GET'), [None, 0, 0])[1]
+        with self.settings(METRICAS_MUESTREO=1.0), self.assertLogs('academia.metricas', 'INFO') as logs, \
+                CaptureQueriesContext(connection) as consultas:
+            self.client.get('/api/v1/cursos/')
+        datos = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((datos['ruta'], datos['metodo'], datos['estado']), ('curso-list', 'GET', 200))
+        self.assertEqual(datos['consultas'], len(consultas))
+        self.assertEqual(metricas.CONSULTAS.series[('curso-list', 'GET')][1] - antes, len(consultas))
+
+    def test_histograma(self):
+        histograma = metricas.Histograma('prueba_segundos', "Ayuda.", ('route',), (0.1, 1))
+        for valor in (0.05, 0.1, 0.5, 3):
+            histograma.observar(('a"b',), valor)
+        self.assertEqual(list(histograma.lineas()), [
+            '# HELP prueba_segundos Ayuda.',
+            '# TYPE prueba_segundos histogram',
+            # Cubetas acumuladas; el límite incluye al valor igual
+            'prueba_segundos_bucket{route="a\\"b",le="0.1"} 2',
+            'prueba_segundos_bucket{route="a\\"b",le="1"} 3',
+            'prueba_segundos_bucket{route="a\\"b",le="+Inf"} 4',
+            'prueba_segundos_sum{route="a\\"b"} 3.65',
+            'prueba_segundos_count{route="a\\"b"} 4',
+        ])
+
+    def test_vista_solo_admins(self):
+        self.pedir(1.0)
+        response = self.client.get('/api/v1/metricas/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        texto = response.content.decode()
+        self.assertIn('# TYPE discipulado_http_request_duration_seconds histogram', texto)
+        self.assertIn('discipulado_http_requests_total{route="curso-list",method="GET",status="200"}', texto)
+        # Cada línea es un comentario o "nombre{etiquetas} valor"
+        for linea in texto.splitlines():
+            if not linea.startswith('#'):
+                nombre, valor = linea.rsplit(' ', 1)
+                self.assertRegex(nombre, r'^[a-z_]+(\{.*\})?$')
+                float(valor)
+
+        self.client.force_authenticate(self.facilitador)
+        self.assertEqual(self.client.get('/api/v1/metricas/').status_code, 403)
+
+@skipIf(riesgo.np is None, "NumPy no está instalado")
+class RiesgoTests(TestCase):
+    """
+    Indicadores de riesgo (racha, deuda, proyección), el orden del
+    ranking y el comando 'alumnos_en_riesgo'.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        facilitador = CustomUser.objects.create_user('facilitador', password='x', role='FACILITADOR')
+        cls.curso = Curso.objects.create(nombre='Curso', fecha_inicio='2025-01-01', fecha_fin='2025-06-01')
+        horario = Horario.objects.create(curso=cls.curso, dia='MIE', hora='19:00')
+        mesa = Mesa.objects.create(horario=horario, facilitador=facilitador, nombre_mesa='Mesa 1')
+        # Cinco clases dictadas
+        historiales = {
+            'Constante': 'AAAAA',
+            'Ausente': 'AAAFF',
+            'Recuperado': 'FARAA',
+            'Perdido': 'FFFFF',
+        }
+        cls.alumnos = {}
+        for nombre, historial in historiales.items():
+            alumno = Alumno.objects.create(
+                mesa=mesa, nombres=nombre, apellidos='X', fecha_nacimiento='2000-01-01'
+            )
+            for clase, estado in enumerate(historial, 1):
+                Asistencia.objects.create(alumno=alumno, numero_clase=clase, estado=estado)
+            cls.alumnos[nombre] = alumno.pk
+
+    def matriz(self, *historiales):
+        matriz = riesgo.np.zeros((len(historiales), TOTAL_CLASES), dtype=riesgo.np.uint8)
+        for fila, historial in enumerate(historiales):
+            for clase, estado in enumerate(historial):
+                if estado != ' ':
+                    matriz[fila, clase] = riesgo.CODIGOS[estado]
+        return matriz
+
+    def test_indicadores(self):
+        datos, dictadas = riesgo.indicadores(self.matriz('AAAFF', 'FARA ', 'AAAAA'))
+        self.assertEqual(dictadas, 5)
+        # Una clase dictada sin registro cuenta como ausencia en la racha
+        self.assertEqual(list(datos['racha']), [2, 1, 0])
+        # La R de la clase 3 no compensa la F de la clase 1: sigue pendiente
+        self.assertEqual(list(datos['deuda']), [2, 1, 0])
+        self.assertEqual(list(datos['asistidas']), [3, 3, 5])
+        restantes = TOTAL_CLASES - 5
+        self.assertEqual(list(datos['proyeccion']), [3 + 0.6 * restantes, 3 + 0.6 * restantes, TOTAL_CLASES])
+        self.assertEqual(list(datos['maximo_posible']), [3 + restantes + 2, 3 + restantes + 1, TOTAL_CLASES])
+
+    def test_puntajes(self):
+        minimo = riesgo.asistencia_minima()
+        datos, _ = riesgo.indicadores(self.matriz('A' * 10, ' ' * 9 + 'A'))
+        # Aunque venga a todas las clases que quedan ya no llega al mínimo
+        self.assertLess(datos['maximo_posible'][1], minimo)
+        self.assertEqual(list(riesgo.puntajes(datos, minimo)), [0, 1])
+
+    def test_sin_clases_dictadas(self):
+        datos, dictadas = riesgo.indicadores(self.matriz('', ''))
+        self.assertEqual(dictadas, 0)
+        self.assertEqual((list(datos['racha']), list(datos['deuda'])), ([0, 0], [0, 0]))
+        # Sin clases dictadas se proyecta asistencia completa
+        self.assertEqual(list(datos['proyeccion']), [TOTAL_CLASES, TOTAL_CLASES])
+
+    def test_ranking(self):
+        data = riesgo.analizar(self.curso.pk, incluir_bajo=True)
+        self.assertEqual((data['clases_dictadas'], data['total_alumnos']), (5, 4))
+        orden = [fila['id'] for fila in data['alumnos']]
+        self.assertEqual(orden, [self.alumnos[n] for n in ('Perdido', 'Ausente', 'Recuperado', 'Constante')])
+        riesgos = [fila['riesgo'] for fila in data['alumnos']]
+        self.assertEqual(riesgos, sorted(riesgos, reverse=True))
+        perdido, ausente = data['alumnos'][:2]
+        self.assertEqual((perdido['riesgo'], perdido['nivel']), (1.0, 'alto'))
+        self.assertEqual((ausente['racha_ausencias'], ausente['deuda_recuperacion']), (2, 2))
+        self.assertEqual(data['por_mesa'][0]['alumnos'], orden)
+
+        # Sin 'incluir_bajo' el alumno sin faltas no aparece; 'limite' corta el ranking
+        sin_bajo = [fila['id'] for fila in riesgo.analizar(self.curso.pk)['alumnos']]
+        self.assertNotIn(self.alumnos['Constante'], sin_bajo)
+        self.assertEqual(len(riesgo.analizar(self.curso.pk, incluir_bajo=True, limite=2)['alumnos']), 2)
+
+    def test_comando(self):
+        salida = StringIO()
+        call_command('alumnos_en_riesgo', curso=self.curso.pk, todos=True, json=True, stdout=salida)
+        data = json.loads(salida.getvalue())
+        self.assertEqual(data, riesgo.analizar(self.curso.pk, incluir_bajo=True))
 
-# Create your tests here.
+        salida = StringIO()
+        call_command('alumnos_en_riesgo', curso=self.curso.pk, limite=1, stdout=salida)
+        lineas = salida.getvalue().splitlines()
+        self.assertIn(f"#{self.alumnos['Perdido']} Perdido X", lineas[1])
+        self.assertIn('1 alumnos listados', lineas[-1])
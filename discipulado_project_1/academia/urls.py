@@ -20,5 +20,13 @@ urlpatterns = router.urls
 
 urlpatterns.extend([
     path('dashboard-stats/', views.DashboardStatsView.as_view(), name='dashboard-stats'),
-    path('cumpleanos/', views.CumpleanosView.as_view(), name='cumpleanos')
+    path('asistencia-matriz/', views.MatrizAsistenciaView.as_view(), name='asistencia-matriz'),
+    path('asistencia-hoja/', views.HojaAsistenciaView.as_view(), name='asistencia-hoja'),
+    path('alumnos-riesgo/', views.AlumnosEnRiesgoView.as_view(), name='alumnos-riesgo'),
+    path('exportar/alumnos/', views.ExportarAlumnosView.as_view(), name='exportar-alumnos'),
+    path('exportar/asistencia/', views.ExportarAsistenciaView.as_view(), name='exportar-asistencia'),
+    path('sync/', views.SincronizacionView.as_view(), name='sync'),
+    path('cumpleanos/', views.CumpleanosView.as_view(), name='cumpleanos'),
+    path('cache-stats/', views.CacheStatsView.as_view(), name='cache-stats'),
+    path('metricas/', views.MetricasView.as_view(), name='metricas'),
 ])
\ No newline at end of file
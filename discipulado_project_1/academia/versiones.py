@@ -0,0 +1,133 @@
+# En academia/versiones.py (archivo nuevo)
+
+"""
+Versión por tabla para los GET condicionales (ETag / Last-Modified).
+
+Cada modelo tiene en el cache un número de versión y la fecha de su
+último cambio. Se "tocan" al guardar o borrar (academia/signals.py,
+usuarios/signals.py) y en las operaciones en bloque que no disparan
+señales (cascadas, bulk_upsert, importación).
+
+VersionesViewSetMixin usa esas versiones para responder 304 Not
+Modified sin ejecutar la consulta ni el serializer: el ETag se calcula
+con una sola lectura al cache (get_many).
+
+Igual que con el cache de respuestas, en producción con varios workers
+hace falta un backend de cache compartido (Redis, Memcached): con
+LocMemCache un worker no se entera de los cambios hechos en otro.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+PREFIJO = 'academia:versiones'
+
+
+def claves_de(modelo):
+    etiqueta = modelo._meta.label_lower
+    return f'{PREFIJO}:{etiqueta}:v', f'{PREFIJO}:{etiqueta}:t'
+
+
+def tocar(*modelos):
+    """
+    Marca como modificadas las tablas de 'modelos'.
+    """
+    ahora = int(time.time())
+    for modelo in modelos:
+        clave_version, clave_fecha = claves_de(modelo)
+        try:
+            cache.incr(clave_version)
+        except ValueError:
+            cache.add(clave_version, inicial(), timeout=None)
+        # Last-Modified tiene resolución de segundos: si ya hubo un cambio
+        # en este mismo segundo, se avanza uno para que If-Modified-Since
+        # no dé por vigente una respuesta anterior a este cambio.
+        anterior = cache.get(clave_fecha)
+        cache.set(clave_fecha, max(ahora, anterior + 1) if anterior else ahora, timeout=None)
+
+
+def inicial():
+    # Si el cache se vació, la versión no vuelve a empezar en 1: así un
+    # ETag viejo nunca coincide por casualidad con uno nuevo.
+    return int(time.time() * 1000)
+
+
+def estado(*modelos):
+    """
+    Devuelve (versiones, ultima_modificacion) de 'modelos' con una sola
+    lectura al cache. Las tablas sin versión se inicializan ahora.
+    """
+    claves = [clave for modelo in modelos for clave in claves_de(modelo)]
+    valores = cache.get_many(claves)
+
+    versiones = []
+    fechas = []
+    for modelo in modelos:
+        clave_version, clave_fecha = claves_de(modelo)
+        version = valores.get(clave_version)
+        fecha = valores.get(clave_fecha)
+        if version is None or fecha is None:
+            version, fecha = inicial(), int(time.time())
+            cache.add(clave_version, version, timeout=None)
+            cache.add(clave_fecha, fecha, timeout=None)
+            version = cache.get(clave_version, version)
+            fecha = cache.get(clave_fecha, fecha)
+        versiones.append(version)
+        fechas.append(fecha)
+    return versiones, max(fechas)
+
+
+class VersionesViewSetMixin:
+    """
+    GET condicional para list y retrieve. 'modelos_version' son las
+    tablas de las que depende la respuesta; 'get_modelos_version()' se
+    puede sobrescribir si dependen de los parámetros.
+    """
+    modelos_version = ()
+
+    def get_modelos_version(self):
+        return self.modelos_version or (self.queryset.model,)
+
+    def calcular_etag(self):
+        user = self.request.user
+        versiones, fecha = estado(*self.get_modelos_version())
+        base = '|'.join([
+            ','.join(map(str, versiones)),
+            user.role,
+            str(user.pk),
+            self.request.get_full_path(),
+        ])
+        return quote_etag(hashlib.md5(base.encode()).hexdigest()), fecha
+
+    def respuesta_condicional(self, metodo, request, *args, **kwargs):
+        etag, fecha = self.calcular_etag()
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            no_modificado = etag in [e.strip() for e in if_none_match.split(',')] or if_none_match.strip() == '*'
+        else:
+            desde = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+            no_modificado = desde is not None and fecha <= desde
+
+        if no_modificado:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = metodo(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(fecha)
+        # Que el navegador guarde la respuesta pero siempre pregunte si cambió
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.respuesta_condicional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.respuesta_condicional(super().retrieve, request, *args, **kwargs)
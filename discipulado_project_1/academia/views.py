@@ -1,15 +1,32 @@
 # En academia/views.py
 
-from django.db.models import Count, Q
+import logging
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, FloatField, Max, Q, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, NullIf, Power
+from django.http import HttpResponse
 from django.utils import timezone
 from rest_framework import viewsets, status
-from .models import Curso, Horario, Mesa, Alumno, Asistencia
+from rest_framework.exceptions import ValidationError
+from usuarios.models import CustomUser
+from .models import Curso, Horario, Mesa, Alumno, Asistencia, ResumenAsistencia, TOTAL_CLASES
+from . import (
+    alcance, arbol, busqueda, cache_respuestas, cascada, exportar, hoja, importar, lotes, metricas,
+    resumen, riesgo, sincronizacion, versiones,
+)
+from .cache_respuestas import cachear_respuesta
+from .campos import CamposDinamicosViewSetMixin
+from .versiones import VersionesViewSetMixin
 from .serializers import (
     CursoSerializer, 
     HorarioSerializer, 
     MesaSerializer, 
     AlumnoSerializer, 
-    AsistenciaSerializer
+    AsistenciaSerializer,
+    AsistenciaBulkItemSerializer,
+    AlumnoConResumenSerializer
 )
 # Importamos nuestros permisos personalizados
 from .permissions import IsAdminUser, IsFacilitadorOwnerOrAdmin, IsAdminOrFacilitador
@@ -18,15 +35,55 @@ from .permissions import IsAdminUser, IsFacilitadorOwnerOrAdmin, IsAdminOrFacili
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from django.db.models import Count, Q
-from django.utils import timezone
 import datetime
 # ---
 
+logger = logging.getLogger(__name__)
+
+# ---
+# Cascadas de activación (Curso, Horario y Mesa)
+# ---
+def actualizar_con_cascada(serializer):
+    """
+    Guarda el objeto y, si 'activo' cambió, desactiva o reactiva a sus
+    descendientes (ver academia/cascada.py), todo en una transacción.
+    """
+    estaba_activo = serializer.instance.activo
+    extra = {}
+    if serializer.validated_data.get('activo', estaba_activo) != estaba_activo and \
+            hasattr(serializer.instance, 'desactivado_por_cascada'):
+        # Cambio manual: la marca de "desactivado por cascada" ya no aplica
+        extra['desactivado_por_cascada'] = False
+
+    with transaction.atomic():
+        instance = serializer.save(**extra)
+        if estaba_activo and not instance.activo:
+            totales = cascada.desactivar(instance)
+        elif not estaba_activo and instance.activo:
+            totales = cascada.reactivar(instance)
+        else:
+            return
+    logger.info("Cascada sobre %s %s: %s", type(instance).__name__, instance.pk, totales)
+
+
+def desactivar_con_cascada(instance):
+    """
+    "Soft delete" de un Curso, Horario o Mesa con su cascada.
+    """
+    with transaction.atomic():
+        instance.activo = False
+        # Baja manual: no debe volver si se reactiva el nivel de arriba
+        if hasattr(instance, 'desactivado_por_cascada'):
+            instance.desactivado_por_cascada = False
+        instance.save()
+        totales = cascada.desactivar(instance)
+    logger.info("Cascada sobre %s %s: %s", type(instance).__name__, instance.pk, totales)
+
+
 # ---
 # 1. Cursos y Horarios: SOLO ADMINS
 # ---
-class CursoViewSet(viewsets.ModelViewSet):
+class CursoViewSet(VersionesViewSetMixin, CamposDinamicosViewSetMixin, viewsets.ModelViewSet):
     queryset = Curso.objects.all()
     serializer_class = CursoSerializer
     permission_classes = [IsAdminUser]
@@ -39,20 +96,28 @@ class CursoViewSet(viewsets.ModelViewSet):
 
     def perform_update(self, serializer):
         """
-        Sobrescribe la actualización para manejar la desactivación en cascada.
+        Sobrescribe la actualización para manejar la desactivación
+        (y reactivación) en cascada de mesas y alumnos.
         """
-        instance = serializer.save() # Guarda el curso primero
+        actualizar_con_cascada(serializer)
 
-        # Si el curso se está desactivando (pasando de True a False)
-        if instance.activo is False and serializer.validated_data.get('activo') is False:
-            # 1. Desactivar todas las Mesas de este curso
-            mesas_del_curso = Mesa.objects.filter(horario__curso=instance)
-            mesas_del_curso.update(activo=False)
-            
-            # 2. Desactivar todos los Alumnos de esas mesas
-            Alumno.objects.filter(mesa__in=mesas_del_curso).update(activo=False)
+    def get_modelos_version(self):
+        if self.action == 'arbol':
+            return (Curso, Horario, Mesa, Alumno, Asistencia, CustomUser)
+        return super().get_modelos_version()
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAdminOrFacilitador])
+    def arbol(self, request, *args, **kwargs):
+        """
+        Horarios, mesas, facilitadores y conteos del curso en una sola
+        petición (ver academia/arbol.py). Los facilitadores solo ven sus mesas.
+        """
+        return self.respuesta_condicional(self.armar_arbol, request, *args, **kwargs)
+
+    def armar_arbol(self, request, *args, **kwargs):
+        return Response(arbol.armar(self.get_object(), request.user))
 
-class HorarioViewSet(viewsets.ModelViewSet):
+class HorarioViewSet(VersionesViewSetMixin, CamposDinamicosViewSetMixin, viewsets.ModelViewSet):
     queryset = Horario.objects.all()  # (Esto debe estar)
     serializer_class = HorarioSerializer
     # permission_classes = [IsAdminUser] # <-- ¡ELIMINA ESTA LÍNEA!
@@ -60,14 +125,15 @@ class HorarioViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """
         Si se pide un curso, devuelve todos sus horarios (activos e inactivos).
-        Si no se pide un curso, devuelve SOLO los horarios ACTIVOS.
+        Si no se pide un curso, la lista muestra SOLO los horarios ACTIVOS
+        (el detalle sí encuentra los inactivos, para poder reactivarlos).
         """
         queryset = Horario.objects.all()
         
         curso_id = self.request.query_params.get('curso') 
         if curso_id:
             queryset = queryset.filter(curso_id=curso_id)
-        else:
+        elif self.action == 'list':
             queryset = queryset.filter(activo=True)
             
         return queryset.order_by('-activo', 'dia', 'hora')
@@ -90,28 +156,22 @@ class HorarioViewSet(viewsets.ModelViewSet):
     # --- FIN DE LA NUEVA FUNCIÓN ---
 
     def perform_update(self, serializer):
-        # ... (esta función queda igual)
-        instance = serializer.save()
-        if instance.activo is False and serializer.validated_data.get('activo') is False:
-            mesas_del_horario = Mesa.objects.filter(horario=instance)
-            mesas_del_horario.update(activo=False)
-            Alumno.objects.filter(mesa__in=mesas_del_horario).update(activo=False)
+        actualizar_con_cascada(serializer)
     
     def perform_destroy(self, instance):
-        # ... (esta función queda igual)
-        instance.activo = False
-        instance.save()
-        mesas_del_horario = Mesa.objects.filter(horario=instance)
-        mesas_del_horario.update(activo=False)
-        Alumno.objects.filter(mesa__in=mesas_del_horario).update(activo=False)
+        desactivar_con_cascada(instance)
 
 # ---
 # 2. Mesas, Alumnos, Asistencia: Admins (todo) o Facilitadores (solo lo suyo)
 # ---
-class MesaViewSet(viewsets.ModelViewSet):
+class MesaViewSet(VersionesViewSetMixin, CamposDinamicosViewSetMixin, viewsets.ModelViewSet):
     queryset = Mesa.objects.all()  # (Esto es necesario para el router)
     serializer_class = MesaSerializer # (Usará el serializer corregido)
     permission_classes = [IsAdminOrFacilitador, IsFacilitadorOwnerOrAdmin]
+    # El permiso de objeto compara 'facilitador_id' (ver campos.py)
+    campos_siempre = ('facilitador',)
+    # Cada mesa muestra los datos de su facilitador (ver versiones.py)
+    modelos_version = (Mesa, CustomUser)
 
     def get_queryset(self):
         """
@@ -119,7 +179,8 @@ class MesaViewSet(viewsets.ModelViewSet):
         ¡Lógica de filtrado corregida!
         """
         user = self.request.user
-        queryset = Mesa.objects.all() # Empezamos con todo
+        # select_related: el serializer muestra el facilitador de cada mesa
+        queryset = Mesa.objects.select_related('facilitador') # Empezamos con todo
 
         # 1. Filtramos por 'horario' si se pide
         horario_id = self.request.query_params.get('horario')
@@ -142,67 +203,264 @@ class MesaViewSet(viewsets.ModelViewSet):
     
     def perform_update(self, serializer):
         """
-        Sobrescribe la actualización para manejar la desactivación en cascada.
-        (Esta función SÍ la necesitamos)
+        Sobrescribe la actualización para manejar la desactivación
+        (y reactivación) en cascada de los alumnos de la mesa.
         """
-        instance = serializer.save() # Guarda la mesa primero
-
-        # Si la mesa se está desactivando
-        if 'activo' in serializer.validated_data and instance.activo is False:
-            # Desactivar todos los Alumnos de esta mesa
-            Alumno.objects.filter(mesa=instance).update(activo=False)
+        actualizar_con_cascada(serializer)
         
     def perform_destroy(self, instance):
         """
         Sobrescribe el borrado (DELETE) para hacer un "soft delete".
+        También desactivamos en cascada a los alumnos.
         """
-        instance.activo = False
-        instance.save()
-        
-        # También desactivamos en cascada a los alumnos
-        Alumno.objects.filter(mesa=instance).update(activo=False)
+        desactivar_con_cascada(instance)
 
-class AlumnoViewSet(viewsets.ModelViewSet):
+class AlumnoViewSet(VersionesViewSetMixin, CamposDinamicosViewSetMixin, viewsets.ModelViewSet):
     queryset = Alumno.objects.all()
     serializer_class = AlumnoSerializer
     permission_classes = [IsAdminOrFacilitador, IsFacilitadorOwnerOrAdmin]
+    # Los usan el permiso de objeto y el resumen de asistencia (ver campos.py)
+    campos_siempre = ('facilitador', 'curso')
+
+    # Con ?resumen=1 se puede ordenar por estos campos (ej. ?ordering=-faltas)
+    ordenamientos_resumen = {
+        'asistencias': 'total_asistio',
+        'faltas': 'total_falto',
+        'recuperadas': 'total_recupero',
+        'adelantadas': 'total_adelanto',
+        'tasa_asistencia': 'tasa_asistencia',
+        'ultima_clase_asistida': 'ultima_clase_asistida',
+    }
 
     def get_queryset(self):
         """
         Filtra por rol Y por estado activo.
+        Con ?resumen=1 añade el resumen de asistencia de cada alumno.
+        Con ?search=texto busca por nombre, apellidos, teléfono o colonia.
         """
         user = self.request.user
         
         queryset = Alumno.objects.all() # <-- Solo alumnos activos
 
         if user.role == 'ADMIN':
-            return queryset.order_by('-activo','apellidos')
+            pass
         elif user.role == 'FACILITADOR':
-            return queryset.filter(mesa__facilitador=user).order_by('-activo', 'apellidos')
-        
-        return Alumno.objects.none()
+            queryset = queryset.filter(facilitador=user)
+        else:
+            return Alumno.objects.none()
+
+        ordering = ['-activo', 'apellidos']
+        if self.con_resumen():
+            queryset = self.anotar_resumen(queryset)
+            ordering = self.ordering_resumen() + ordering
+
+        texto = self.texto_busqueda()
+        if texto is not None:
+            # Los más relevantes primero, y solo los primeros 'limite'
+            queryset = busqueda.buscar(queryset, texto)
+            ordering = self.ordering_resumen() + ['-relevancia', 'apellidos', 'id']
+            return queryset.order_by(*ordering)[:self.limite_busqueda()]
+
+        return queryset.order_by(*ordering)
+
+    def texto_busqueda(self):
+        """
+        El texto de ?search= (solo en la lista), o None si no se busca.
+        """
+        if self.action != 'list':
+            return None
+        texto = self.request.query_params.get('search', '').strip()
+        return texto or None
+
+    def limite_busqueda(self):
+        limite = self.request.query_params.get('limite')
+        if not limite:
+            return busqueda.LIMITE
+        try:
+            limite = int(limite)
+        except ValueError:
+            raise ValidationError({'limite': "Debe ser un número entero."})
+        return max(1, min(limite, busqueda.LIMITE_MAXIMO))
+
+    def paginate_queryset(self, queryset):
+        # Una búsqueda ya viene limitada (y ordenada por relevancia)
+        if self.texto_busqueda() is not None:
+            return None
+        return super().paginate_queryset(queryset)
+
+    def con_resumen(self):
+        return self.request.query_params.get('resumen') in ('1', 'true', 'True')
+
+    def get_modelos_version(self):
+        # El resumen se calcula de las asistencias
+        if self.con_resumen():
+            return (Alumno, Asistencia)
+        return (Alumno,)
+
+    def anotar_resumen(self, queryset):
+        """
+        Una sola agregación condicional para toda la lista (sin N+1):
+        conteos por estado, tasa de asistencia, última clase asistida y
+        dos "máscaras de bits" (bit n-1 = clase n) con las clases que
+        tienen registro y las que son faltas. Con las máscaras el
+        serializer calcula las clases faltantes y la racha de faltas.
+        """
+        bit = Power(Value(2), F('asistencias__numero_clase') - 1)
+        asistidas = ~Q(asistencias__estado='F') & Q(asistencias__isnull=False)
+        return queryset.annotate(
+            total_asistio=Count('asistencias', filter=Q(asistencias__estado='A')),
+            total_falto=Count('asistencias', filter=Q(asistencias__estado='F')),
+            total_recupero=Count('asistencias', filter=Q(asistencias__estado='R')),
+            total_adelanto=Count('asistencias', filter=Q(asistencias__estado='D')),
+            total_registros=Count('asistencias'),
+            # Coalesce: sin NULLs, para poder ordenar y paginar por estos campos
+            ultima_clase_asistida=Coalesce(Max('asistencias__numero_clase', filter=asistidas), 0),
+            mascara_registros=Sum(bit),
+            mascara_faltas=Sum(bit, filter=Q(asistencias__estado='F')),
+        ).annotate(
+            tasa_asistencia=Coalesce(
+                Cast(F('total_asistio') + F('total_recupero') + F('total_adelanto'), FloatField())
+                / NullIf(F('total_registros'), 0),
+                0.0,
+            ),
+        )
+
+    def ordering_resumen(self):
+        campo = self.request.query_params.get('ordering', '')
+        nombre = campo.lstrip('-')
+        if not nombre:
+            return []
+        if nombre not in self.ordenamientos_resumen:
+            raise ValidationError({'ordering': f"Opciones: {', '.join(self.ordenamientos_resumen)}."})
+        anotacion = self.ordenamientos_resumen[nombre]
+        return ['-' + anotacion if campo.startswith('-') else anotacion]
+
+    def get_serializer_class(self):
+        if self.con_resumen() and self.action in ['list', 'retrieve']:
+            return AlumnoConResumenSerializer
+        return AlumnoSerializer
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.con_resumen():
+            # Última clase registrada en cada curso (tabla de resumen: pocas filas),
+            # para saber hasta qué clase buscar "clases faltantes".
+            context['ultima_clase_por_curso'] = dict(
+                ResumenAsistencia.objects.filter(total__gt=0)
+                .values('curso_id').annotate(ultima=Max('numero_clase'))
+                .values_list('curso_id', 'ultima')
+            )
+        return context
 
     def perform_destroy(self, instance):
         """
         Sobrescribe el borrado (DELETE) para hacer un "soft delete".
         """
         instance.activo = False
+        # Baja individual: no debe volver si se reactiva su mesa/curso
+        instance.desactivado_por_cascada = False
         instance.save()
 
-class AsistenciaViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], url_path='importar', permission_classes=[IsAdminOrFacilitador])
+    def importar_lote(self, request):
+        """
+        Importa un lote de alumnos (ver academia/importar.py).
+
+        Acepta un JSON con una lista de alumnos (o {"alumnos": [...]}) o
+        un archivo CSV en el campo 'archivo' (multipart). Parámetros:
+          - ?mesa=ID        mesa para las filas que no traen 'mesa'
+          - ?horario=ID     reparte las filas sin mesa entre las mesas del horario
+          - ?simular=1      solo valida y reporta; no guarda nada
+          - ?permitir_duplicados=1   importa aunque parezcan duplicados
+        """
+        params = request.query_params
+        opciones = {}
+        for param in ('mesa', 'horario'):
+            if params.get(param):
+                try:
+                    opciones[param] = int(params[param])
+                except ValueError:
+                    raise ValidationError({param: "Debe ser un número entero."})
+
+        try:
+            if 'archivo' in request.FILES:
+                filas = importar.leer_csv(request.FILES['archivo'].read())
+            else:
+                filas = importar.leer_json(request.data)
+            reporte = importar.importar(
+                filas,
+                user=request.user,
+                simular=params.get('simular') in ('1', 'true', 'True'),
+                permitir_duplicados=params.get('permitir_duplicados') in ('1', 'true', 'True'),
+                **opciones,
+            )
+        except importar.ErrorDeImportacion as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        guardados = reporte['creados'] and not reporte['simulacion']
+        return Response(reporte, status=status.HTTP_201_CREATED if guardados else status.HTTP_200_OK)
+
+
+def invalidar_caches_asistencia():
+    cache_respuestas.invalidar()
+    versiones.tocar(Asistencia)
+
+
+class AsistenciaViewSet(VersionesViewSetMixin, CamposDinamicosViewSetMixin, viewsets.ModelViewSet):
     queryset = Asistencia.objects.all() # Necesario para el router
     serializer_class = AsistenciaSerializer
     permission_classes = [IsAdminOrFacilitador, IsFacilitadorOwnerOrAdmin]
+    # El permiso de objeto compara 'facilitador_id' (ver campos.py)
+    campos_siempre = ('facilitador',)
+
+    # Filtros aceptados en la URL (ej. /asistencias/?numero_clase=5&mesa=3)
+    # y el campo del ORM al que se traduce cada uno.
+    filtros_permitidos = {
+        'numero_clase': 'numero_clase',
+        'alumno': 'alumno_id',
+        'mesa': 'alumno__mesa_id',
+        'horario': 'alumno__mesa__horario_id',
+        'curso': 'curso_id',
+    }
 
     def get_queryset(self):
         user = self.request.user
         if user.role == 'ADMIN':
-            return Asistencia.objects.all()
+            queryset = Asistencia.objects.all()
         elif user.role == 'FACILITADOR':
             # Filtramos asistencias de alumnos que pertenezcan a este facilitador
-            return Asistencia.objects.filter(alumno__mesa__facilitador=user)
-        
-        return Asistencia.objects.none()
+            queryset = Asistencia.objects.filter(facilitador=user)
+        else:
+            return Asistencia.objects.none()
+
+        return self.filtrar_queryset(queryset).order_by('alumno_id', 'numero_clase')
+
+    def filtrar_queryset(self, queryset):
+        """
+        Aplica los filtros de la URL. Así la pantalla de asistencia
+        lee solo los registros de la clase (o alumno, mesa...) pedidos
+        en lugar de toda la tabla.
+        """
+        params = self.request.query_params
+
+        for param, campo in self.filtros_permitidos.items():
+            valor = params.get(param)
+            if valor in (None, ''):
+                continue
+            try:
+                valor = int(valor)
+            except ValueError:
+                raise ValidationError({param: "Debe ser un número entero."})
+            queryset = queryset.filter(**{campo: valor})
+
+        estado = params.get('estado')
+        if estado:
+            estados = estado.upper().split(',')
+            if any(e not in Asistencia.Estado.values for e in estados):
+                raise ValidationError({'estado': "Estado no válido."})
+            queryset = queryset.filter(estado__in=estados)
+
+        return queryset
 
     @action(detail=False, methods=['post'], permission_classes=[IsAdminOrFacilitador])
     def bulk_upsert(self, request):
@@ -210,52 +468,244 @@ class AsistenciaViewSet(viewsets.ModelViewSet):
         Crea o actualiza una lista de registros de asistencia.
         Espera datos como:
         [
-            { "alumno": 12, "numero_clase": 5, "fecha_clase": "2025-11-06", "estado": "A" },
-            { "alumno": 13, "numero_clase": 5, "fecha_clase": "2025-11-06", "estado": "F" }
+            { "alumno": 12, "numero_clase": 5, "estado": "A" },
+            { "alumno": 13, "numero_clase": 5, "estado": "F", "motivo_falta_recupero": "..." }
         ]
+        o, para envíos desde la cola sin conexión (ver academia/lotes.py),
+        { "lote": "...", "capturado": "<fecha ISO>", "registros": [...] }
+        con la cabecera 'Idempotency-Key' (o el "lote" como clave).
+
+        Todo el lote se valida primero y luego se escribe con un único
+        INSERT ... ON CONFLICT (sobre 'alumno' + 'numero_clase') dentro
+        de una transacción. Devuelve el resultado de cada registro:
+        'creado', 'actualizado', 'obsoleto' (ya había una captura más
+        reciente) o 'rechazado' (con su motivo).
         """
-        asistencias_data = request.data
+        datos = request.data
+        lote = capturado = None
+        if isinstance(datos, dict):
+            lote = datos.get('lote')
+            capturado = datos.get('capturado')
+            asistencias_data = datos.get('registros')
+        else:
+            asistencias_data = datos
         if not isinstance(asistencias_data, list):
             return Response({"error": "Se esperaba una lista (array) de asistencias."}, 
                             status=status.HTTP_400_BAD_REQUEST)
 
-        user = request.user
-        alumnos_permitidos_ids = []
+        clave = request.headers.get(lotes.CABECERA) or lote
+        if clave is not None:
+            clave = str(clave)
+            if len(clave) > lotes.LARGO_MAXIMO_CLAVE:
+                return Response({"error": "La clave del lote es demasiado larga."},
+                                status=status.HTTP_400_BAD_REQUEST)
+        try:
+            capturado = lotes.leer_fecha(capturado)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Si es facilitador, validamos que solo guarde asistencias de sus alumnos
-        if user.role == 'FACILITADOR':
-            alumnos_permitidos_ids = list(
-                Alumno.objects.filter(mesa__facilitador=user).values_list('id', flat=True)
+        huella = None
+        if clave:
+            huella = lotes.huella(datos)
+            aplicado = lotes.buscar(request.user, clave)
+            if aplicado:
+                return self.repetir_lote(aplicado, huella)
+
+        try:
+            with transaction.atomic():
+                data = self.aplicar_lote(asistencias_data, request.user, capturado)
+                data['lote'] = lote
+                if clave:
+                    lotes.registrar(request.user, clave, lote, huella, data)
+        except IntegrityError:
+            # Dos envíos del mismo lote a la vez: el otro registró la clave
+            # primero y todo lo de este se deshizo. Se responde como reintento.
+            aplicado = lotes.buscar(request.user, clave) if clave else None
+            if aplicado is None:
+                raise
+            return self.repetir_lote(aplicado, huella)
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    def aplicar_lote(self, asistencias_data, user, capturado=None):
+        resultados, validos, alumnos = self.validar_lote(asistencias_data, user)
+
+        if validos:
+            self.guardar_lote(validos, resultados, alumnos, capturado)
+
+        conteo = Counter(r['resultado'] for r in resultados)
+        return {
+            'creados': conteo['creado'],
+            'actualizados': conteo['actualizado'],
+            'obsoletos': conteo['obsoleto'],
+            'rechazados': conteo['rechazado'],
+            'resultados': resultados,
+        }
+
+    def repetir_lote(self, aplicado, huella):
+        if aplicado.huella != huella:
+            return Response(
+                {"error": "Esta clave ya se usó para un lote con otro contenido."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
             )
+        response = Response(aplicado.respuesta, status=status.HTTP_201_CREATED)
+        response['Idempotent-Replayed'] = 'true'
+        return response
 
-        creados_o_actualizados = []
+    def validar_lote(self, asistencias_data, user):
+        """
+        Valida todos los registros del lote con un número fijo de consultas.
+        Devuelve la lista de resultados (uno por registro, en el mismo orden),
+        un diccionario {indice: datos_validados} con los que se pueden guardar
+        y otro {alumno_id: {mesa_id, facilitador_id, curso_id}} con los
+        datos de cada alumno permitido.
+        """
+        resultados = []
+        candidatos = {}
 
-        for item in asistencias_data:
-            alumno_id = item.get('alumno')
+        for indice, item in enumerate(asistencias_data):
+            resultado = {
+                'indice': indice,
+                'alumno': item.get('alumno') if isinstance(item, dict) else None,
+                'numero_clase': item.get('numero_clase') if isinstance(item, dict) else None,
+                'resultado': None,
+            }
+            resultados.append(resultado)
 
-            # Validación de permisos
-            if user.role == 'FACILITADOR' and alumno_id not in alumnos_permitidos_ids:
-                continue # Se salta este registro si no le pertenece
+            serializer = AsistenciaBulkItemSerializer(data=item)
+            if not serializer.is_valid():
+                self.rechazar(resultado, serializer.errors)
+                continue
+            candidatos[indice] = serializer.validated_data
 
-            try:
-                # Usamos update_or_create para manejar "upsert"
-                # Busca por 'alumno' y 'numero_clase' (nuestro 'unique_together')
-                obj, created = Asistencia.objects.update_or_create(
-                    alumno_id=alumno_id,
-                    numero_clase=item.get('numero_clase'),
-                    # 'defaults' son los campos que se van a actualizar o crear
-                    defaults={
-                        'estado': item.get('estado'),
-                        'motivo_falta_recupero': item.get('motivo_falta_recupero', None),
-                        'horario_adelanto_id': item.get('horario_adelanto', None)
+        # --- Comprobaciones contra la base de datos (una consulta cada una) ---
+        alumnos_ids = {d['alumno'] for d in candidatos.values()}
+        if user.role == 'FACILITADOR':
+            # Si es facilitador, solo puede guardar asistencias de sus alumnos.
+            # Su alcance (alumnos y mesas) ya está en el cache: sin consultas.
+            alcance_usuario = alcance.de(user)
+            alumnos_permitidos = {}
+            for alumno_id in alumnos_ids:
+                mesa_id = alcance_usuario['alumnos'].get(alumno_id)
+                if mesa_id in alcance_usuario['mesas']:
+                    alumnos_permitidos[alumno_id] = {
+                        'id': alumno_id,
+                        'mesa_id': mesa_id,
+                        'facilitador_id': user.pk,
+                        'curso_id': alcance_usuario['mesas'][mesa_id]['curso_id'],
                     }
+        else:
+            alumnos_permitidos = {
+                a['id']: a for a in Alumno.objects.filter(id__in=alumnos_ids).values(
+                    'id', 'mesa_id', 'facilitador_id', 'curso_id'
                 )
-                creados_o_actualizados.append(self.get_serializer(obj).data)
-            except Exception as e:
-                # Si algo falla (ej. el alumno_id no existe), solo lo reportamos
-                print(f"Error al procesar asistencia para alumno {alumno_id}: {e}")
+            }
+
+        horarios_ids = {d['horario_adelanto'] for d in candidatos.values() if d['horario_adelanto']}
+        horarios_existentes = set(
+            Horario.objects.filter(id__in=horarios_ids).values_list('id', flat=True)
+        )
+
+        validos = {}
+        vistos = set()
+        for indice, datos in candidatos.items():
+            clave = (datos['alumno'], datos['numero_clase'])
+            if datos['alumno'] not in alumnos_permitidos:
+                self.rechazar(resultados[indice], "El alumno no existe o no pertenece a tus mesas.")
+            elif datos['horario_adelanto'] and datos['horario_adelanto'] not in horarios_existentes:
+                self.rechazar(resultados[indice], "El horario de adelanto no existe.")
+            elif clave in vistos:
+                self.rechazar(resultados[indice], "Registro duplicado en el mismo lote.")
+            else:
+                vistos.add(clave)
+                validos[indice] = datos
+
+        return resultados, validos, alumnos_permitidos
+
+    def rechazar(self, resultado, motivo):
+        resultado['resultado'] = 'rechazado'
+        resultado['motivo'] = motivo
+        logger.warning(
+            "bulk_upsert: asistencia rechazada (alumno=%s, clase=%s): %s",
+            resultado['alumno'], resultado['numero_clase'], motivo,
+        )
+
+    def guardar_lote(self, validos, resultados, alumnos, capturado=None):
+        """
+        Escribe los registros válidos con un solo INSERT ... ON CONFLICT.
+        Antes consulta (en la misma transacción) qué pares alumno/clase ya
+        existían, con qué estado y cuándo se capturaron, para poder
+        reportar 'creado', 'actualizado' u 'obsoleto' y ajustar la tabla
+        de resumen.
+        """
+        ahora = timezone.now()
+        objetos = {
+            indice: Asistencia(
+                alumno_id=datos['alumno'],
+                numero_clase=datos['numero_clase'],
+                estado=datos['estado'],
+                motivo_falta_recupero=datos['motivo_falta_recupero'],
+                horario_adelanto_id=datos['horario_adelanto'],
+                facilitador_id=alumnos[datos['alumno']]['facilitador_id'],
+                curso_id=alumnos[datos['alumno']]['curso_id'],
+                capturado=min(datos['capturado'] or capturado or ahora, ahora),
+            )
+            for indice, datos in validos.items()
+        }
+
+        with transaction.atomic():
+            # Se bloquean los alumnos (no los registros, que pueden no
+            # existir aún): así dos lotes con el mismo registro nuevo no
+            # lo cuentan los dos como 'creado' en el resumen.
+            alumnos_ids = {obj.alumno_id for obj in objetos.values()}
+            list(Alumno.objects.select_for_update().filter(id__in=alumnos_ids).order_by('id').values_list('id'))
+            existentes = {
+                (alumno_id, numero_clase): (estado, capturado_anterior)
+                for alumno_id, numero_clase, estado, capturado_anterior in Asistencia.objects.filter(
+                    alumno_id__in=alumnos_ids,
+                    numero_clase__in={obj.numero_clase for obj in objetos.values()},
+                ).values_list('alumno_id', 'numero_clase', 'estado', 'capturado')
+            }
 
-        return Response(creados_o_actualizados, status=status.HTTP_201_CREATED)
+            # Una captura más vieja que la guardada no la sobrescribe
+            for indice, obj in list(objetos.items()):
+                _, capturado_anterior = existentes.get((obj.alumno_id, obj.numero_clase), (None, None))
+                if capturado_anterior and obj.capturado < capturado_anterior:
+                    resultados[indice]['resultado'] = 'obsoleto'
+                    resultados[indice]['motivo'] = (
+                        f"Ya hay una captura más reciente ({capturado_anterior.isoformat()})."
+                    )
+                    del objetos[indice]
+            if not objetos:
+                return
+
+            Asistencia.objects.bulk_create(
+                objetos.values(),
+                update_conflicts=True,
+                unique_fields=['alumno', 'numero_clase'],
+                update_fields=[
+                    'estado', 'motivo_falta_recupero', 'horario_adelanto', 'facilitador', 'curso',
+                    'actualizado', 'capturado',
+                ],
+            )
+
+            # bulk_create no dispara señales: ajustamos el resumen aquí
+            deltas = Counter()
+            for obj in objetos.values():
+                mesa_id = alumnos[obj.alumno_id]['mesa_id']
+                estado_anterior, _ = existentes.get((obj.alumno_id, obj.numero_clase), (None, None))
+                if estado_anterior:
+                    deltas[(mesa_id, obj.numero_clase, estado_anterior)] -= 1
+                deltas[(mesa_id, obj.numero_clase, obj.estado)] += 1
+            resumen.aplicar_deltas(deltas)
+
+        # bulk_create tampoco invalida el cache por señales. Se hace al
+        # confirmar la transacción de bulk_upsert, no antes: si no, otra
+        # petición podría volver a cachear los datos viejos.
+        transaction.on_commit(invalidar_caches_asistencia)
+
+        for indice, obj in objetos.items():
+            existia = (obj.alumno_id, obj.numero_clase) in existentes
+            resultados[indice]['resultado'] = 'actualizado' if existia else 'creado'
 
 # ---
 # 3. Vista Personalizada para el Dashboard
@@ -267,6 +717,7 @@ class DashboardStatsView(APIView):
     """
     permission_classes = [IsAdminOrFacilitador]
 
+    @cachear_respuesta('dashboard-stats')
     def get(self, request, *args, **kwargs):
         user = request.user
         
@@ -276,85 +727,465 @@ class DashboardStatsView(APIView):
             numero_clase = 1
 
         # --- Base de la consulta ---
-        base_queryset = Asistencia.objects.filter(
-            numero_clase=numero_clase
+        # Leemos de la tabla de resumen (conteos ya agrupados por
+        # mesa/clase/estado) en lugar de agrupar toda la tabla Asistencia.
+        base_queryset = ResumenAsistencia.objects.filter(
+            numero_clase=numero_clase,
+            total__gt=0
         )
         if user.role == 'FACILITADOR':
-            base_queryset = base_queryset.filter(alumno__mesa__facilitador=user)
+            base_queryset = base_queryset.filter(mesa_id__in=alcance.de(user)['mesas'])
 
         # --- Cálculo de Estadísticas ---
 
-        # 1. Faltas por Horario (Esta se queda igual)
-        faltas_queryset = base_queryset.filter(estado='F')
-        faltas_por_horario = faltas_queryset.values(
-            'alumno__mesa__horario__dia', 
-            'alumno__mesa__horario__hora'
+        # 1. Faltas por Horario
+        faltas_por_horario = base_queryset.filter(estado='F').values(
+            'horario__dia', 
+            'horario__hora'
         ).annotate(
-            total_faltas=Count('id')
-        ).order_by('alumno__mesa__horario__dia', 'alumno__mesa__horario__hora')
+            total_faltas=Sum('total')
+        ).order_by('horario__dia', 'horario__hora')
 
-        # --- CAMBIO AQUÍ ---
         # 2. Desglose DETALLADO por mesa (solo para Admin)
         detalle_por_mesa = []
         if user.role == 'ADMIN':
-            # NO filtramos por estado, sino que AGRUPAMOS por estado
             detalle_por_mesa = base_queryset.values(
-                'alumno__mesa__nombre_mesa',
-                'alumno__mesa__facilitador__first_name',
-                'alumno__mesa_id', # ID para agrupar en el frontend
-                'estado'          # Agrupamos también por estado
+                'mesa__nombre_mesa',
+                'mesa__facilitador__first_name',
+                'mesa_id', # ID para agrupar en el frontend
+                'estado'
             ).annotate(
-                total=Count('id') # Nuevo nombre
-            ).order_by('alumno__mesa__nombre_mesa', 'estado')
-        # --- FIN DEL CAMBIO ---
+                total=Sum('total')
+            ).order_by('mesa__nombre_mesa', 'estado')
 
-        # 3. Conteo general (Se queda igual)
+        # 3. Conteo general
         conteo_general = base_queryset.values('estado').annotate(
-            total=Count('id')
+            total=Sum('total')
         ).order_by('estado')
 
-        # Datos para el frontend
+        # Datos para el frontend (mismos nombres de campos que antes,
+        # cuando se consultaba a través de 'alumno__mesa__...')
         data = {
             'numero_clase_consultada': numero_clase,
-            'faltas_por_horario': list(faltas_por_horario),
-            'detalle_por_mesa': list(detalle_por_mesa), # <-- CAMBIO (antes 'asistencias_por_mesa')
+            'faltas_por_horario': [
+                {
+                    'alumno__mesa__horario__dia': f['horario__dia'],
+                    'alumno__mesa__horario__hora': f['horario__hora'],
+                    'total_faltas': f['total_faltas'],
+                }
+                for f in faltas_por_horario
+            ],
+            'detalle_por_mesa': [
+                {
+                    'alumno__mesa__nombre_mesa': d['mesa__nombre_mesa'],
+                    'alumno__mesa__facilitador__first_name': d['mesa__facilitador__first_name'],
+                    'alumno__mesa_id': d['mesa_id'],
+                    'estado': d['estado'],
+                    'total': d['total'],
+                }
+                for d in detalle_por_mesa
+            ],
             'conteo_general': list(conteo_general),
         }
 
         return Response(data)
 
+def curso_solicitado(request):
+    """
+    El curso de '?curso=ID' o, si no viene, el curso activo.
+    """
+    curso_id = request.query_params.get('curso')
+    if curso_id:
+        try:
+            return int(curso_id)
+        except ValueError:
+            raise ValidationError({'curso': "Debe ser un número entero."})
+    return Curso.objects.filter(activo=True).values_list('id', flat=True).first()
+
+
+class MatrizAsistenciaView(APIView):
+    """
+    Vista con la asistencia de TODO el curso (las 23 clases) en una
+    sola petición, para que el dashboard no tenga que pedir clase por clase.
+
+    Parámetros:
+      - ?curso=ID    (por defecto, el curso activo)
+      - ?alumnos=1   incluye además una fila compacta por alumno
+
+    Los conteos vienen como listas de 23 números por estado, donde la
+    posición 0 es la clase 1. Ej: "conteos": {"A": [10, 9, ...], "F": [...]}.
+    La fila de cada alumno es un texto de 23 letras con su estado en
+    cada clase ('-' si no hay registro). Ej: "AAFR-A...".
+    """
+    permission_classes = [IsAdminOrFacilitador]
+
+    @cachear_respuesta('asistencia-matriz')
+    def get(self, request, *args, **kwargs):
+        user = request.user
+
+        curso_id = curso_solicitado(request)
+
+        # --- Conteos: una sola consulta agrupada (tabla de resumen) ---
+        filas = ResumenAsistencia.objects.filter(curso_id=curso_id, total__gt=0)
+        if user.role == 'FACILITADOR':
+            filas = filas.filter(mesa_id__in=alcance.de(user)['mesas'])
+        filas = filas.values(
+            'horario_id', 'horario__dia', 'horario__hora',
+            'mesa_id', 'mesa__nombre_mesa', 'mesa__facilitador__first_name',
+            'numero_clase', 'estado', 'total',
+        ).order_by('horario__dia', 'horario__hora', 'mesa__nombre_mesa')
+
+        totales = self.conteos_vacios()
+        horarios = {}
+        for f in filas:
+            horario = horarios.setdefault(f['horario_id'], {
+                'id': f['horario_id'],
+                'dia': f['horario__dia'],
+                'hora': f['horario__hora'],
+                'conteos': self.conteos_vacios(),
+                'mesas': {},
+            })
+            mesa = horario['mesas'].setdefault(f['mesa_id'], {
+                'id': f['mesa_id'],
+                'nombre_mesa': f['mesa__nombre_mesa'],
+                'facilitador': f['mesa__facilitador__first_name'],
+                'conteos': self.conteos_vacios(),
+            })
+            posicion = f['numero_clase'] - 1
+            for conteos in (totales, horario['conteos'], mesa['conteos']):
+                conteos[f['estado']][posicion] += f['total']
+
+        for horario in horarios.values():
+            horario['mesas'] = list(horario['mesas'].values())
+
+        data = {
+            'curso': curso_id,
+            'total_clases': TOTAL_CLASES,
+            'conteos': totales,
+            'horarios': list(horarios.values()),
+        }
+
+        if request.query_params.get('alumnos') in ('1', 'true', 'True'):
+            data['alumnos'] = self.filas_por_alumno(user, curso_id)
+
+        return Response(data)
+
+    def conteos_vacios(self):
+        return {estado: [0] * TOTAL_CLASES for estado in Asistencia.Estado.values}
+
+    def filas_por_alumno(self, user, curso_id):
+        """
+        Dos consultas: los alumnos del curso y todas sus asistencias.
+        """
+        alumnos = Alumno.objects.filter(curso_id=curso_id)
+        asistencias = Asistencia.objects.filter(curso_id=curso_id)
+        if user.role == 'FACILITADOR':
+            alumnos = alumnos.filter(facilitador=user)
+            asistencias = asistencias.filter(facilitador=user)
+
+        filas = {
+            a['id']: {**a, 'clases': ['-'] * TOTAL_CLASES}
+            for a in alumnos.order_by('mesa_id', 'apellidos').values(
+                'id', 'nombres', 'apellidos', 'mesa_id', 'activo'
+            )
+        }
+        for alumno_id, numero_clase, estado in asistencias.values_list(
+            'alumno_id', 'numero_clase', 'estado'
+        ):
+            if alumno_id in filas and 1 <= numero_clase <= TOTAL_CLASES:
+                filas[alumno_id]['clases'][numero_clase - 1] = estado
+
+        for fila in filas.values():
+            fila['clases'] = ''.join(fila['clases'])
+        return list(filas.values())
+
+class HojaAsistenciaView(APIView):
+    """
+    Todo lo necesario para mostrar y enviar la lista de asistencia de
+    una clase en una sola petición (ver academia/hoja.py).
+
+    Parámetros:
+      - ?numero_clase=N  (obligatorio)
+      - ?mesa=ID  o  ?horario=ID  (todas las mesas activas del horario)
+    """
+    permission_classes = [IsAdminOrFacilitador]
+
+    @cachear_respuesta('asistencia-hoja')
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        errores = {}
+        numero_clase = self.entero(params.get('numero_clase'), 'numero_clase', errores)
+        if numero_clase is not None and not 1 <= numero_clase <= TOTAL_CLASES:
+            errores['numero_clase'] = f"Debe estar entre 1 y {TOTAL_CLASES}."
+        if not params.get('mesa') and not params.get('horario'):
+            errores['mesa'] = "Indica ?mesa= o ?horario=."
+        mesa_id = self.entero(params.get('mesa'), 'mesa', errores) if params.get('mesa') else None
+        horario_id = self.entero(params.get('horario'), 'horario', errores) if params.get('horario') else None
+        if errores:
+            raise ValidationError(errores)
+
+        return Response(hoja.armar(request.user, numero_clase, mesa_id=mesa_id, horario_id=horario_id))
+
+    def entero(self, valor, nombre, errores):
+        try:
+            return int(valor)
+        except (TypeError, ValueError):
+            errores[nombre] = "Debe ser un número entero."
+            return None
+
+
+class AlumnosEnRiesgoView(APIView):
+    """
+    Ranking de alumnos en riesgo de no completar el curso (ver
+    academia/riesgo.py), agrupado también por mesa y por facilitador.
+
+    Parámetros:
+      - ?curso=ID    (por defecto, el curso activo)
+      - ?todos=1     incluye también a los alumnos con riesgo bajo
+      - ?limite=N    solo los N alumnos más riesgosos
+    """
+    permission_classes = [IsAdminUser]
+
+    @cachear_respuesta('alumnos-riesgo')
+    def get(self, request, *args, **kwargs):
+        if not riesgo.disponible():
+            return Response(
+                {'detail': "El análisis de riesgo necesita NumPy instalado."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        limite = request.query_params.get('limite')
+        if limite:
+            try:
+                limite = int(limite)
+            except ValueError:
+                raise ValidationError({'limite': "Debe ser un número entero."})
+
+        return Response(riesgo.analizar(
+            curso_solicitado(request),
+            incluir_bajo=request.query_params.get('todos') in ('1', 'true', 'True'),
+            limite=limite,
+        ))
+
+
+class ExportarView(APIView):
+    """
+    Base de las exportaciones (ver academia/exportar.py).
+
+    Parámetros:
+      - ?curso=ID, ?horario=ID, ?mesa=ID   (se pueden combinar)
+      - ?formato=csv (por defecto) o xlsx
+
+    Los facilitadores solo exportan sus propios alumnos.
+    """
+    permission_classes = [IsAdminOrFacilitador]
+    nombre = None
+    filas = None
+
+    def get(self, request, *args, **kwargs):
+        formato = request.query_params.get('formato', 'csv')
+        if formato not in exportar.FORMATOS:
+            raise ValidationError({'formato': f"Opciones: {', '.join(exportar.FORMATOS)}."})
+        if formato == 'xlsx' and exportar.openpyxl is None:
+            return Response(
+                {'detail': "Exportar a XLSX necesita openpyxl instalado."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        alcance_pedido = {'facilitador': request.user if request.user.role == 'FACILITADOR' else None}
+        for param in ('curso', 'horario', 'mesa'):
+            valor = request.query_params.get(param)
+            if valor:
+                try:
+                    alcance_pedido[param] = int(valor)
+                except ValueError:
+                    raise ValidationError({param: "Debe ser un número entero."})
+
+        return exportar.respuesta(self.filas(alcance_pedido), self.nombre, formato)
+
+
+class ExportarAlumnosView(ExportarView):
+    nombre = 'alumnos'
+    filas = staticmethod(exportar.filas_alumnos)
+
+
+class ExportarAsistenciaView(ExportarView):
+    nombre = 'asistencia'
+    filas = staticmethod(exportar.filas_cuadricula)
+
+
+class SincronizacionView(APIView):
+    """
+    Cambios desde el último cursor (ver academia/sincronizacion.py).
+
+      - Sin ?since=: todo lo que el usuario puede ver ('completo': true).
+      - ?since=CURSOR: solo horarios, mesas, alumnos y asistencias
+        creados o modificados desde entonces, más los ids eliminados.
+
+    La respuesta trae el 'cursor' para la siguiente petición.
+    """
+    permission_classes = [IsAdminOrFacilitador]
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        cursor = sincronizacion.ahora()
+
+        desde = None
+        texto = request.query_params.get('since')
+        if texto:
+            desde = sincronizacion.leer_cursor(texto)
+            if desde is None:
+                raise ValidationError({'since': "Cursor no válido."})
+            # Las lápidas más viejas ya se purgaron: hay que mandar todo
+            if desde < cursor - sincronizacion.retencion():
+                desde = None
+
+        alcance_usuario = alcance.de(user) if user.role == 'FACILITADOR' else None
+        querysets = sincronizacion.alcance_de(user, alcance_usuario)
+        serializers = {
+            'horarios': HorarioSerializer,
+            'mesas': MesaSerializer,
+            'alumnos': AlumnoSerializer,
+            'asistencias': AsistenciaSerializer,
+        }
+
+        data = {'cursor': sincronizacion.crear_cursor(cursor), 'completo': desde is None}
+        for nombre, queryset in querysets.items():
+            if desde is not None:
+                queryset = queryset.filter(actualizado__gte=desde - sincronizacion.SOLAPE)
+            data[nombre] = {
+                'actualizados': serializers[nombre](queryset.order_by('actualizado', 'id'), many=True).data,
+            }
+        if desde is not None:
+            for nombre, ids in sincronizacion.eliminados_de(user, desde).items():
+                data[nombre]['eliminados'] = ids
+        return Response(data)
+
+
 class CumpleanosView(APIView):
     """
-    Vista para obtener la lista de alumnos que cumplen años
-    en el mes actual, filtrados por rol.
+    Vista para obtener la lista de alumnos que cumplen años,
+    filtrados por rol.
+
+    - Sin parámetros: los del mes actual (como siempre).
+    - ?mes=M:         los del mes M (1-12).
+    - ?dias=N:        los de los próximos N días (incluye hoy), aunque
+                      el rango cruce de un año al siguiente.
+    - ?anio=1:        calendario de todo el año, agrupado por mes y con
+                      solo los datos necesarios para la página Calendario.
+
+    Todo se busca con el campo indexado 'cumple_mmdd' (mes*100 + día).
     """
     permission_classes = [IsAdminOrFacilitador] # Ambos pueden ver la lista
 
+    # El resultado depende de la fecha actual, así que va en la clave
+    @cachear_respuesta('cumpleanos', variar_por=lambda request: timezone.localdate().isoformat())
     def get(self, request, *args, **kwargs):
         user = request.user
-        
-        # 1. Obtener el mes actual (como un número, ej: 11 para Noviembre)
-        current_month = timezone.now().month
-
-        # 2. Base de la consulta:
-        #    - Alumnos activos
-        #    - Que su mes de nacimiento coincida con el mes actual
-        base_queryset = Alumno.objects.filter(
-            activo=True,
-            fecha_nacimiento__month=current_month
-        )
+        hoy = timezone.localdate()
 
-        # 3. Filtrar por rol
+        # 1. Base de la consulta: alumnos activos
+        base_queryset = Alumno.objects.filter(activo=True)
+
+        # 2. Filtrar por rol
         if user.role == 'FACILITADOR':
             # Facilitador solo ve alumnos de sus mesas activas
             base_queryset = base_queryset.filter(
-                mesa__facilitador=user,
-                mesa__activo=True
+                mesa_id__in=alcance.de(user)['mesas_activas']
             )
-        
-        # 4. Ordenar por día del mes
-        alumnos = base_queryset.order_by('fecha_nacimiento__day')
-        
-        # 5. Usamos el AlumnoSerializer que ya teníamos
+
+        params = request.query_params
+
+        # 3a. Calendario de todo el año
+        if params.get('anio') in ('1', 'true', 'True'):
+            return Response(self.calendario(base_queryset))
+
+        # 3b. Próximos N días
+        if params.get('dias'):
+            try:
+                dias = int(params['dias'])
+            except ValueError:
+                raise ValidationError({'dias': "Debe ser un número entero."})
+            if not 1 <= dias <= 366:
+                raise ValidationError({'dias': "Debe estar entre 1 y 366."})
+            alumnos = self.proximos(base_queryset, hoy, dias)
+            return Response(AlumnoSerializer(alumnos, many=True).data)
+
+        # 3c. Un mes (por defecto, el actual)
+        try:
+            mes = int(params.get('mes', hoy.month))
+        except ValueError:
+            raise ValidationError({'mes': "Debe ser un número entero."})
+        if not 1 <= mes <= 12:
+            raise ValidationError({'mes': "Debe estar entre 1 y 12."})
+
+        alumnos = base_queryset.filter(
+            cumple_mmdd__gte=mes * 100,
+            cumple_mmdd__lt=(mes + 1) * 100,
+        ).order_by('cumple_mmdd') # Ordenado por día del mes
+
+        # 4. Usamos el AlumnoSerializer que ya teníamos
         serializer = AlumnoSerializer(alumnos, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+    def proximos(self, queryset, hoy, dias):
+        """
+        Alumnos que cumplen años entre hoy y hoy + (dias - 1),
+        en el orden en que van a cumplir.
+        """
+        fin = hoy + datetime.timedelta(days=dias - 1)
+        desde = hoy.month * 100 + hoy.day
+        hasta = fin.month * 100 + fin.day
+
+        if dias >= 365:
+            rango = Q()
+        elif fin.year == hoy.year:
+            rango = Q(cumple_mmdd__gte=desde, cumple_mmdd__lte=hasta)
+        else:
+            # El rango cruza el fin de año: dic... + ...ene
+            rango = Q(cumple_mmdd__gte=desde) | Q(cumple_mmdd__lte=hasta)
+
+        return queryset.filter(rango).annotate(
+            # Primero los que faltan este año, luego los del año siguiente
+            vuelta=Case(When(cumple_mmdd__gte=desde, then=Value(0)), default=Value(1))
+        ).order_by('vuelta', 'cumple_mmdd')
+
+    def calendario(self, queryset):
+        """
+        {"1": [...], "2": [...], ...}: alumnos por mes, con pocos campos.
+        """
+        meses = {str(mes): [] for mes in range(1, 13)}
+        alumnos = queryset.filter(cumple_mmdd__isnull=False).order_by('cumple_mmdd', 'apellidos').values(
+            'id', 'nombres', 'apellidos', 'fecha_nacimiento', 'mesa_id', 'cumple_mmdd'
+        )
+        for alumno in alumnos:
+            mes, dia = divmod(alumno.pop('cumple_mmdd'), 100)
+            alumno['dia'] = dia
+            meses[str(mes)].append(alumno)
+        return meses
+
+
+class CacheStatsView(APIView):
+    """
+    Aciertos y fallos del cache de respuestas (solo Admins).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response({
+            'version': cache_respuestas.version_actual(),
+            'endpoints': cache_respuestas.estadisticas(cache_respuestas.ENDPOINTS),
+        })
+
+
+class MetricasView(APIView):
+    """
+    Métricas de latencia, consultas y tamaño por ruta en formato de
+    texto de Prometheus (ver academia/metricas.py). Solo Admins.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            metricas.texto_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
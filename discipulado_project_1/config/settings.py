@@ -52,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero, para medir también a los demás (ver academia/metricas.py)
+    'academia.metricas.MetricasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -97,6 +99,26 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Por defecto en memoria local. Con varios procesos (gunicorn, etc.)
+# conviene un backend compartido, ej. 'django.core.cache.backends.redis.RedisCache'.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'discipulado'),
+    }
+}
+
+# Segundos que se guarda una respuesta cacheada (ver academia/cache_respuestas.py)
+CACHE_RESPUESTAS_TIMEOUT = 300
+
+# Segundos que se guarda el alcance (mesas/alumnos) de cada facilitador
+# (ver academia/alcance.py)
+ALCANCE_TIMEOUT = 600
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -140,15 +162,68 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'usuarios.CustomUser'
 
+# Autenticación JWT "sin estado": arma request.user con los datos del token
+# en lugar de cargarlo de la base de datos (ver usuarios/authentication.py).
+JWT_SIN_ESTADO = os.getenv('JWT_SIN_ESTADO', 'False') == 'True'
+
+# Segundos que se confía en el 'is_active'/'role' cacheado de un usuario
+JWT_ESTADO_TTL = 60
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
+        'usuarios.authentication.ClaimsJWTAuthentication'
+        if JWT_SIN_ESTADO else
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         # Bloquea todas las vistas por defecto, 
         # solo usuarios autenticados pueden acceder.
         'rest_framework.permissions.IsAuthenticated',
-    )
+    ),
+    # Paginación por cursor (ver academia/pagination.py).
+    # Solo se activa si el cliente manda ?page_size= o ?cursor=
+    'DEFAULT_PAGINATION_CLASS': 'academia.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+}
+
+# Cuando el frontend haya migrado a la paginación, poner en True para
+# que TODAS las listas se paginen aunque no se pida '?page_size='.
+PAGINACION_OBLIGATORIA = os.getenv('PAGINACION_OBLIGATORIA', 'False') == 'True'
+
+# Fracción de las clases que un alumno debe asistir para completar el
+# curso (la usa el análisis de alumnos en riesgo, academia/riesgo.py)
+ASISTENCIA_MINIMA = 0.8
+
+# Días que se guardan las lápidas de registros eliminados para la
+# sincronización incremental (academia/sincronizacion.py). Un cliente
+# que no se sincroniza en más tiempo recibe de nuevo todos los datos.
+SINCRONIZACION_RETENCION_DIAS = int(os.getenv('SINCRONIZACION_RETENCION_DIAS', '30'))
+
+# Días que se recuerdan los lotes de asistencia ya aplicados, para
+# responder a los reintentos sin volver a escribir (academia/lotes.py).
+LOTES_ASISTENCIA_RETENCION_DIAS = int(os.getenv('LOTES_ASISTENCIA_RETENCION_DIAS', '14'))
+
+# Fracción de las peticiones que mide MetricasMiddleware (0 = ninguna,
+# 1 = todas) y a partir de cuántos ms una petición se registra como
+# lenta (academia/metricas.py, GET /api/v1/metricas/)
+METRICAS_MUESTREO = float(os.getenv('METRICAS_MUESTREO', '1.0'))
+METRICAS_LENTO_MS = int(os.getenv('METRICAS_LENTO_MS', '1000'))
+
+# Una línea JSON por petición medida en la consola (con el nivel por
+# defecto, WARNING, solo las lentas; con INFO, todas)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'consola': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'academia.metricas': {
+            'handlers': ['consola'],
+            'level': os.getenv('METRICAS_LOG_NIVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
 }
 
 CORS_ALLOWED_ORIGINS = [
@@ -0,0 +1,93 @@
+# En usuarios/authentication.py (archivo nuevo)
+
+"""
+Autenticación JWT "sin estado" (opcional, ver JWT_SIN_ESTADO en settings).
+
+El token ya trae 'username', 'role' y 'first_name' (ver
+MyTokenObtainPairSerializer), así que no hace falta cargar el
+CustomUser completo en cada petición. En su lugar se construye un
+CustomUser en memoria (sin guardar) con esos datos.
+
+Para que un facilitador desactivado (soft delete) no pueda seguir
+usando su token, se consulta su 'is_active' y 'role' en la base de
+datos como mucho una vez cada JWT_ESTADO_TTL segundos (guardado en el
+cache). Al desactivar o editar un usuario se borra esa entrada.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import CustomUser
+
+
+def clave_estado(user_id):
+    return f'usuarios:estado:{user_id}'
+
+
+def estado_usuario(user_id):
+    """
+    Devuelve {'is_active': bool, 'role': str} del usuario (o None si no
+    existe), usando el cache de vida corta.
+    """
+    clave = clave_estado(user_id)
+    estado = cache.get(clave)
+    if estado is None:
+        estado = CustomUser.objects.filter(pk=user_id).values('is_active', 'role').first()
+        # Guardamos también los "no existe" (como {}) para no repetir la consulta
+        cache.set(clave, estado or {}, getattr(settings, 'JWT_ESTADO_TTL', 60))
+    return estado or None
+
+
+def olvidar_estado(user_id):
+    """
+    Borra el estado cacheado, para que el próximo request lo relea.
+    """
+    cache.delete(clave_estado(user_id))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Igual que JWTAuthentication, pero arma 'request.user' a partir de
+    los claims del token en lugar de cargarlo de la base de datos.
+
+    El usuario resultante es un CustomUser NO guardado: sirve para
+    comparar y filtrar (ej. Mesa.objects.filter(facilitador=user)),
+    pero no se debe llamar a user.save().
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        # Tokens antiguos sin nuestros claims: comportamiento normal
+        if 'role' not in validated_token:
+            return super().get_user(validated_token)
+
+        # Según la versión de simplejwt, el id viene como texto
+        user_id = CustomUser._meta.pk.to_python(user_id)
+
+        estado = estado_usuario(user_id)
+        if estado is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not estado['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        user = CustomUser(
+            **{api_settings.USER_ID_FIELD: user_id},
+            username=validated_token.get('username', ''),
+            first_name=validated_token.get('first_name', ''),
+            # El rol viene del estado (no del token) por si cambió después del login
+            role=estado['role'],
+            is_active=True,
+        )
+        # Marcamos la instancia como "ya existente" para poder usarla en
+        # filtros del ORM (Django no acepta instancias sin guardar).
+        user._state.adding = False
+        user._state.db = CustomUser.objects.db
+        return user
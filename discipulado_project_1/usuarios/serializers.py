@@ -3,8 +3,10 @@
 from rest_framework import serializers
 from .models import CustomUser
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from academia.campos import CamposDinamicosMixin
+from academia.metricas import MetricasSerializerMixin
 
-class CustomUserSerializer(serializers.ModelSerializer):
+class CustomUserSerializer(MetricasSerializerMixin, CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         # Campos que queremos exponer en la API
@@ -62,7 +64,7 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         # Solo permitimos actualizar estos campos
         fields = ['first_name', 'last_name', 'email', 'is_active']
         
-class FacilitadorSimpleSerializer(serializers.ModelSerializer):
+class FacilitadorSimpleSerializer(MetricasSerializerMixin, CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializer simple para mostrar solo el nombre de un facilitador.
     """
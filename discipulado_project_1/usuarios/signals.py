@@ -0,0 +1,23 @@
+# En usuarios/signals.py (archivo nuevo)
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from academia import versiones
+
+from .authentication import olvidar_estado
+from .models import CustomUser
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def usuario_cambiado(sender, instance, **kwargs):
+    # Si se desactiva (o cambia de rol) un usuario, su estado
+    # cacheado para la autenticación sin estado deja de valer. Se olvida
+    # tras el COMMIT: antes, otra petición podría volver a cachear el
+    # estado viejo.
+    user_id = instance.pk
+    transaction.on_commit(lambda: olvidar_estado(user_id))
+    # Las mesas muestran el nombre de su facilitador (ETag de /mesas/)
+    transaction.on_commit(lambda: versiones.tocar(CustomUser))
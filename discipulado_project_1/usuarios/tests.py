@@ -1,3 +1,97 @@
+from unittest import skipIf
+
+from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import ClaimsJWTAuthentication
+from .models import CustomUser
+from .serializers import MyTokenObtainPairSerializer
+
+
+class ClaimsJWTAuthenticationTests(TestCase):
+    """
+    La autenticación sin estado arma el usuario con los claims del token,
+    pero 'is_active' y 'role' salen del cache / la base de datos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='x', role='ADMIN')
+        cls.facilitador = CustomUser.objects.create_user(
+            'facilitador', password='x', role='FACILITADOR', first_name='Ana'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def token(self, user):
+        return str(MyTokenObtainPairSerializer.get_token(user).access_token)
+
+    def autenticar(self, token):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        user, _ = ClaimsJWTAuthentication().authenticate(request)
+        return user
+
+    def test_usuario_desde_los_claims(self):
+        token = self.token(self.facilitador)
+        with self.assertNumQueries(1):
+            user = self.autenticar(token)
+        self.assertEqual((user.pk, user.username, user.first_name), (self.facilitador.pk, 'facilitador', 'Ana'))
+        # El estado queda en el cache: la siguiente petición no consulta
+        with self.assertNumQueries(0):
+            self.autenticar(token)
+
+    def test_rol_del_estado_y_no_del_token(self):
+        token = self.token(self.facilitador)
+        self.autenticar(token)
+        # .update() no dispara señales: hasta que caduque el cache vale el rol cacheado
+        CustomUser.objects.filter(pk=self.facilitador.pk).update(role='ADMIN')
+        self.assertEqual(self.autenticar(token).role, 'FACILITADOR')
+
+        # Al guardar, la señal olvida el estado y el rol nuevo vale con el mismo token
+        with self.captureOnCommitCallbacks(execute=True):
+            CustomUser.objects.get(pk=self.facilitador.pk).save()
+        self.assertEqual(self.autenticar(token).role, 'ADMIN')
+
+    def test_desactivado_por_el_admin(self):
+        token = self.token(self.facilitador)
+        self.autenticar(token)
+
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.delete(f'/api/v1/auth/usuarios/{self.facilitador.pk}/')
+        self.assertEqual(response.status_code, 204)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.autenticar(token)
+
+    def test_token_sin_claims_propios(self):
+        # Tokens emitidos antes de los claims propios: se carga el usuario
+        token = AccessToken.for_user(self.facilitador)
+        self.assertNotIn('role', token)
+        with self.assertNumQueries(1):
+            user = self.autenticar(str(token))
+        self.assertEqual((user.pk, user.role, user.first_name), (self.facilitador.pk, 'FACILITADOR', 'Ana'))
+
+        CustomUser.objects.filter(pk=self.facilitador.pk).update(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.autenticar(str(token))
+
+    @skipIf(settings.JWT_SIN_ESTADO, "JWT_SIN_ESTADO está activado")
+    def test_sin_jwt_sin_estado(self):
+        # Por defecto se usa la autenticación normal, que lee el usuario en cada petición
+        self.assertEqual(api_settings.DEFAULT_AUTHENTICATION_CLASSES, [JWTAuthentication])
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'{jwt_settings.AUTH_HEADER_TYPES[0]} {self.token(self.admin)}')
+        self.assertEqual(client.get('/api/v1/auth/usuarios/').status_code, 200)
 
-# Create your tests here.
+        CustomUser.objects.filter(pk=self.admin.pk).update(is_active=False)
+        self.assertEqual(client.get('/api/v1/auth/usuarios/').status_code, 401)
@@ -6,9 +6,10 @@ from .serializers import CustomUserSerializer, MyTokenObtainPairSerializer, User
 # (Importamos el permiso de Admin de la otra app, aunque podríamos moverlo
 # a un archivo de permisos 'global')
 from academia.permissions import IsAdminUser 
+from academia.campos import CamposDinamicosViewSetMixin
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-class CustomUserViewSet(viewsets.ModelViewSet):
+class CustomUserViewSet(CamposDinamicosViewSetMixin, viewsets.ModelViewSet):
     queryset = CustomUser.objects.all()
     serializer_class = CustomUserSerializer
     # Solo Admins pueden gestionar usuarios